@@ -1,8 +1,31 @@
 import { NextResponse } from "next/server"
 import type { NextRequest } from "next/server"
 import { createServerClient } from '@supabase/ssr'
+import slugRedirects from "./public/slug-redirects.json"
+
+// Old product slug → current slug, exported by scripts/slug_redirects.py and
+// bundled at build time (a new export needs a redeploy)
+const productRedirects: Record<string, string> = slugRedirects.redirects
+
+function productRedirect(path: string): string | undefined {
+  try {
+    const slug = decodeURIComponent(path.slice('/product/'.length))
+    return Object.hasOwn(productRedirects, slug) ? productRedirects[slug] : undefined
+  } catch {
+    return undefined  // malformed %-escapes
+  }
+}
 
 export async function proxy(request: NextRequest) {
+  // Renamed products: permanent redirect, no database round trip
+  if (request.nextUrl.pathname.startsWith('/product/')) {
+    const target = productRedirect(request.nextUrl.pathname)
+    if (target) {
+      return NextResponse.redirect(new URL(`/product/${target}`, request.url), 308)
+    }
+    return NextResponse.next()
+  }
+
   let response = NextResponse.next({
     request: {
       headers: request.headers,
@@ -121,5 +144,6 @@ export const config = {
     '/account/:path*',
     '/admin/:path*',
     '/wholesale/:path*',
+    '/product/:path*',
   ],
 }
@@ -5,10 +5,74 @@ Uses Gradio Client to interact with the WeShopAI Virtual Try-On Space
 
 from gradio_client import Client, handle_file
 from PIL import Image
+import hashlib
 import os
 import shutil
 
-def virtual_tryon(garment_image_path, person_image_path, output_path="result.png"):
+SPACE = "WeShopAI/WeShopAI-Virtual-Try-On"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents (identical images hash the same)"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class RemoteFileCache:
+    """
+    Uploads each unique image to the Space once per session and hands out
+    the remote file reference for every later use.
+
+    The reference is the Space's own `file=` URL, which gradio_client passes
+    through without re-uploading. If the direct upload fails (older Space or
+    client versions), it falls back to `handle_file(path)`, which uploads on
+    every call as before.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._refs = {}  # digest -> file reference
+        self.uploads = 0
+        self.reused = 0
+
+    def get(self, path, digest=None):
+        digest = digest or file_digest(path)
+        if digest in self._refs:
+            self.reused += 1
+            return self._refs[digest]
+        ref = self._upload(path)
+        self._refs[digest] = ref
+        return ref
+
+    def _upload(self, path):
+        upload_url = getattr(self.client, "upload_url", None)
+        src_prefixed = getattr(self.client, "src_prefixed", None) or getattr(self.client, "src", None)
+        if upload_url and src_prefixed:
+            try:
+                import httpx
+                from urllib.parse import urljoin
+
+                with open(path, "rb") as f:
+                    resp = httpx.post(
+                        upload_url,
+                        headers=getattr(self.client, "headers", None),
+                        files=[("files", (os.path.basename(path), f))],
+                        timeout=120,
+                    )
+                resp.raise_for_status()
+                server_path = resp.json()[0]
+                self.uploads += 1
+                return handle_file(urljoin(src_prefixed.rstrip("/") + "/", f"file={server_path}"))
+            except Exception as e:
+                print(f"⚠️  Direct upload failed for {path} ({e}); falling back to per-call upload")
+        return handle_file(path)
+
+
+def virtual_tryon(garment_image_path, person_image_path, output_path="result.png",
+                  client=None, garment_ref=None, person_ref=None):
     """
     Perform virtual try-on using WeShopAI Space
     
@@ -16,15 +80,19 @@ def virtual_tryon(garment_image_path, person_image_path, output_path="result.png
         garment_image_path: Path to the garment/clothing image
         person_image_path: Path to the person/model image
         output_path: Path to save the result image (default: result.png)
+        client: Existing Gradio client to reuse (default: connect a new one)
+        garment_ref: Already-uploaded garment reference (see RemoteFileCache)
+        person_ref: Already-uploaded person reference (see RemoteFileCache)
     
     Returns:
         Path to the generated result image
     """
     
-    print("Connecting to WeShopAI Virtual Try-On Space...")
-    
-    # Initialize the Gradio client
-    client = Client("WeShopAI/WeShopAI-Virtual-Try-On")
+    if client is None:
+        print("Connecting to WeShopAI Virtual Try-On Space...")
+        
+        # Initialize the Gradio client
+        client = Client(SPACE)
     
     print("Uploading images and generating result...")
     print(f"Garment: {garment_image_path}")
@@ -34,8 +102,8 @@ def virtual_tryon(garment_image_path, person_image_path, output_path="result.png
         # Call the prediction API
         # The WeShopAI space expects the garment image first, then the person image
         result = client.predict(
-            main_image=handle_file(garment_image_path),  # Garment image
-            background_image=handle_file(person_image_path),  # Person image
+            main_image=garment_ref or handle_file(garment_image_path),  # Garment image
+            background_image=person_ref or handle_file(person_image_path),  # Person image
             api_name="/generate_image"
         )
         
@@ -76,38 +144,100 @@ def virtual_tryon(garment_image_path, person_image_path, output_path="result.png
         return None
 
 
-def batch_virtual_tryon(garment_paths, person_paths, output_dir="outputs"):
+def _unique_by_content(paths):
+    """Map a list of paths to [(digest, path)], dropping duplicate paths and identical files"""
+    seen = {}
+    digest_of_path = {}
+    for path in paths:
+        key = os.path.realpath(path)
+        if key not in digest_of_path:
+            digest_of_path[key] = file_digest(path)
+        seen.setdefault(digest_of_path[key], path)
+    return list(seen.items())
+
+
+def plan_batch(garment_paths, person_paths, output_dir="outputs", skip_existing=True):
+    """
+    Plan a garment x person batch by content, not by path
+    
+    Inputs are normalized by content hash so duplicate paths and identical
+    images collapse to one entry. Output names are derived from the pair's
+    hashes, so a re-run finds results from earlier runs and skips them.
+    
+    Returns:
+        dict with `jobs` (list of (garment, g_digest, person, p_digest, output_path)),
+        `done` (output paths that already exist) and `raw_pairs` (the naive count)
+    """
+    garments = _unique_by_content(garment_paths)
+    persons = _unique_by_content(person_paths)
+    
+    jobs, done = [], []
+    for g_digest, garment in garments:
+        for p_digest, person in persons:
+            output_path = os.path.join(output_dir, f"result_{g_digest[:12]}_{p_digest[:12]}.png")
+            if skip_existing and os.path.exists(output_path):
+                done.append(output_path)
+            else:
+                jobs.append((garment, g_digest, person, p_digest, output_path))
+    
+    return {
+        "jobs": jobs,
+        "done": done,
+        "raw_pairs": len(garment_paths) * len(person_paths),
+    }
+
+
+def batch_virtual_tryon(garment_paths, person_paths, output_dir="outputs", skip_existing=True):
     """
     Perform virtual try-on for multiple combinations
     
+    Only unique garment/person content pairs are run. Each unique image is
+    uploaded once per session and the remote reference is reused, and pairs
+    whose output already exists are skipped.
+    
     Args:
         garment_paths: List of garment image paths
         person_paths: List of person image paths
         output_dir: Directory to save results
+        skip_existing: Skip pairs whose output file already exists
     
     Returns:
-        List of generated image paths
+        List of generated image paths (including previously generated ones)
     """
     
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
-    results = []
+    plan = plan_batch(garment_paths, person_paths, output_dir, skip_existing)
+    jobs = plan["jobs"]
+    results = list(plan["done"])
     
-    for i, garment in enumerate(garment_paths):
-        for j, person in enumerate(person_paths):
-            output_name = f"result_g{i+1}_p{j+1}.png"
-            output_path = os.path.join(output_dir, output_name)
-            
-            print(f"\n{'='*50}")
-            print(f"Processing combination {len(results)+1}: Garment {i+1} x Person {j+1}")
-            print(f"{'='*50}")
-            
-            result = virtual_tryon(garment, person, output_path)
-            
-            if result:
-                results.append(result)
-            
+    print(f"Planned {len(jobs)} jobs from {plan['raw_pairs']} raw pairs "
+          f"({len(plan['done'])} already done)")
+    
+    if not jobs:
+        return results
+    
+    print("Connecting to WeShopAI Virtual Try-On Space...")
+    client = Client(SPACE)
+    files = RemoteFileCache(client)
+    
+    for n, (garment, g_digest, person, p_digest, output_path) in enumerate(jobs, 1):
+        print(f"\n{'='*50}")
+        print(f"Processing combination {n}/{len(jobs)}: {os.path.basename(garment)} x {os.path.basename(person)}")
+        print(f"{'='*50}")
+        
+        result = virtual_tryon(
+            garment, person, output_path,
+            client=client,
+            garment_ref=files.get(garment, g_digest),
+            person_ref=files.get(person, p_digest),
+        )
+        
+        if result:
+            results.append(result)
+    
+    print(f"\nUploads: {files.uploads}, reused references: {files.reused}")
     return results
 
 
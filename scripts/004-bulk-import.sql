@@ -0,0 +1,244 @@
+-- Bulk Import Staging for the Product Importer
+-- Run after 001-initial-schema.sql. Used by scripts/bulk_import.py:
+-- normalized CSV rows are streamed into an UNLOGGED staging table with
+-- COPY FROM STDIN, then merged into categories, brands, products and
+-- product_images with set-based SQL in the same transaction.
+-- import_products_chunk() exposes the same merge as a PostgREST RPC for
+-- chunked, atomic imports from scripts/populate_supabase.py.
+
+-- =============================================
+-- STAGING TABLE
+-- =============================================
+CREATE UNLOGGED TABLE IF NOT EXISTS import_products_staging (
+  batch_id UUID NOT NULL,
+  row_num INTEGER NOT NULL,
+  sku TEXT NOT NULL,
+  name TEXT NOT NULL,
+  slug TEXT NOT NULL,
+  description TEXT,
+  short_description TEXT,
+  category_name TEXT,
+  category_slug TEXT,
+  brand_name TEXT,
+  brand_slug TEXT,
+  retail_price DECIMAL(10,2) NOT NULL DEFAULT 0,
+  wholesale_price DECIMAL(10,2) NOT NULL DEFAULT 0,
+  cost_price DECIMAL(10,2),
+  min_wholesale_qty INTEGER,
+  stock_quantity INTEGER,
+  low_stock_threshold INTEGER,
+  weight DECIMAL(8,2),
+  ingredients TEXT,
+  usage_instructions TEXT,
+  tags TEXT[],
+  status TEXT NOT NULL DEFAULT 'draft',
+  image_urls TEXT[]
+);
+
+CREATE INDEX IF NOT EXISTS idx_import_staging_batch ON import_products_staging(batch_id);
+
+-- Staging is only ever touched with the service role
+ALTER TABLE import_products_staging ENABLE ROW LEVEL SECURITY;
+
+-- =============================================
+-- MERGE FUNCTION
+-- =============================================
+-- Merges one staged batch and deletes it from staging.
+--   p_skip_existing = true  → existing SKUs are left untouched (SKIP mode)
+--   p_skip_existing = false → existing SKUs are updated; optional fields that
+--                             are empty in the CSV keep their DB value (UPDATE mode)
+CREATE OR REPLACE FUNCTION merge_import_staging(p_batch_id UUID, p_skip_existing BOOLEAN DEFAULT false)
+RETURNS TABLE (
+  categories_created INTEGER,
+  brands_created INTEGER,
+  products_inserted INTEGER,
+  products_updated INTEGER,
+  images_written INTEGER
+) AS $$
+DECLARE
+  v_categories INTEGER;
+  v_brands INTEGER;
+  v_images INTEGER;
+  v_more INTEGER;
+BEGIN
+  -- Last row wins when a SKU appears more than once in the file
+  CREATE TEMP TABLE _staged ON COMMIT DROP AS
+  SELECT DISTINCT ON (s.sku) s.*
+  FROM import_products_staging s
+  WHERE s.batch_id = p_batch_id
+  ORDER BY s.sku, s.row_num DESC;
+
+  -- Slugs must be unique: suffix the SKU when another product (or another
+  -- row of this batch) already uses the slug
+  UPDATE _staged s
+  SET slug = s.slug || '-' || trim(both '-' from lower(regexp_replace(s.sku, '[^a-zA-Z0-9]+', '-', 'g')))
+  WHERE EXISTS (SELECT 1 FROM products p WHERE p.slug = s.slug AND p.sku <> s.sku)
+     OR EXISTS (SELECT 1 FROM _staged o WHERE o.slug = s.slug AND o.sku < s.sku);
+
+  INSERT INTO categories (name, slug, is_active)
+  SELECT DISTINCT ON (category_slug) category_name, category_slug, true
+  FROM _staged
+  WHERE category_slug IS NOT NULL AND category_slug <> ''
+  ORDER BY category_slug, row_num
+  ON CONFLICT (slug) DO NOTHING;
+  GET DIAGNOSTICS v_categories = ROW_COUNT;
+
+  INSERT INTO brands (name, slug, is_active)
+  SELECT DISTINCT ON (brand_slug) brand_name, brand_slug, true
+  FROM _staged
+  WHERE brand_slug IS NOT NULL AND brand_slug <> ''
+  ORDER BY brand_slug, row_num
+  ON CONFLICT (slug) DO NOTHING;
+  GET DIAGNOSTICS v_brands = ROW_COUNT;
+
+  CREATE TEMP TABLE _merged (product_id UUID, sku TEXT, inserted BOOLEAN) ON COMMIT DROP;
+
+  IF p_skip_existing THEN
+    WITH upserted AS (
+      INSERT INTO products (
+        sku, name, slug, description, short_description, category_id, brand_id,
+        retail_price, wholesale_price, cost_price, min_wholesale_qty, stock_quantity,
+        low_stock_threshold, weight, ingredients, usage_instructions, tags, status
+      )
+      SELECT
+        s.sku, s.name, s.slug, s.description, s.short_description, c.id, b.id,
+        s.retail_price, s.wholesale_price, s.cost_price, COALESCE(s.min_wholesale_qty, 10),
+        COALESCE(s.stock_quantity, 0), COALESCE(s.low_stock_threshold, 10), s.weight,
+        s.ingredients, s.usage_instructions, s.tags, s.status
+      FROM _staged s
+      LEFT JOIN categories c ON c.slug = s.category_slug
+      LEFT JOIN brands b ON b.slug = s.brand_slug
+      ON CONFLICT (sku) DO NOTHING
+      RETURNING id, sku, true
+    )
+    INSERT INTO _merged SELECT * FROM upserted;
+  ELSE
+    WITH upserted AS (
+      INSERT INTO products (
+        sku, name, slug, description, short_description, category_id, brand_id,
+        retail_price, wholesale_price, cost_price, min_wholesale_qty, stock_quantity,
+        low_stock_threshold, weight, ingredients, usage_instructions, tags, status
+      )
+      SELECT
+        s.sku, s.name, s.slug, s.description, s.short_description, c.id, b.id,
+        s.retail_price, s.wholesale_price, s.cost_price, COALESCE(s.min_wholesale_qty, 10),
+        COALESCE(s.stock_quantity, 0), COALESCE(s.low_stock_threshold, 10), s.weight,
+        s.ingredients, s.usage_instructions, s.tags, s.status
+      FROM _staged s
+      LEFT JOIN categories c ON c.slug = s.category_slug
+      LEFT JOIN brands b ON b.slug = s.brand_slug
+      ON CONFLICT (sku) DO UPDATE SET
+        name = EXCLUDED.name,
+        slug = EXCLUDED.slug,
+        retail_price = EXCLUDED.retail_price,
+        wholesale_price = EXCLUDED.wholesale_price,
+        status = EXCLUDED.status,
+        description = COALESCE(EXCLUDED.description, products.description),
+        short_description = COALESCE(EXCLUDED.short_description, products.short_description),
+        category_id = COALESCE(EXCLUDED.category_id, products.category_id),
+        brand_id = COALESCE(EXCLUDED.brand_id, products.brand_id),
+        cost_price = COALESCE(EXCLUDED.cost_price, products.cost_price),
+        min_wholesale_qty = EXCLUDED.min_wholesale_qty,
+        stock_quantity = EXCLUDED.stock_quantity,
+        low_stock_threshold = EXCLUDED.low_stock_threshold,
+        weight = COALESCE(EXCLUDED.weight, products.weight),
+        ingredients = COALESCE(EXCLUDED.ingredients, products.ingredients),
+        usage_instructions = COALESCE(EXCLUDED.usage_instructions, products.usage_instructions),
+        tags = COALESCE(EXCLUDED.tags, products.tags)
+      RETURNING id, sku, (xmax = 0)
+    )
+    INSERT INTO _merged SELECT * FROM upserted;
+  END IF;
+
+  -- Images: first URL is primary; existing rows are matched by URL
+  CREATE TEMP TABLE _wanted_images ON COMMIT DROP AS
+  SELECT m.product_id, u.url AS image_url, (u.ord - 1)::INTEGER AS display_order, s.name AS alt_text
+  FROM _merged m
+  JOIN _staged s ON s.sku = m.sku
+  CROSS JOIN LATERAL unnest(s.image_urls) WITH ORDINALITY AS u(url, ord);
+
+  UPDATE product_images pi
+  SET is_primary = false
+  WHERE pi.is_primary
+    AND pi.product_id IN (SELECT product_id FROM _wanted_images)
+    AND NOT EXISTS (
+      SELECT 1 FROM _wanted_images w
+      WHERE w.product_id = pi.product_id AND w.image_url = pi.image_url AND w.display_order = 0
+    );
+
+  UPDATE product_images pi
+  SET display_order = w.display_order, is_primary = (w.display_order = 0)
+  FROM _wanted_images w
+  WHERE pi.product_id = w.product_id AND pi.image_url = w.image_url
+    AND (pi.display_order IS DISTINCT FROM w.display_order OR pi.is_primary IS DISTINCT FROM (w.display_order = 0));
+  GET DIAGNOSTICS v_images = ROW_COUNT;
+
+  INSERT INTO product_images (product_id, image_url, alt_text, display_order, is_primary)
+  SELECT w.product_id, w.image_url, w.alt_text, w.display_order, w.display_order = 0
+  FROM _wanted_images w
+  WHERE NOT EXISTS (
+    SELECT 1 FROM product_images pi WHERE pi.product_id = w.product_id AND pi.image_url = w.image_url
+  );
+  GET DIAGNOSTICS v_more = ROW_COUNT;
+  v_images := v_images + v_more;
+
+  DELETE FROM import_products_staging WHERE batch_id = p_batch_id;
+
+  RETURN QUERY
+  SELECT
+    v_categories,
+    v_brands,
+    (SELECT COUNT(*)::INTEGER FROM _merged WHERE inserted),
+    (SELECT COUNT(*)::INTEGER FROM _merged WHERE NOT inserted),
+    v_images;
+
+  DROP TABLE _staged, _merged, _wanted_images;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =============================================
+-- CHUNK RPC (PostgREST)
+-- =============================================
+-- Applies one chunk of normalized rows atomically: a PostgREST RPC call runs
+-- in a single transaction, so a chunk's categories, brands, products and
+-- images either all land or none do. Used by SupabaseImporter.import_csv_chunked,
+-- which bisects failed chunks to isolate bad rows.
+-- p_rows: JSON array of objects keyed like import_products_staging columns.
+CREATE OR REPLACE FUNCTION import_products_chunk(p_rows JSONB, p_skip_existing BOOLEAN DEFAULT false)
+RETURNS TABLE (
+  categories_created INTEGER,
+  brands_created INTEGER,
+  products_inserted INTEGER,
+  products_updated INTEGER,
+  images_written INTEGER
+) AS $$
+DECLARE
+  v_batch_id UUID := uuid_generate_v4();
+BEGIN
+  INSERT INTO import_products_staging (
+    batch_id, row_num, sku, name, slug, description, short_description,
+    category_name, category_slug, brand_name, brand_slug,
+    retail_price, wholesale_price, cost_price, min_wholesale_qty, stock_quantity,
+    low_stock_threshold, weight, ingredients, usage_instructions, tags, status, image_urls
+  )
+  SELECT
+    v_batch_id, COALESCE(r.row_num, e.ord::INTEGER), r.sku, r.name, r.slug, r.description, r.short_description,
+    r.category_name, r.category_slug, r.brand_name, r.brand_slug,
+    COALESCE(r.retail_price, 0), COALESCE(r.wholesale_price, 0), r.cost_price, r.min_wholesale_qty, r.stock_quantity,
+    r.low_stock_threshold, r.weight, r.ingredients, r.usage_instructions, r.tags, COALESCE(r.status, 'draft'), r.image_urls
+  FROM jsonb_array_elements(p_rows) WITH ORDINALITY AS e(value, ord)
+  CROSS JOIN LATERAL jsonb_populate_record(NULL::import_products_staging, e.value) AS r;
+
+  RETURN QUERY SELECT * FROM merge_import_staging(v_batch_id, p_skip_existing);
+END;
+$$ LANGUAGE plpgsql;
+
+-- =============================================
+-- PERMISSIONS
+-- =============================================
+-- PostgREST exposes every function the API roles can execute; these are
+-- for the importers (service role) only.
+REVOKE EXECUTE ON FUNCTION merge_import_staging(UUID, BOOLEAN) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION import_products_chunk(JSONB, BOOLEAN) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION merge_import_staging(UUID, BOOLEAN) TO service_role;
+GRANT EXECUTE ON FUNCTION import_products_chunk(JSONB, BOOLEAN) TO service_role;
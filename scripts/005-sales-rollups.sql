@@ -0,0 +1,192 @@
+-- Daily Sales Rollups for the Admin Reports / Dashboard
+-- Run after 001-initial-schema.sql and 003-rls-policies.sql. Maintained by
+-- scripts/sales_rollups.py: it finds the days touched by orders created or
+-- updated since its watermark and calls refresh_sales_rollups() for them, so
+-- dashboards read a few hundred pre-aggregated rows instead of scanning
+-- orders + order_items.
+--
+-- Days are local calendar days in the report time zone (REPORT_TZ in the
+-- job, default Asia/Kolkata). Revenue, orders and units exclude cancelled and
+-- returned orders; paid_* only counts payment_status = 'paid'. Brand and
+-- category come from the product's current brand/category.
+
+-- =============================================
+-- ETL WATERMARKS (shared by the incremental jobs)
+-- =============================================
+CREATE TABLE IF NOT EXISTS etl_watermarks (
+  job TEXT PRIMARY KEY,
+  watermark TIMESTAMPTZ,
+  details JSONB,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- =============================================
+-- ROLLUP TABLES
+-- =============================================
+CREATE TABLE IF NOT EXISTS sales_daily_totals (
+  day DATE PRIMARY KEY,
+  orders INTEGER NOT NULL DEFAULT 0,
+  cancelled_orders INTEGER NOT NULL DEFAULT 0,
+  paid_orders INTEGER NOT NULL DEFAULT 0,
+  units INTEGER NOT NULL DEFAULT 0,
+  revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+  paid_revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+  refreshed_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Keyed by SKU: order_items.product_id is SET NULL when a product is deleted
+CREATE TABLE IF NOT EXISTS sales_daily_products (
+  day DATE NOT NULL,
+  product_sku TEXT NOT NULL,
+  product_id UUID,
+  product_name TEXT NOT NULL,
+  orders INTEGER NOT NULL DEFAULT 0,
+  units INTEGER NOT NULL DEFAULT 0,
+  revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+  paid_revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+  refreshed_at TIMESTAMPTZ DEFAULT NOW(),
+  PRIMARY KEY (day, product_sku)
+);
+
+-- brand_id / category_id NULL = no brand / category (or product deleted)
+CREATE TABLE IF NOT EXISTS sales_daily_brands (
+  day DATE NOT NULL,
+  brand_id UUID REFERENCES brands(id) ON DELETE SET NULL,
+  orders INTEGER NOT NULL DEFAULT 0,
+  units INTEGER NOT NULL DEFAULT 0,
+  revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+  paid_revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+  refreshed_at TIMESTAMPTZ DEFAULT NOW(),
+  UNIQUE NULLS NOT DISTINCT (day, brand_id)
+);
+
+CREATE TABLE IF NOT EXISTS sales_daily_categories (
+  day DATE NOT NULL,
+  category_id UUID REFERENCES categories(id) ON DELETE SET NULL,
+  orders INTEGER NOT NULL DEFAULT 0,
+  units INTEGER NOT NULL DEFAULT 0,
+  revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+  paid_revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+  refreshed_at TIMESTAMPTZ DEFAULT NOW(),
+  UNIQUE NULLS NOT DISTINCT (day, category_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sales_products_sku ON sales_daily_products(product_sku, day);
+CREATE INDEX IF NOT EXISTS idx_sales_brands_brand ON sales_daily_brands(brand_id, day);
+CREATE INDEX IF NOT EXISTS idx_sales_categories_category ON sales_daily_categories(category_id, day);
+
+-- The watermark scan: orders created or updated since the last run
+CREATE INDEX IF NOT EXISTS idx_orders_updated ON orders(updated_at);
+
+-- =============================================
+-- RLS - Admin read access (the job uses the service role)
+-- =============================================
+ALTER TABLE etl_watermarks ENABLE ROW LEVEL SECURITY;
+ALTER TABLE sales_daily_totals ENABLE ROW LEVEL SECURITY;
+ALTER TABLE sales_daily_products ENABLE ROW LEVEL SECURITY;
+ALTER TABLE sales_daily_brands ENABLE ROW LEVEL SECURITY;
+ALTER TABLE sales_daily_categories ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Admins can view watermarks" ON etl_watermarks;
+DROP POLICY IF EXISTS "Admins can view daily totals" ON sales_daily_totals;
+DROP POLICY IF EXISTS "Admins can view daily product sales" ON sales_daily_products;
+DROP POLICY IF EXISTS "Admins can view daily brand sales" ON sales_daily_brands;
+DROP POLICY IF EXISTS "Admins can view daily category sales" ON sales_daily_categories;
+
+CREATE POLICY "Admins can view watermarks" ON etl_watermarks
+  FOR SELECT USING (is_admin());
+
+CREATE POLICY "Admins can view daily totals" ON sales_daily_totals
+  FOR SELECT USING (is_admin());
+
+CREATE POLICY "Admins can view daily product sales" ON sales_daily_products
+  FOR SELECT USING (is_admin());
+
+CREATE POLICY "Admins can view daily brand sales" ON sales_daily_brands
+  FOR SELECT USING (is_admin());
+
+CREATE POLICY "Admins can view daily category sales" ON sales_daily_categories
+  FOR SELECT USING (is_admin());
+
+-- =============================================
+-- REFRESH FUNCTION (PostgREST RPC)
+-- =============================================
+-- Recomputes every rollup row for the given local days in one transaction
+-- (delete + set-based insert), so readers never see a half-refreshed day.
+-- Each day becomes a created_at range, which idx_orders_created serves.
+CREATE OR REPLACE FUNCTION refresh_sales_rollups(p_days DATE[], p_tz TEXT DEFAULT 'Asia/Kolkata')
+RETURNS TABLE (
+  days_refreshed INTEGER,
+  product_rows INTEGER,
+  brand_rows INTEGER,
+  category_rows INTEGER
+) AS $$
+DECLARE
+  v_products INTEGER;
+  v_brands INTEGER;
+  v_categories INTEGER;
+BEGIN
+  DELETE FROM sales_daily_totals WHERE day = ANY(p_days);
+  DELETE FROM sales_daily_products WHERE day = ANY(p_days);
+  DELETE FROM sales_daily_brands WHERE day = ANY(p_days);
+  DELETE FROM sales_daily_categories WHERE day = ANY(p_days);
+
+  CREATE TEMP TABLE _rollup_orders ON COMMIT DROP AS
+  SELECT d.day, o.id, o.total_amount,
+         o.status IN ('cancelled', 'returned') AS cancelled,
+         o.payment_status = 'paid' AS paid
+  FROM unnest(p_days) AS d(day)
+  JOIN orders o
+    ON o.created_at >= (d.day::TIMESTAMP AT TIME ZONE p_tz)
+   AND o.created_at <  ((d.day + 1)::TIMESTAMP AT TIME ZONE p_tz);
+
+  CREATE TEMP TABLE _rollup_items ON COMMIT DROP AS
+  SELECT ro.day, ro.id AS order_id, ro.paid, oi.product_sku, oi.product_id, oi.product_name,
+         oi.quantity, oi.total_price, p.brand_id, p.category_id
+  FROM _rollup_orders ro
+  JOIN order_items oi ON oi.order_id = ro.id
+  LEFT JOIN products p ON p.id = oi.product_id
+  WHERE NOT ro.cancelled;
+
+  INSERT INTO sales_daily_totals (day, orders, cancelled_orders, paid_orders, units, revenue, paid_revenue)
+  SELECT ro.day,
+         COUNT(*) FILTER (WHERE NOT ro.cancelled),
+         COUNT(*) FILTER (WHERE ro.cancelled),
+         COUNT(*) FILTER (WHERE ro.paid AND NOT ro.cancelled),
+         COALESCE((SELECT SUM(ri.quantity) FROM _rollup_items ri WHERE ri.day = ro.day), 0),
+         COALESCE(SUM(ro.total_amount) FILTER (WHERE NOT ro.cancelled), 0),
+         COALESCE(SUM(ro.total_amount) FILTER (WHERE ro.paid AND NOT ro.cancelled), 0)
+  FROM _rollup_orders ro
+  GROUP BY ro.day;
+
+  INSERT INTO sales_daily_products (day, product_sku, product_id, product_name, orders, units, revenue, paid_revenue)
+  SELECT day, product_sku,
+         (ARRAY_AGG(product_id) FILTER (WHERE product_id IS NOT NULL))[1],
+         MAX(product_name),
+         COUNT(DISTINCT order_id), SUM(quantity), SUM(total_price),
+         COALESCE(SUM(total_price) FILTER (WHERE paid), 0)
+  FROM _rollup_items
+  GROUP BY day, product_sku;
+  GET DIAGNOSTICS v_products = ROW_COUNT;
+
+  INSERT INTO sales_daily_brands (day, brand_id, orders, units, revenue, paid_revenue)
+  SELECT day, brand_id, COUNT(DISTINCT order_id), SUM(quantity), SUM(total_price),
+         COALESCE(SUM(total_price) FILTER (WHERE paid), 0)
+  FROM _rollup_items
+  GROUP BY day, brand_id;
+  GET DIAGNOSTICS v_brands = ROW_COUNT;
+
+  INSERT INTO sales_daily_categories (day, category_id, orders, units, revenue, paid_revenue)
+  SELECT day, category_id, COUNT(DISTINCT order_id), SUM(quantity), SUM(total_price),
+         COALESCE(SUM(total_price) FILTER (WHERE paid), 0)
+  FROM _rollup_items
+  GROUP BY day, category_id;
+  GET DIAGNOSTICS v_categories = ROW_COUNT;
+
+  RETURN QUERY SELECT COALESCE(array_length(p_days, 1), 0), v_products, v_brands, v_categories;
+END;
+$$ LANGUAGE plpgsql;
+
+-- For sales_rollups.py (service role) only
+REVOKE EXECUTE ON FUNCTION refresh_sales_rollups(DATE[], TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION refresh_sales_rollups(DATE[], TEXT) TO service_role;
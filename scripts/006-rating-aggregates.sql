@@ -0,0 +1,126 @@
+-- Product Rating Aggregates
+-- Run after 005-sales-rollups.sql (uses etl_watermarks). Used by
+-- scripts/rating_aggregates.py to keep products.rating_avg / rating_count in
+-- sync with approved product_reviews, so listings sort and filter by rating
+-- from the products row instead of aggregating reviews per request.
+
+-- =============================================
+-- CHANGE TRACKING ON REVIEWS
+-- =============================================
+-- updated_at catches edits and approvals; deletions leave a tombstone.
+ALTER TABLE product_reviews ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+
+DROP TRIGGER IF EXISTS update_product_reviews_updated_at ON product_reviews;
+CREATE TRIGGER update_product_reviews_updated_at BEFORE UPDATE ON product_reviews FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE INDEX IF NOT EXISTS idx_reviews_updated ON product_reviews(updated_at);
+
+CREATE TABLE IF NOT EXISTS product_review_deletions (
+  product_id UUID NOT NULL,
+  deleted_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_review_deletions_deleted ON product_review_deletions(deleted_at);
+
+ALTER TABLE product_review_deletions ENABLE ROW LEVEL SECURITY;
+
+-- SECURITY DEFINER: admins delete reviews through RLS ("Admins can delete
+-- reviews" in 003) and have no policy on the tombstone table
+CREATE OR REPLACE FUNCTION record_review_deletion()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF OLD.product_id IS NOT NULL THEN
+    INSERT INTO product_review_deletions (product_id) VALUES (OLD.product_id);
+  END IF;
+  RETURN OLD;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS record_product_review_deletion ON product_reviews;
+CREATE TRIGGER record_product_review_deletion AFTER DELETE ON product_reviews FOR EACH ROW EXECUTE FUNCTION record_review_deletion();
+
+-- Listing pages sort by rating within published products
+CREATE INDEX IF NOT EXISTS idx_products_rating ON products(rating_avg DESC, rating_count DESC) WHERE status = 'published';
+
+-- =============================================
+-- GROUPED QUERY (PostgREST RPC)
+-- =============================================
+-- Newest review change, read before aggregating; becomes the next watermark.
+CREATE OR REPLACE FUNCTION review_changes_watermark()
+RETURNS TIMESTAMPTZ AS $$
+  SELECT GREATEST(
+    (SELECT MAX(updated_at) FROM product_reviews),
+    (SELECT MAX(deleted_at) FROM product_review_deletions)
+  );
+$$ LANGUAGE sql STABLE;
+
+-- Recomputed aggregates for products whose reviews changed at or after
+-- p_since (every product when NULL). Only rows that differ from the stored
+-- values are returned, ordered by product id so callers can page with
+-- Range (PostgREST caps set-returning RPCs at max-rows too). Averages are
+-- over approved reviews, rounded like the DECIMAL(3,2) column; products
+-- without approved reviews get 0 / 0.
+CREATE OR REPLACE FUNCTION rating_aggregate_changes(p_since TIMESTAMPTZ DEFAULT NULL)
+RETURNS TABLE (
+  product_id UUID,
+  rating_avg DECIMAL(3,2),
+  rating_count INTEGER
+) AS $$
+  WITH touched AS (
+    SELECT r.product_id FROM product_reviews r WHERE p_since IS NOT NULL AND r.updated_at >= p_since
+    UNION
+    SELECT d.product_id FROM product_review_deletions d WHERE p_since IS NOT NULL AND d.deleted_at >= p_since
+  ),
+  agg AS (
+    SELECT r.product_id, ROUND(AVG(r.rating), 2) AS avg_rating, COUNT(*)::INTEGER AS reviews
+    FROM product_reviews r
+    WHERE r.is_approved
+      AND (p_since IS NULL OR r.product_id IN (SELECT t.product_id FROM touched t))
+    GROUP BY r.product_id
+  )
+  SELECT p.id, COALESCE(agg.avg_rating, 0)::DECIMAL(3,2), COALESCE(agg.reviews, 0)
+  FROM products p
+  LEFT JOIN agg ON agg.product_id = p.id
+  WHERE (p_since IS NULL OR p.id IN (SELECT t.product_id FROM touched t))
+    AND (p.rating_avg, p.rating_count)
+        IS DISTINCT FROM (COALESCE(agg.avg_rating, 0)::DECIMAL(3,2), COALESCE(agg.reviews, 0))
+  ORDER BY p.id;
+$$ LANGUAGE sql STABLE;
+
+-- =============================================
+-- BATCHED WRITE (PostgREST RPC)
+-- =============================================
+-- p_rows: JSON array of {product_id, rating_avg, rating_count}. One UPDATE
+-- per batch; a plain upsert on products would need every NOT NULL column.
+CREATE OR REPLACE FUNCTION apply_rating_aggregates(p_rows JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+  v_updated INTEGER;
+BEGIN
+  UPDATE products p
+  SET rating_avg = r.rating_avg, rating_count = r.rating_count
+  FROM jsonb_to_recordset(p_rows) AS r(product_id UUID, rating_avg DECIMAL(3,2), rating_count INTEGER)
+  WHERE p.id = r.product_id
+    AND (p.rating_avg, p.rating_count) IS DISTINCT FROM (r.rating_avg, r.rating_count);
+  GET DIAGNOSTICS v_updated = ROW_COUNT;
+  RETURN v_updated;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Tombstones older than the job's watermark are no longer needed
+CREATE OR REPLACE FUNCTION prune_review_deletions(p_before TIMESTAMPTZ)
+RETURNS INTEGER AS $$
+DECLARE
+  v_deleted INTEGER;
+BEGIN
+  DELETE FROM product_review_deletions WHERE deleted_at < p_before;
+  GET DIAGNOSTICS v_deleted = ROW_COUNT;
+  RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Writes are for rating_aggregates.py (service role) only
+REVOKE EXECUTE ON FUNCTION apply_rating_aggregates(JSONB) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION prune_review_deletions(TIMESTAMPTZ) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION apply_rating_aggregates(JSONB) TO service_role;
+GRANT EXECUTE ON FUNCTION prune_review_deletions(TIMESTAMPTZ) TO service_role;
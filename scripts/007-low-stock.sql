@@ -0,0 +1,30 @@
+-- Low-Stock Tracking for the Reorder Report
+-- Run after 001-initial-schema.sql. Used by scripts/low_stock.py.
+--
+-- PostgREST filters cannot compare two columns, so the
+-- stock_quantity <= low_stock_threshold test is a stored generated column
+-- with a partial index: the scanner reads only the low rows, server-side.
+-- stock_updated_at moves only when stock or threshold change (not on every
+-- product edit), which drives the scanner's incremental mode.
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS is_low_stock BOOLEAN
+  GENERATED ALWAYS AS (stock_quantity <= low_stock_threshold) STORED;
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS stock_updated_at TIMESTAMPTZ DEFAULT NOW();
+
+CREATE INDEX IF NOT EXISTS idx_products_low_stock ON products(sku) WHERE is_low_stock;
+CREATE INDEX IF NOT EXISTS idx_products_stock_updated ON products(stock_updated_at);
+
+CREATE OR REPLACE FUNCTION update_stock_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.stock_quantity IS DISTINCT FROM OLD.stock_quantity
+     OR NEW.low_stock_threshold IS DISTINCT FROM OLD.low_stock_threshold THEN
+    NEW.stock_updated_at = NOW();
+  END IF;
+  RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_products_stock_updated_at ON products;
+CREATE TRIGGER update_products_stock_updated_at BEFORE UPDATE ON products FOR EACH ROW EXECUTE FUNCTION update_stock_updated_at_column();
@@ -0,0 +1,37 @@
+-- Storefront Index Fixes
+-- Run after 001-initial-schema.sql. scripts/query_bench.py reports these
+-- findings and measures each index's before/after latency against a loaded
+-- database (e.g. synthetic_data.py output); run it again after applying.
+
+-- =============================================
+-- REDUNDANT INDEXES
+-- =============================================
+-- Each duplicates the index behind a UNIQUE constraint on the same column
+-- (or, for wishlists, is the leading column of UNIQUE(customer_id, product_id)).
+-- They cost a write per insert/update and buy no reads.
+DROP INDEX IF EXISTS idx_products_slug;
+DROP INDEX IF EXISTS idx_customers_email;
+DROP INDEX IF EXISTS idx_categories_slug;
+DROP INDEX IF EXISTS idx_discounts_code;
+DROP INDEX IF EXISTS idx_wishlists_customer;
+
+-- =============================================
+-- MISSING INDEXES
+-- =============================================
+-- Every product page and listing embeds product_images by product_id, and
+-- the bulk importer's merge deletes/reinserts by it; display_order is the
+-- order the storefront renders them in.
+CREATE INDEX IF NOT EXISTS idx_product_images_product ON product_images(product_id, display_order);
+
+-- /api/addresses lists a customer's addresses
+CREATE INDEX IF NOT EXISTS idx_customer_addresses_customer ON customer_addresses(customer_id);
+
+-- Published-by-category listings, newest first (shop filters, related products)
+CREATE INDEX IF NOT EXISTS idx_products_published_category ON products(category_id, created_at DESC) WHERE status = 'published';
+
+-- The default /shop listing: published, newest first, one page at a time
+CREATE INDEX IF NOT EXISTS idx_products_published_newest ON products(created_at DESC) WHERE status = 'published';
+
+-- "My orders", newest first; replaces the single-column index it extends
+CREATE INDEX IF NOT EXISTS idx_orders_customer_created ON orders(customer_id, created_at DESC);
+DROP INDEX IF EXISTS idx_orders_customer;
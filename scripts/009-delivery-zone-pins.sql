@@ -0,0 +1,101 @@
+-- Pin-Code → Delivery-Zone Lookup
+-- Run after 001-initial-schema.sql and 003-rls-policies.sql.
+--
+-- delivery_zones.pin_codes is an array per zone, so finding a checkout pin's
+-- zone means unnesting every zone's array. delivery_zone_pins flattens them
+-- into one row per pin (primary key lookup). A trigger keeps it in step: a
+-- zone insert/update/delete re-resolves only the pins that zone had or has.
+-- scripts/delivery_zone_map.py exports the same map as a static JSON file.
+--
+-- A pin listed by several active zones belongs to the oldest one
+-- (created_at, then id). The '*' entry is the catch-all zone.
+
+-- =============================================
+-- LOOKUP TABLE
+-- =============================================
+CREATE TABLE IF NOT EXISTS delivery_zone_pins (
+  pin_code TEXT PRIMARY KEY,
+  zone_id UUID NOT NULL REFERENCES delivery_zones(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_delivery_zone_pins_zone ON delivery_zone_pins(zone_id);
+
+ALTER TABLE delivery_zone_pins ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Delivery zone pins are viewable by everyone" ON delivery_zone_pins;
+
+CREATE POLICY "Delivery zone pins are viewable by everyone" ON delivery_zone_pins
+  FOR SELECT USING (true);
+
+-- =============================================
+-- FULL REBUILD
+-- =============================================
+CREATE OR REPLACE FUNCTION rebuild_delivery_zone_pins()
+RETURNS INTEGER AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  DELETE FROM delivery_zone_pins;
+  INSERT INTO delivery_zone_pins (pin_code, zone_id)
+  SELECT DISTINCT ON (btrim(pin)) btrim(pin), z.id
+  FROM delivery_zones z, unnest(z.pin_codes) AS pin
+  WHERE z.is_active AND btrim(pin) <> ''
+  ORDER BY btrim(pin), z.created_at, z.id;
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+REVOKE EXECUTE ON FUNCTION rebuild_delivery_zone_pins() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION rebuild_delivery_zone_pins() TO service_role;
+
+-- =============================================
+-- INCREMENTAL MAINTENANCE
+-- =============================================
+-- SECURITY DEFINER: admins edit zones through RLS ("Admins can manage
+-- delivery zones" in 003) and may only read delivery_zone_pins
+CREATE OR REPLACE FUNCTION sync_delivery_zone_pins()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_pins TEXT[] := '{}';
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    v_pins := COALESCE(OLD.pin_codes, '{}');
+    DELETE FROM delivery_zone_pins WHERE zone_id = OLD.id;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    v_pins := v_pins || COALESCE(NEW.pin_codes, '{}');
+  END IF;
+
+  -- Re-resolve just these pins, with the same precedence as the full rebuild
+  INSERT INTO delivery_zone_pins (pin_code, zone_id)
+  SELECT DISTINCT ON (btrim(pin)) btrim(pin), z.id
+  FROM delivery_zones z, unnest(z.pin_codes) AS pin
+  WHERE z.is_active
+    AND btrim(pin) <> ''
+    AND btrim(pin) IN (SELECT btrim(p) FROM unnest(v_pins) AS p)
+  ORDER BY btrim(pin), z.created_at, z.id
+  ON CONFLICT (pin_code) DO UPDATE SET zone_id = EXCLUDED.zone_id;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS sync_delivery_zone_pins ON delivery_zones;
+CREATE TRIGGER sync_delivery_zone_pins AFTER INSERT OR DELETE OR UPDATE OF pin_codes, is_active ON delivery_zones FOR EACH ROW EXECUTE FUNCTION sync_delivery_zone_pins();
+
+-- =============================================
+-- CHECKOUT LOOKUP (PostgREST RPC)
+-- =============================================
+-- At most two primary-key probes: the pin itself, then the '*' catch-all.
+CREATE OR REPLACE FUNCTION delivery_zone_for_pin(p_pin TEXT)
+RETURNS SETOF delivery_zones AS $$
+  SELECT z.*
+  FROM delivery_zone_pins zp
+  JOIN delivery_zones z ON z.id = zp.zone_id
+  WHERE zp.pin_code IN (btrim(p_pin), '*')
+  ORDER BY zp.pin_code = '*'
+  LIMIT 1;
+$$ LANGUAGE sql STABLE;
+
+SELECT rebuild_delivery_zone_pins();
@@ -0,0 +1,98 @@
+-- Product Slug Redirects
+-- Run after 001-initial-schema.sql and 003-rls-policies.sql.
+--
+-- When a product's slug changes (slug-fixer.py, either importer, the admin
+-- UI) the old URL would start returning 404. The trigger below records every
+-- old slug against the product id, so chains (a → b → c) always resolve to
+-- the product's current slug. A slug that goes live again (reused by any
+-- product) stops being a redirect. scripts/slug_redirects.py exports the map
+-- as a static JSON file the product route consults without a query.
+
+-- =============================================
+-- REDIRECT TABLE
+-- =============================================
+CREATE TABLE IF NOT EXISTS product_slug_redirects (
+  old_slug TEXT PRIMARY KEY,
+  product_id UUID NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_slug_redirects_product ON product_slug_redirects(product_id);
+CREATE INDEX IF NOT EXISTS idx_slug_redirects_created ON product_slug_redirects(created_at);
+
+ALTER TABLE product_slug_redirects ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Slug redirects are viewable by everyone" ON product_slug_redirects;
+
+CREATE POLICY "Slug redirects are viewable by everyone" ON product_slug_redirects
+  FOR SELECT USING (true);
+
+-- =============================================
+-- RECORD SLUG CHANGES
+-- =============================================
+-- SECURITY DEFINER: the admin UI updates products through RLS as the
+-- signed-in admin, who may only read product_slug_redirects
+CREATE OR REPLACE FUNCTION record_slug_redirect()
+RETURNS TRIGGER AS $$
+BEGIN
+  -- A live slug is never a redirect
+  DELETE FROM product_slug_redirects WHERE old_slug = NEW.slug;
+
+  IF TG_OP = 'UPDATE' AND OLD.slug IS DISTINCT FROM NEW.slug AND COALESCE(OLD.slug, '') <> '' THEN
+    INSERT INTO product_slug_redirects (old_slug, product_id)
+    VALUES (OLD.slug, NEW.id)
+    ON CONFLICT (old_slug) DO UPDATE SET product_id = EXCLUDED.product_id, created_at = NOW();
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS record_product_slug_redirect ON products;
+CREATE TRIGGER record_product_slug_redirect AFTER INSERT OR UPDATE OF slug ON products FOR EACH ROW EXECUTE FUNCTION record_slug_redirect();
+
+-- =============================================
+-- LOOKUPS (PostgREST RPC)
+-- =============================================
+-- Current slug for an old one (NULL when unknown or not published)
+CREATE OR REPLACE FUNCTION resolve_product_slug(p_slug TEXT)
+RETURNS TEXT AS $$
+  SELECT p.slug
+  FROM product_slug_redirects r
+  JOIN products p ON p.id = r.product_id
+  WHERE r.old_slug = p_slug AND p.status = 'published';
+$$ LANGUAGE sql STABLE;
+
+-- Every redirect to a published product, for the static export
+CREATE OR REPLACE FUNCTION slug_redirect_map()
+RETURNS TABLE (old_slug TEXT, new_slug TEXT) AS $$
+  SELECT r.old_slug, p.slug
+  FROM product_slug_redirects r
+  JOIN products p ON p.id = r.product_id
+  WHERE p.status = 'published' AND r.old_slug <> p.slug
+  ORDER BY r.old_slug;
+$$ LANGUAGE sql STABLE;
+
+-- Backfill (e.g. from slug-fixer JSON logs): p_rows is a JSON array of
+-- {old_slug, product_id}. Slugs that are live, or products that no longer
+-- exist, are skipped.
+CREATE OR REPLACE FUNCTION record_slug_redirects(p_rows JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  INSERT INTO product_slug_redirects (old_slug, product_id)
+  SELECT DISTINCT ON (r.old_slug) r.old_slug, r.product_id
+  FROM jsonb_to_recordset(p_rows) AS r(old_slug TEXT, product_id UUID)
+  JOIN products p ON p.id = r.product_id
+  WHERE COALESCE(r.old_slug, '') <> ''
+    AND r.old_slug <> p.slug
+    AND NOT EXISTS (SELECT 1 FROM products live WHERE live.slug = r.old_slug)
+  ORDER BY r.old_slug
+  ON CONFLICT (old_slug) DO NOTHING;
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+REVOKE EXECUTE ON FUNCTION record_slug_redirects(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION record_slug_redirects(JSONB) TO service_role;
@@ -0,0 +1,31 @@
+-- Stock-Only Sync
+-- Run after 001-initial-schema.sql. Used by populate_supabase.py stock-sync.
+--
+-- Writes just stock_quantity by product id. An upsert of prefetched rows
+-- would need every NOT NULL column and overwrite names, slugs and prices
+-- edited between the fetch and the write.
+
+-- =============================================
+-- BATCHED WRITE (PostgREST RPC)
+-- =============================================
+-- p_rows: JSON array of {id, stock_quantity}. One UPDATE per batch; rows
+-- already at that quantity are not touched.
+CREATE OR REPLACE FUNCTION apply_stock_levels(p_rows JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+  v_updated INTEGER;
+BEGIN
+  UPDATE products p
+  SET stock_quantity = r.stock_quantity
+  FROM jsonb_to_recordset(p_rows) AS r(id UUID, stock_quantity INTEGER)
+  WHERE p.id = r.id
+    AND r.stock_quantity IS NOT NULL
+    AND p.stock_quantity IS DISTINCT FROM r.stock_quantity;
+  GET DIAGNOSTICS v_updated = ROW_COUNT;
+  RETURN v_updated;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Service role only
+REVOKE EXECUTE ON FUNCTION apply_stock_levels(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION apply_stock_levels(JSONB) TO service_role;
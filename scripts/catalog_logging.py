@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Catalog Logging - levels, JSON-lines sink and a progress bar for the catalog tools
+
+Per-row print() calls made large imports and slug fixes stdout-bound
+(especially on Windows consoles and when piped). The tools log through the
+standard `logging` module instead:
+
+- Console: buffered, flushed at most every 0.5s (and immediately on errors),
+  so thousands of DEBUG/INFO lines cost one write each flush, not one each
+- Per-row events are DEBUG (hidden by default); warnings/errors stay visible
+- Progress bar with rows/sec and ETA; the console redraws it under new
+  log lines. When stdout is not a terminal a plain progress line is logged
+  every few seconds instead of carriage-return redraws.
+- JSON-lines sink: every event at DEBUG and up, with its structured fields
+  (`extra=`), for monitoring. Written through a regular buffered file.
+
+Configuration (arguments or environment):
+    CATALOG_LOG_LEVEL=DEBUG|INFO|WARNING|ERROR   console level (default INFO)
+    CATALOG_LOG_JSON=logs/import.jsonl           JSON-lines file (default: off)
+
+Usage:
+    from catalog_logging import configure_logging, get_logger, progress
+
+    configure_logging()
+    log = get_logger("importer")
+    with progress(total=len(rows), label="Importing") as bar:
+        for row in rows:
+            log.debug("✓ Created product: %s", name, extra={"event": "created", "sku": sku})
+            bar.advance(created=1)
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, Optional
+
+ROOT_LOGGER        = "catalog"
+FLUSH_INTERVAL     = 0.5     # seconds between console flushes
+BUFFER_CAPACITY    = 1000    # lines buffered before a forced flush
+REDRAW_INTERVAL    = 0.2     # seconds between progress bar redraws (TTY)
+PLAIN_INTERVAL     = 5.0     # seconds between progress lines (non-TTY)
+BAR_WIDTH          = 24
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        event.update({k: v for k, v in record.__dict__.items() if k not in _RECORD_ATTRS})
+        if record.exc_info:
+            event["exc"] = self.formatException(record.exc_info)
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+class JsonLinesHandler(logging.FileHandler):
+    """FileHandler that leaves flushing to the file buffer (no flush per record)"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        super().__init__(path, mode="a", encoding="utf-8")
+        self.setFormatter(JsonLinesFormatter())
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.stream.write(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+
+class ConsoleHandler(logging.Handler):
+    """Buffered console output that keeps the active progress bar on the last line"""
+
+    def __init__(self, stream=None):
+        super().__init__()
+        self.stream = stream or sys.stdout
+        self.tty = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        self.bar: Optional["ProgressBar"] = None
+        self.bar_drawn = False
+        self.setFormatter(logging.Formatter("%(message)s"))
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        self.acquire()
+        try:
+            self.buffer.append(line)
+        finally:
+            self.release()
+        now = time.monotonic()
+        if record.levelno >= logging.ERROR or len(self.buffer) >= BUFFER_CAPACITY \
+                or now - self.last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self, redraw: bool = True):
+        self.acquire()
+        try:
+            parts = []
+            if self.buffer or redraw:
+                if self.bar_drawn:
+                    parts.append("\r\033[K")
+                    self.bar_drawn = False
+                parts.extend(line + "\n" for line in self.buffer)
+                self.buffer.clear()
+            if redraw and self.bar is not None and self.tty:
+                parts.append(self.bar.render())
+                self.bar_drawn = True
+            if parts:
+                self.stream.write("".join(parts))
+                self.stream.flush()
+            self.last_flush = time.monotonic()
+        finally:
+            self.release()
+
+    def close(self):
+        self.bar = None
+        self.flush(redraw=False)
+        super().close()
+
+
+class ProgressBar:
+    """rows/sec + ETA; drawn by the console handler, so log lines never tear it"""
+
+    def __init__(self, total: Optional[int], label: str, console: Optional[ConsoleHandler]):
+        self.total = total
+        self.label = label
+        self.console = console
+        self.done = 0
+        self.counters: Dict[str, int] = {}
+        self.started = time.monotonic()
+        self.last_draw = self.started
+
+    def advance(self, n: int = 1, **counters: int):
+        self.done += n
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        now = time.monotonic()
+        if self.console is None:
+            return
+        if self.console.tty:
+            if now - self.last_draw >= REDRAW_INTERVAL:
+                self.last_draw = now
+                self.console.flush()
+        elif now - self.last_draw >= PLAIN_INTERVAL:
+            self.last_draw = now
+            logging.getLogger(ROOT_LOGGER).info(self.render())
+
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def render(self) -> str:
+        rate = self.rate()
+        counters = "  ".join(f"{k} {v}" for k, v in self.counters.items())
+        if self.total:
+            frac = min(self.done / self.total, 1.0)
+            filled = int(frac * BAR_WIDTH)
+            eta = (self.total - self.done) / rate if rate > 0 else 0
+            return (f"{self.label} [{'#' * filled}{'.' * (BAR_WIDTH - filled)}] {self.done}/{self.total} "
+                    f"{frac:4.0%}  {rate:.1f} rows/s  ETA {int(eta) // 60}:{int(eta) % 60:02d}  {counters}").rstrip()
+        return f"{self.label} {self.done} rows  {rate:.1f} rows/s  {counters}".rstrip()
+
+    def __enter__(self) -> "ProgressBar":
+        if self.console is not None:
+            self.console.bar = self
+        return self
+
+    def __exit__(self, *exc):
+        if self.console is not None:
+            self.console.bar = None
+        logging.getLogger(ROOT_LOGGER).info(
+            f"{self.label}: {self.done} rows in {time.monotonic() - self.started:.1f}s ({self.rate():.1f} rows/s)",
+            extra={"event": "progress_done", "rows": self.done, "counters": dict(self.counters)},
+        )
+        # Leave the console clean for the print()-based summaries that follow
+        flush_logs()
+        return False
+
+
+_console: Optional[ConsoleHandler] = None
+
+
+def configure_logging(level: Optional[str] = None, json_path: Optional[str] = None) -> logging.Logger:
+    """Set up the console (+ optional JSON-lines) handlers once per process"""
+    global _console
+    root = logging.getLogger(ROOT_LOGGER)
+    level = (level or os.environ.get("CATALOG_LOG_LEVEL") or "INFO").upper()
+    json_path = json_path or os.environ.get("CATALOG_LOG_JSON")
+
+    if _console is None:
+        _console = ConsoleHandler()
+        root.addHandler(_console)
+        root.propagate = False
+    _console.setLevel(level)
+
+    if json_path and not any(isinstance(h, JsonLinesHandler) for h in root.handlers):
+        sink = JsonLinesHandler(json_path)
+        sink.setLevel(logging.DEBUG)
+        root.addHandler(sink)
+
+    # Records are only built when some handler wants them
+    root.setLevel(min(h.level for h in root.handlers))
+    return root
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def progress(total: Optional[int] = None, label: str = "Progress") -> ProgressBar:
+    return ProgressBar(total, label, _console)
+
+
+def flush_logs():
+    for handler in logging.getLogger(ROOT_LOGGER).handlers:
+        handler.flush()
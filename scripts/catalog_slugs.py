@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Catalog Slugs - slug rules shared by the importers, slug-fixer.py and the
+offline validator
+
+No third-party imports, so validate_catalog.py stays runnable without the
+Supabase client installed.
+
+- slugify             the importers' slug for a name (product/category/brand)
+- create_proper_slug  slug-fixer.py's URL-safe slug (slashes, symbols, accents)
+- is_slug_valid       the checks slug-fixer.py uses to decide what to fix
+"""
+
+import re
+from typing import List, Tuple
+
+
+def slugify(text: str) -> str:
+    """Convert text to URL-friendly slug"""
+    if not text:
+        return ""
+    text = text.lower().strip()
+    text = re.sub(r'[^\w\s-]', '', text)
+    text = re.sub(r'[-\s]+', '-', text)
+    return text
+
+
+def create_proper_slug(text: str) -> str:
+    """
+    Create a proper URL-safe slug from any text
+
+    Handles:
+    - Spaces → hyphens
+    - Slashes (/) → hyphens
+    - Special chars → removed or converted
+    - Multiple hyphens → single hyphen
+    - Leading/trailing hyphens → removed
+    - Uppercase → lowercase
+    - Accented characters → ASCII equivalents
+    """
+    if not text:
+        return ""
+
+    # Convert to lowercase
+    slug = text.lower()
+
+    # Replace common special characters with meaningful equivalents
+    replacements = {
+        '&': 'and',
+        '+': 'plus',
+        '@': 'at',
+        '%': 'percent',
+        '#': 'number',
+        '₹': 'rs',
+        '$': 'dollar',
+        '€': 'euro',
+        '£': 'pound',
+    }
+
+    for char, replacement in replacements.items():
+        slug = slug.replace(char, f'-{replacement}-')
+
+    # Replace slashes, backslashes, and other separators with hyphens
+    slug = re.sub(r'[/\\|_\s]+', '-', slug)
+
+    # Remove all characters that aren't alphanumeric or hyphens
+    slug = re.sub(r'[^a-z0-9-]', '', slug)
+
+    # Replace multiple consecutive hyphens with single hyphen
+    slug = re.sub(r'-+', '-', slug)
+
+    # Remove leading and trailing hyphens
+    slug = slug.strip('-')
+
+    # Ensure slug is not empty
+    if not slug:
+        slug = 'product'
+
+    return slug
+
+def is_slug_valid(slug: str) -> Tuple[bool, List[str]]:
+    """
+    Check if a slug is valid and return issues if any
+
+    Returns: (is_valid, list_of_issues)
+    """
+    issues = []
+
+    if not slug:
+        issues.append("Empty slug")
+        return False, issues
+
+    # Check for invalid characters
+    if '/' in slug:
+        issues.append("Contains forward slash (/)")
+    if '\\' in slug:
+        issues.append("Contains backslash (\\)")
+    if ' ' in slug:
+        issues.append("Contains spaces")
+    if slug != slug.lower():
+        issues.append("Contains uppercase letters")
+
+    # Check for special characters
+    invalid_chars = re.findall(r'[^a-z0-9-]', slug)
+    if invalid_chars:
+        unique_chars = list(set(invalid_chars))
+        issues.append(f"Contains invalid chars: {', '.join(unique_chars)}")
+
+    # Check for multiple consecutive hyphens
+    if '--' in slug:
+        issues.append("Contains consecutive hyphens (--)")
+
+    # Check for leading/trailing hyphens
+    if slug.startswith('-'):
+        issues.append("Starts with hyphen")
+    if slug.endswith('-'):
+        issues.append("Ends with hyphen")
+
+    is_valid = len(issues) == 0
+    return is_valid, issues
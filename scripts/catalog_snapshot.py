@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Catalog Snapshot - export, diff and restore the catalog as Parquet
+
+Pages through categories, brands, products and product_images once and
+writes a zstd-compressed Parquet file per table, so backups, audits and
+"what changed since yesterday" run locally in seconds instead of through
+repeated REST scans.
+
+    snapshots/20261019T0930Z/
+      snapshot.json          created_at, source, row counts
+      categories.parquet
+      brands.parquet
+      products.parquet
+      product_images.parquet
+
+Usage:
+    pip install pyarrow pandas
+
+    python catalog_snapshot.py export                      # → snapshots/<UTC timestamp>
+    python catalog_snapshot.py export --name before-import
+    python catalog_snapshot.py diff snapshots/A snapshots/B [--json diff.json]
+    python catalog_snapshot.py restore snapshots/A --dry-run
+    python catalog_snapshot.py restore snapshots/A --prune  # also delete rows not in the snapshot
+
+Restore upserts by primary key in FK order (categories → brands → products →
+product_images), so ids and references are preserved. Batches are separate
+requests, not one transaction, so before writing anything restore looks for
+live rows that hold a snapshot row's sku/slug under another id (e.g. a
+product deleted and re-imported since the snapshot) and refuses to start if
+any would fail an upsert halfway. Rows outside the snapshot are fine with
+--prune, which deletes them first; --dry-run lists every collision.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+REPO_ROOT        = Path(__file__).resolve().parent.parent
+DEFAULT_DIR      = REPO_ROOT / "snapshots"
+PAGE_SIZE        = 1000
+BATCH_SIZE       = 500
+COMPRESSION      = "zstd"
+SNAPSHOT_VERSION = 1
+
+# table → (label column for reports, {column: type}); timestamps stay ISO strings
+TABLES: Dict[str, tuple] = {
+    "categories": ("slug", {
+        "id": "str", "name": "str", "slug": "str", "description": "str", "image_url": "str",
+        "parent_id": "str", "display_order": "int", "is_active": "bool",
+        "created_at": "str", "updated_at": "str",
+    }),
+    "brands": ("slug", {
+        "id": "str", "name": "str", "slug": "str", "logo_url": "str", "is_active": "bool", "created_at": "str",
+    }),
+    "products": ("sku", {
+        "id": "str", "sku": "str", "name": "str", "slug": "str", "description": "str",
+        "short_description": "str", "category_id": "str", "brand_id": "str",
+        "retail_price": "float", "wholesale_price": "float", "cost_price": "float",
+        "min_wholesale_qty": "int", "stock_quantity": "int", "low_stock_threshold": "int",
+        "weight": "float", "ingredients": "str", "usage_instructions": "str", "tags": "list",
+        "status": "str", "is_featured": "bool", "rating_avg": "float", "rating_count": "int",
+        "created_at": "str", "updated_at": "str",
+    }),
+    "product_images": ("image_url", {
+        "id": "str", "product_id": "str", "image_url": "str", "alt_text": "str",
+        "display_order": "int", "is_primary": "bool", "created_at": "str",
+    }),
+}
+RESTORE_ORDER = ["categories", "brands", "products", "product_images"]
+
+# UNIQUE columns besides the primary key (001-initial-schema.sql)
+UNIQUE_COLUMNS = {"categories": ("slug",), "brands": ("slug",), "products": ("sku", "slug")}
+
+
+def _require_arrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError("pyarrow is required: pip install pyarrow pandas")
+
+
+def arrow_schema(table: str):
+    import pyarrow as pa
+    types = {"str": pa.string(), "int": pa.int64(), "float": pa.float64(),
+             "bool": pa.bool_(), "list": pa.list_(pa.string())}
+    return pa.schema([(col, types[kind]) for col, kind in TABLES[table][1].items()])
+
+
+def page_rows(client, table: str, columns: str = "*") -> Iterator[List[Dict]]:
+    """Pages of rows ordered by primary key"""
+    offset = 0
+    while True:
+        rows = client.table(table).select(columns).order("id").range(offset, offset + PAGE_SIZE - 1).execute().data or []
+        if rows:
+            yield rows
+        if len(rows) < PAGE_SIZE:
+            return
+        offset += PAGE_SIZE
+
+
+def export_snapshot(client, target: Path, source: str = "") -> Dict:
+    """Stream every catalog table into <target>/<table>.parquet (one page in memory at a time)"""
+    _require_arrow()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    started = time.perf_counter()
+    target.mkdir(parents=True, exist_ok=True)
+    counts: Dict[str, int] = {}
+
+    print(f"\n{'='*60}")
+    print(f"SNAPSHOT EXPORT → {target}")
+    print(f"{'='*60}")
+    for table in RESTORE_ORDER:
+        schema = arrow_schema(table)
+        columns = list(TABLES[table][1])
+        counts[table] = 0
+        with pq.ParquetWriter(target / f"{table}.parquet", schema, compression=COMPRESSION) as writer:
+            for rows in page_rows(client, table, ", ".join(columns)):
+                writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+                counts[table] += len(rows)
+        print(f"✓ {table}: {counts[table]} rows")
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "source": source,
+        "rows": counts,
+    }
+    (target / "snapshot.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    size = sum(p.stat().st_size for p in target.glob("*.parquet"))
+    print(f"⏱  {time.perf_counter() - started:.2f}s, {size / 1024:.0f} KB on disk")
+    print(f"{'='*60}\n")
+    return meta
+
+
+def read_table(snapshot: Path, table: str):
+    """Snapshot table as a DataFrame indexed by id (list columns as JSON strings for comparison)"""
+    import pyarrow.parquet as pq
+    df = pq.read_table(snapshot / f"{table}.parquet").to_pandas()
+    for col, kind in TABLES[table][1].items():
+        if kind == "list" and col in df.columns:
+            df[col] = df[col].map(lambda v: None if v is None else json.dumps(list(v)))
+    return df.set_index("id")
+
+
+def diff_table(old, new, label: str, sample: int = 20) -> Dict:
+    added = new.index.difference(old.index)
+    removed = old.index.difference(new.index)
+    common = old.index.intersection(new.index)
+    a, b = old.loc[common], new.loc[common]
+
+    changed_any = None
+    columns: Dict[str, int] = {}
+    for col in a.columns.intersection(b.columns):
+        differs = ~((a[col] == b[col]) | (a[col].isna() & b[col].isna()))
+        if differs.any():
+            columns[col] = int(differs.sum())
+            changed_any = differs if changed_any is None else changed_any | differs
+    changed = common[changed_any.to_numpy()] if changed_any is not None else common[:0]
+
+    return {
+        "added": len(added),
+        "removed": len(removed),
+        "changed": len(changed),
+        "columns": dict(sorted(columns.items(), key=lambda kv: -kv[1])),
+        "samples": {
+            "added": new.loc[added[:sample], label].tolist(),
+            "removed": old.loc[removed[:sample], label].tolist(),
+            "changed": new.loc[changed[:sample], label].tolist(),
+        },
+    }
+
+
+def diff_snapshots(old: Path, new: Path) -> Dict:
+    _require_arrow()
+    started = time.perf_counter()
+    report = {"old": str(old), "new": str(new), "tables": {}}
+    for table in RESTORE_ORDER:
+        report["tables"][table] = diff_table(read_table(old, table), read_table(new, table), TABLES[table][0])
+    report["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
+
+
+def print_diff(report: Dict):
+    print(f"\n{'='*60}")
+    print(f"SNAPSHOT DIFF: {report['old']} → {report['new']}")
+    print(f"{'='*60}")
+    for table, d in report["tables"].items():
+        print(f"  {table}: +{d['added']} -{d['removed']} ~{d['changed']}")
+        for col, n in d["columns"].items():
+            print(f"      {col}: {n}")
+        for kind in ("added", "removed", "changed"):
+            if d["samples"][kind]:
+                print(f"    {kind}: {', '.join(map(str, d['samples'][kind][:5]))}"
+                      f"{' ...' if d[kind] > 5 else ''}")
+    print(f"⏱  {report['elapsed_ms']} ms")
+    print(f"{'='*60}\n")
+
+
+def _parents_first(rows: List[Dict]) -> List[Dict]:
+    """Order categories so every parent is written before its children"""
+    by_id = {r["id"]: r for r in rows}
+    ordered, done = [], set()
+
+    def visit(row, depth=0):
+        if row["id"] in done or depth > len(rows):
+            return
+        parent = by_id.get(row.get("parent_id"))
+        if parent is not None:
+            visit(parent, depth + 1)
+        done.add(row["id"])
+        ordered.append(row)
+
+    for row in rows:
+        visit(row)
+    return ordered
+
+
+def find_collisions(client, snapshot: Path, snapshot_ids: Dict[str, set]) -> Dict[str, List[Dict]]:
+    """Live rows holding a snapshot row's UNIQUE value (sku/slug) under a different id"""
+    import pyarrow.parquet as pq
+
+    collisions: Dict[str, List[Dict]] = {}
+    for table, columns in UNIQUE_COLUMNS.items():
+        owners = {}
+        for row in pq.read_table(snapshot / f"{table}.parquet", columns=["id", *columns]).to_pylist():
+            owners.update(((col, row[col]), row["id"]) for col in columns)
+        found = collisions[table] = []
+        for rows in page_rows(client, table, ", ".join(["id", *columns])):
+            for row in rows:
+                for col in columns:
+                    owner = owners.get((col, row[col]))
+                    if owner is not None and owner != row["id"]:
+                        found.append({"column": col, "value": row[col], "live_id": row["id"],
+                                      "snapshot_id": owner, "in_snapshot": row["id"] in snapshot_ids[table]})
+    return collisions
+
+
+def restore_snapshot(client, snapshot: Path, dry_run: bool = False, prune: bool = False) -> Dict[str, int]:
+    """
+    Upsert every snapshot row by id (FK order); with prune, first delete rows
+    absent from the snapshot. Refuses to write when a live row would make an
+    upsert fail on sku/slug (see find_collisions).
+    """
+    _require_arrow()
+    import pyarrow.parquet as pq
+
+    started = time.perf_counter()
+    written: Dict[str, int] = {}
+    print(f"\n{'='*60}")
+    print(f"SNAPSHOT RESTORE ← {snapshot}{' (DRY RUN)' if dry_run else ''}")
+    print(f"{'='*60}")
+
+    snapshot_ids = {table: set(pq.read_table(snapshot / f"{table}.parquet", columns=["id"]).column("id").to_pylist())
+                    for table in RESTORE_ORDER}
+
+    # Rows outside the snapshot are deleted by --prune before any upsert;
+    # anything else would fail mid-restore
+    blocking = shown = 0
+    for table, found in find_collisions(client, snapshot, snapshot_ids).items():
+        for c in found:
+            resolved = prune and not c["in_snapshot"]
+            blocking += not resolved
+            shown += 1
+            if shown <= 20:
+                print(f"  {'⊘' if resolved else '✗'} {table}.{c['column']} {c['value']!r}: live {c['live_id']} "
+                      f"vs snapshot {c['snapshot_id']}{' (pruned first)' if resolved else ''}")
+    if shown > 20:
+        print(f"  ... {shown - 20} more collisions")
+    if blocking:
+        message = (f"{blocking} sku/slug collisions with live rows"
+                   f"{'' if prune else ' (--prune deletes the ones outside the snapshot)'}")
+        if not dry_run:
+            raise RuntimeError(f"refusing to restore: {message}")
+        print(f"✗ Restore would refuse: {message}")
+
+    if prune:
+        # Children first so ON DELETE actions never touch rows we still need
+        for table in reversed(RESTORE_ORDER):
+            stale = [r["id"] for rows in page_rows(client, table, "id") for r in rows
+                     if r["id"] not in snapshot_ids[table]]
+            for start in range(0, len(stale), BATCH_SIZE):
+                if not dry_run:
+                    client.table(table).delete().in_("id", stale[start:start + BATCH_SIZE]).execute()
+            print(f"✓ {table}: {len(stale)} rows not in snapshot {'would be ' if dry_run else ''}deleted")
+
+    for table in RESTORE_ORDER:
+        parquet = pq.ParquetFile(snapshot / f"{table}.parquet")
+        written[table] = 0
+        if table == "categories":
+            batches = [_parents_first(parquet.read().to_pylist())]
+        else:
+            batches = (batch.to_pylist() for batch in parquet.iter_batches(batch_size=BATCH_SIZE))
+        for rows in batches:
+            for start in range(0, len(rows), BATCH_SIZE):
+                batch = rows[start:start + BATCH_SIZE]
+                if not dry_run:
+                    client.table(table).upsert(batch, on_conflict="id").execute()
+                written[table] += len(batch)
+        print(f"✓ {table}: {written[table]} rows {'would be ' if dry_run else ''}upserted")
+
+    print(f"⏱  {time.perf_counter() - started:.2f}s")
+    print(f"{'='*60}\n")
+    return written
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Catalog snapshots (Parquet): export, diff, restore")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="Write a snapshot of the live catalog")
+    export.add_argument("--dir", type=Path, default=DEFAULT_DIR, help="Snapshots directory")
+    export.add_argument("--name", help="Snapshot name (default: UTC timestamp)")
+
+    diff = sub.add_parser("diff", help="Compare two snapshots locally")
+    diff.add_argument("old", type=Path)
+    diff.add_argument("new", type=Path)
+    diff.add_argument("--json", help="Write the diff report to this file")
+
+    restore = sub.add_parser("restore", help="Bulk-load a snapshot into the database")
+    restore.add_argument("snapshot", type=Path)
+    restore.add_argument("--dry-run", action="store_true", help="Read and count, write nothing")
+    restore.add_argument("--prune", action="store_true", help="First delete rows that are not in the snapshot")
+    args = parser.parse_args()
+
+    from supabase_access import SUPABASE_URL, create_supabase_client, print_request_stats
+
+    try:
+        if args.command == "export":
+            name = args.name or time.strftime("%Y%m%dT%H%MZ", time.gmtime())
+            export_snapshot(create_supabase_client(), args.dir / name, source=SUPABASE_URL)
+        elif args.command == "diff":
+            report = diff_snapshots(args.old, args.new)
+            print_diff(report)
+            if args.json:
+                with open(args.json, "w", encoding="utf-8") as f:
+                    json.dump(report, f, indent=2)
+                print(f"📝 Diff → {args.json}\n")
+        else:
+            restore_snapshot(create_supabase_client(), args.snapshot, dry_run=args.dry_run, prune=args.prune)
+    except ImportError as e:
+        parser.exit(1, f"❌ {e}\n")
+    except Exception as e:
+        print(f"\n✗ {args.command} failed: {str(e)}\n")
+        sys.exit(1)
+    finally:
+        print_request_stats()
+
+
+if __name__ == "__main__":
+    main()
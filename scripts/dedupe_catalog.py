@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Catalog Dedupe - find duplicate and near-duplicate products
+
+products.csv holds the same product under different SKUs with slightly
+different names ("YC MILK F/WASH 100ML" vs "Yc Milk F/Wash 100 ml"). This
+tool normalizes brand + name, builds a MinHash/LSH index over character
+3-grams and only compares products that share an LSH bucket, so the whole
+catalog is checked in near-linear time instead of O(n²) pairwise.
+
+Pipeline:
+1. normalize: lowercase, unify units (100ML / 100 ml / 100 Ml → 100ml),
+   expand ERP abbreviations (f/wash → face wash), drop punctuation
+2. exact groups: identical normalized key → duplicates straight away
+3. MinHash (NumPy, 60 permutations) + LSH banding → candidate pairs
+4. verify: shingle Jaccard ≥ threshold AND identical pack sizes
+   (100ml vs 200ml is a different product, not a duplicate)
+5. union-find clusters → merge suggestions (keep the most complete row)
+
+Usage:
+    pip install numpy
+
+    python dedupe_catalog.py products.csv
+    python dedupe_catalog.py products.csv --threshold 0.75 --output suggestions.json
+"""
+
+import csv
+import json
+import re
+import time
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+BANDS = 10
+ROWS = 6                    # 10 bands × 6 rows: pairs with Jaccard ≥ 0.8 collide ~95% of the time
+NUM_PERM = BANDS * ROWS
+MAX_BUCKET = 50             # ignore giant buckets (generic names) to stay near-linear
+DEFAULT_THRESHOLD = 0.8
+SHINGLE = 3
+MERSENNE_PRIME = (1 << 31) - 1  # a·x + b stays below 2^63 in uint64
+SIGNATURE_CHUNK = 5000
+
+ABBREVIATIONS = {
+    'f/wash': 'face wash',
+    'b/wash': 'body wash',
+    'b/lotion': 'body lotion',
+    'b/l': 'body lotion',
+    'h/oil': 'hair oil',
+    'h/cream': 'hair cream',
+    's/mois': 'skin moisturizer',
+    'deo': 'deodorant',
+}
+
+UNIT_ALIASES = {
+    'ml': 'ml', 'mls': 'ml',
+    'l': 'l', 'ltr': 'l', 'ltrs': 'l', 'litre': 'l', 'liter': 'l',
+    'g': 'g', 'gm': 'g', 'gms': 'g', 'gr': 'g', 'grm': 'g', 'gram': 'g', 'grams': 'g',
+    'kg': 'kg', 'mg': 'mg', 'oz': 'oz',
+    'pc': 'pcs', 'pcs': 'pcs',
+}
+
+_UNIT_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(' + '|'.join(sorted(UNIT_ALIASES, key=len, reverse=True)) + r')\b')
+# Whole words only: 'deo' must not match inside 'deodorant', nor 'b/l' inside 'herb/leaf'
+_ABBR_RE = re.compile(r'\b(?:' + '|'.join(re.escape(a) for a in sorted(ABBREVIATIONS, key=len, reverse=True)) + r')\b')
+_SPLIT_RE = re.compile(r'[^a-z0-9.]+')
+_SIZE_RE = re.compile(r'\d+(?:\.\d+)?[a-z]+')
+
+
+def normalize_name(text: str) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Normalized product text and its pack sizes.
+
+    "YC MILK F/WASH 100 ML" → ("yc milk face wash 100ml", ("100ml",))
+
+    Abbreviations expand as whole words only (python -m doctest dedupe_catalog.py):
+
+    >>> normalize_name('AXE DEO 150ML') == normalize_name('AXE DEODORANT 150 ml')
+    True
+    >>> normalize_name('AXE DEODORANT 150ML')
+    ('axe deodorant 150ml', ('150ml',))
+    >>> normalize_name('Herb/Leaf cream')
+    ('herb leaf cream', ())
+    """
+    text = (text or '').lower()
+    text = _ABBR_RE.sub(lambda m: ABBREVIATIONS[m.group(0)], text)
+    text = _UNIT_RE.sub(lambda m: f" {float(m.group(1)):g}{UNIT_ALIASES[m.group(2)]} ", text)
+    tokens = [t.strip('.') for t in _SPLIT_RE.split(text)]
+    tokens = [t for t in tokens if t]
+    sizes = tuple(sorted(t for t in tokens if _SIZE_RE.fullmatch(t)))
+    return ' '.join(tokens), sizes
+
+
+def shingles(text: str, k: int = SHINGLE) -> Set[int]:
+    """crc32 hashes of the character k-grams (spaces removed)"""
+    compact = text.replace(' ', '')
+    if len(compact) <= k:
+        return {zlib.crc32(compact.encode())}
+    return {zlib.crc32(compact[i:i + k].encode()) for i in range(len(compact) - k + 1)}
+
+
+class UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+class CatalogDeduper:
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, seed: int = 1):
+        import numpy as np
+        self.np = np
+        self.threshold = threshold
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, MERSENNE_PRIME, NUM_PERM, dtype=np.uint64)
+        self.b = rng.integers(0, MERSENNE_PRIME, NUM_PERM, dtype=np.uint64)
+        self.band_mix = rng.integers(1, 2 ** 63, ROWS, dtype=np.uint64) | np.uint64(1)
+
+        self.products: List[Dict] = []
+        self.keys: List[str] = []
+        self.sizes: List[Tuple[str, ...]] = []
+        self.shingle_sets: List[Set[int]] = []
+
+    def add(self, product: Dict):
+        key, sizes = normalize_name(f"{product.get('brand', '')} {product.get('name', '')}")
+        self.products.append(product)
+        self.keys.append(key)
+        self.sizes.append(sizes)
+        self.shingle_sets.append(shingles(key))
+
+    def signatures(self, start: int, stop: int):
+        """MinHash signatures for products[start:stop] in one vectorized pass"""
+        np = self.np
+        sets = self.shingle_sets[start:stop]
+        lengths = np.fromiter((len(s) for s in sets), dtype=np.int64, count=len(sets))
+        x = np.fromiter((h for s in sets for h in s), dtype=np.uint64, count=int(lengths.sum()))
+        # (a·x + b) mod p for every shingle × permutation, then min per product
+        hashed = (x[:, None] % MERSENNE_PRIME * self.a + self.b) % MERSENNE_PRIME
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        return np.minimum.reduceat(hashed, offsets, axis=0)
+
+    def jaccard(self, i: int, j: int) -> float:
+        a, b = self.shingle_sets[i], self.shingle_sets[j]
+        return len(a & b) / len(a | b) if a and b else 0.0
+
+    def candidate_pairs(self) -> Set[Tuple[int, int]]:
+        """Products whose signatures agree on at least one band (one sort per band, no dict of buckets)"""
+        np = self.np
+        n = len(self.shingle_sets)
+        if n < 2:
+            return set()
+        sigs = np.concatenate([self.signatures(s, s + SIGNATURE_CHUNK) for s in range(0, n, SIGNATURE_CHUNK)])
+        # Collapse each band's ROWS values into one 64-bit key (wrapping multiply-add)
+        keys = (sigs.reshape(n, BANDS, ROWS) * self.band_mix).sum(axis=2, dtype=np.uint64)
+
+        pairs: Set[Tuple[int, int]] = set()
+        for band in range(BANDS):
+            order = np.argsort(keys[:, band], kind='stable')
+            sorted_keys = keys[order, band]
+            bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+            starts = np.concatenate(([0], bounds))
+            sizes = np.diff(np.concatenate((starts, [n])))
+            keep = (sizes > 1) & (sizes <= MAX_BUCKET)
+            for begin, size in zip(starts[keep].tolist(), sizes[keep].tolist()):
+                members = order[begin:begin + size].tolist()
+                for x in range(size):
+                    for y in range(x + 1, size):
+                        pairs.add((members[x], members[y]))
+        return pairs
+
+    def find_duplicates(self) -> List[Dict]:
+        n = len(self.products)
+        uf = UnionFind(n)
+        scores: Dict[Tuple[int, int], float] = {}
+
+        # Exact normalized matches
+        first_by_key: Dict[str, int] = {}
+        for idx, key in enumerate(self.keys):
+            if key in first_by_key:
+                uf.union(first_by_key[key], idx)
+                scores[(first_by_key[key], idx)] = 1.0
+            else:
+                first_by_key[key] = idx
+
+        # Near matches from LSH buckets
+        for i, j in self.candidate_pairs():
+            if self.sizes[i] != self.sizes[j] or uf.find(i) == uf.find(j):
+                continue
+            score = self.jaccard(i, j)
+            if score >= self.threshold:
+                uf.union(i, j)
+                scores[(i, j)] = score
+
+        clusters: Dict[int, List[int]] = defaultdict(list)
+        for idx in range(n):
+            clusters[uf.find(idx)].append(idx)
+
+        suggestions = []
+        for members in clusters.values():
+            if len(members) < 2:
+                continue
+            keep = max(members, key=self.completeness)
+            suggestions.append({
+                'keep': self.products[keep],
+                'merge': [
+                    {**self.products[m], 'similarity': round(self.similarity(keep, m, scores), 3)}
+                    for m in members if m != keep
+                ],
+            })
+        suggestions.sort(key=lambda s: -len(s['merge']))
+        return suggestions
+
+    def similarity(self, i: int, j: int, scores: Dict[Tuple[int, int], float]) -> float:
+        return scores.get((min(i, j), max(i, j))) or self.jaccard(i, j)
+
+    def completeness(self, idx: int) -> Tuple:
+        """Prefer rows with a real SKU, more filled fields, then the earliest row"""
+        product = self.products[idx]
+        sku = product.get('sku', '')
+        filled = sum(1 for v in product.values() if v not in ('', None))
+        return (bool(sku) and not sku.startswith('MOCK-'), filled, -idx)
+
+
+def load_products(csv_file: str) -> List[Dict]:
+    fields = ('sku', 'name', 'brand', 'category', 'retail_price')
+    products = []
+    with open(csv_file, 'r', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
+        reader.fieldnames = [field.strip() if field else field for field in reader.fieldnames]
+        for row_num, row in enumerate(reader, 1):
+            name = (row.get('name') or '').strip()
+            if not name:
+                continue
+            products.append({'row': row_num, **{f: (row.get(f) or '').strip() for f in fields}})
+    return products
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Find duplicate / near-duplicate products")
+    parser.add_argument("csv_file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Minimum 3-gram Jaccard similarity (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--output", help="Write merge suggestions as JSON")
+    parser.add_argument("--limit", type=int, default=20, help="Groups to print")
+    args = parser.parse_args()
+
+    try:
+        deduper = CatalogDeduper(threshold=args.threshold)
+    except ImportError:
+        parser.exit(1, "❌ NumPy is required: pip install numpy\n")
+
+    started = time.perf_counter()
+    for product in load_products(args.csv_file):
+        deduper.add(product)
+    suggestions = deduper.find_duplicates()
+    elapsed = time.perf_counter() - started
+
+    duplicates = sum(len(s['merge']) for s in suggestions)
+    print(f"\n{'='*70}")
+    print(f"DUPLICATE CANDIDATES: {len(suggestions)} groups, {duplicates} rows to merge "
+          f"({len(deduper.products)} products, {elapsed:.2f}s)")
+    print(f"{'='*70}")
+    for group in suggestions[:args.limit]:
+        keep = group['keep']
+        print(f"\n  ✓ keep  row {keep['row']:>5}  [{keep['sku'] or '-'}]  {keep['name']}")
+        for dup in group['merge']:
+            print(f"  ↳ merge row {dup['row']:>5}  [{dup['sku'] or '-'}]  {dup['name']}  ({dup['similarity']:.2f})")
+    if len(suggestions) > args.limit:
+        print(f"\n  ... {len(suggestions) - args.limit} more groups")
+    print()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(suggestions, f, indent=2, ensure_ascii=False)
+        print(f"📝 Suggestions → {args.output}\n")
+
+
+if __name__ == "__main__":
+    main()
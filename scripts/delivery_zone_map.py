@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Delivery Zone Map - flatten delivery_zones.pin_codes into a static pin → zone map
+
+Builds a compact JSON artifact the storefront can load once and answer
+"which zone / delivery charge for this PIN?" with one object lookup instead
+of scanning every zone's pin_codes array:
+
+    {"zones": [{"id", "name", "delivery_charge", "free_delivery_threshold",
+                "estimated_days"}, ...],
+     "fallback": <index of the '*' zone or null>,
+     "pins": {"110001": 0, ...},             # PIN → index into zones
+     "digests": {zone_id: sha256}, "source": sha256}
+
+Precedence matches 009-delivery-zone-pins.sql: inactive zones are skipped
+and a PIN listed by several zones belongs to the oldest (created_at, id).
+
+Incremental: each zone's content is hashed; when no zone was added, removed
+or changed since the existing artifact, nothing is rewritten (the file and
+its ETag stay stable for caching). Otherwise the changed zones are reported
+and the map is rebuilt.
+
+Usage:
+    python delivery_zone_map.py                           # → public/delivery-zones.json
+    python delivery_zone_map.py -o out.json --force
+    python delivery_zone_map.py --verify                  # compare with delivery_zone_pins
+    python delivery_zone_map.py --lookup 560034           # resolve one PIN from the artifact
+"""
+
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "public", "delivery-zones.json")
+PAGE_SIZE      = 1000
+ZONE_FIELDS    = ("id", "name", "delivery_charge", "free_delivery_threshold", "estimated_days")
+ZONE_SELECT    = "id, name, pin_codes, delivery_charge, free_delivery_threshold, estimated_days, is_active, created_at"
+
+
+def zone_digest(zone: Dict) -> str:
+    payload = json.dumps({k: zone.get(k) for k in ZONE_SELECT.split(", ")}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def build_map(zones: List[Dict]) -> Dict:
+    """Flatten zones (any order) into the artifact structure"""
+    active = sorted((z for z in zones if z.get("is_active")), key=lambda z: (z.get("created_at") or "", z["id"]))
+    entries, pins, fallback = [], {}, None
+    for zone in active:
+        index = len(entries)
+        entries.append({k: zone.get(k) for k in ZONE_FIELDS})
+        for pin in zone.get("pin_codes") or []:
+            pin = (pin or "").strip()
+            if pin == "*":
+                fallback = index if fallback is None else fallback
+            elif pin:
+                pins.setdefault(pin, index)
+    digests = {z["id"]: zone_digest(z) for z in zones}
+    source = hashlib.sha256(json.dumps(digests, sort_keys=True).encode()).hexdigest()[:16]
+    return {"zones": entries, "fallback": fallback, "pins": dict(sorted(pins.items())),
+            "digests": digests, "source": source}
+
+
+def lookup(artifact: Dict, pin: str) -> Optional[Dict]:
+    index = artifact["pins"].get(pin.strip(), artifact.get("fallback"))
+    return artifact["zones"][index] if index is not None else None
+
+
+def diff_zones(old: Dict[str, str], new: Dict[str, str]) -> Tuple[List[str], List[str], List[str]]:
+    added = [z for z in new if z not in old]
+    removed = [z for z in old if z not in new]
+    changed = [z for z in new if z in old and old[z] != new[z]]
+    return added, removed, changed
+
+
+def load_artifact(path: str) -> Optional[Dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class DeliveryZoneMap:
+    def __init__(self, client, output: str = DEFAULT_OUTPUT):
+        self.client = client
+        self.output = output
+
+    def fetch_zones(self) -> List[Dict]:
+        return self.client.table("delivery_zones").select(ZONE_SELECT).order("id").execute().data or []
+
+    def fetch_table(self) -> Dict[str, str]:
+        """delivery_zone_pins as PIN → zone_id"""
+        pins, offset = {}, 0
+        while True:
+            rows = (self.client.table("delivery_zone_pins").select("pin_code, zone_id").order("pin_code")
+                    .range(offset, offset + PAGE_SIZE - 1).execute().data or [])
+            pins.update((row["pin_code"], row["zone_id"]) for row in rows)
+            if len(rows) < PAGE_SIZE:
+                return pins
+            offset += PAGE_SIZE
+
+    def run(self, force: bool = False) -> Dict:
+        print(f"\n{'='*60}")
+        print(f"DELIVERY ZONE MAP → {os.path.relpath(self.output)}")
+        print(f"{'='*60}")
+
+        zones = self.fetch_zones()
+        previous = load_artifact(self.output) or {}
+        artifact = build_map(zones)
+        added, removed, changed = diff_zones(previous.get("digests", {}), artifact["digests"])
+
+        if not force and previous.get("source") == artifact["source"]:
+            print(f"✓ Up to date ({len(zones)} zones, {len(previous.get('pins', {}))} pins)")
+            print(f"{'='*60}\n")
+            return previous
+
+        names = {z["id"]: z["name"] for z in zones}
+        for label, ids in (("added", added), ("changed", changed)):
+            for zone_id in ids:
+                print(f"  {label}: {names.get(zone_id, zone_id)}")
+        for zone_id in removed:
+            print(f"  removed: {zone_id}")
+
+        old_pins = {pin: previous["zones"][i]["id"] for pin, i in previous.get("pins", {}).items()} if previous else {}
+        new_pins = {pin: artifact["zones"][i]["id"] for pin, i in artifact["pins"].items()}
+        moved = sum(1 for pin, zone_id in new_pins.items() if old_pins.get(pin) != zone_id)
+        dropped = sum(1 for pin in old_pins if pin not in new_pins)
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.output)), exist_ok=True)
+        tmp = self.output + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, separators=(",", ":"))
+        os.replace(tmp, self.output)
+
+        fallback = artifact["fallback"]
+        print(f"✓ {len(artifact['pins'])} pins in {len(artifact['zones'])} active zones "
+              f"({moved} new/moved, {dropped} removed)"
+              f"{', fallback: ' + artifact['zones'][fallback]['name'] if fallback is not None else ''}")
+        print(f"📝 {os.path.getsize(self.output):,} bytes → {self.output}")
+        print(f"{'='*60}\n")
+        return artifact
+
+    def verify(self, artifact: Dict) -> int:
+        """Differences between the artifact and the trigger-maintained delivery_zone_pins table"""
+        table = self.fetch_table()
+        expected = {pin: artifact["zones"][i]["id"] for pin, i in artifact["pins"].items()}
+        if artifact.get("fallback") is not None:
+            expected["*"] = artifact["zones"][artifact["fallback"]]["id"]
+        mismatched = sorted(pin for pin in expected.keys() | table.keys() if expected.get(pin) != table.get(pin))
+        for pin in mismatched[:20]:
+            print(f"  ✗ {pin}: artifact {expected.get(pin)} / table {table.get(pin)}")
+        print(f"{'✓' if not mismatched else '✗'} delivery_zone_pins: {len(table)} rows, {len(mismatched)} mismatches")
+        return len(mismatched)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Flatten delivery zones into a static pin → zone map")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="Artifact path (default: public/delivery-zones.json)")
+    parser.add_argument("--force", action="store_true", help="Rewrite even when no zone changed")
+    parser.add_argument("--verify", action="store_true", help="Also compare with the delivery_zone_pins table")
+    parser.add_argument("--lookup", metavar="PIN", help="Resolve a PIN from the existing artifact and exit")
+    args = parser.parse_args()
+
+    if args.lookup:
+        artifact = load_artifact(args.output)
+        if artifact is None:
+            parser.exit(1, f"❌ No artifact at {args.output}: run without --lookup first\n")
+        zone = lookup(artifact, args.lookup)
+        print(json.dumps(zone, indent=2) if zone else f"No zone delivers to {args.lookup}")
+        return
+
+    from supabase_access import create_supabase_client, is_configured, print_request_stats
+
+    if not is_configured():
+        parser.exit(1, "❌ Set SUPABASE_URL and SUPABASE_SERVICE_KEY\n")
+
+    try:
+        builder = DeliveryZoneMap(create_supabase_client(), args.output)
+        artifact = builder.run(force=args.force)
+        if args.verify and builder.verify(artifact):
+            sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Delivery zone map failed: {str(e)}\n")
+        sys.exit(1)
+    finally:
+        print_request_stats()
+
+
+if __name__ == "__main__":
+    main()
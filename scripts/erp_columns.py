@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+ERP Column Mapping - derive cost/wholesale/stock from the ERP export columns
+
+The ERP export (products.csv) carries `PURCHASE PRICE (Including tax)`,
+`PURCHASE PRICE (Excluding tax)`, `PROFIT MARGIN` and `OPENING STOCK`, which
+the importer used to ignore. This module maps those columns (configurable)
+and derives, in ONE vectorized pandas pass over the whole file:
+
+- cost_price       = first positive value of `cost_sources` (in order)
+- wholesale_price  = CSV value, or retail_price × (1 - wholesale_discount)
+- stock_quantity   = CSV value, or opening stock
+
+The same pass reports margin anomalies (non-numeric cells such as #DIV/0!,
+cost above retail, wholesale below cost, reported margin not matching the
+prices, and columns whose values look like a different field).
+
+A stock column whose values match the computed margin (in the shipped
+products.csv the `OPENING STOCK` cells hold the margin percentage) is
+ignored: those rows get no derived stock instead of margins as quantities.
+
+Usage:
+    pip install pandas numpy
+
+    python erp_columns.py products.csv                       # anomaly report
+    python erp_columns.py products.csv --mapping map.json --report anomalies.csv
+
+    # In the importer
+    importer = SupabaseImporter(url, key, erp_mapping=DEFAULT_MAPPING)
+
+Mapping file (JSON, merged over DEFAULT_MAPPING):
+    {
+      "columns": {"profit_margin": "OPENING STOCK", "opening_stock": ""},
+      "wholesale_discount": 0.15
+    }
+"""
+
+import copy
+import json
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# Logical field → CSV header
+DEFAULT_MAPPING: Dict = {
+    "columns": {
+        "retail_price":            "retail_price",
+        "wholesale_price":         "wholesale_price",
+        "cost_price":              "cost_price",
+        "purchase_price_incl_tax": "PURCHASE PRICE (Including tax)",
+        "purchase_price_excl_tax": "PURCHASE PRICE (Excluding tax)",
+        "profit_margin":           "PROFIT MARGIN",
+        "opening_stock":           "OPENING STOCK",
+        "stock_quantity":          "stock_quantity",
+    },
+    # Priority order for cost_price
+    "cost_sources": ["cost_price", "purchase_price_excl_tax", "purchase_price_incl_tax"],
+    # Purchase price the reported margin is computed against
+    "margin_base": "purchase_price_excl_tax",
+    # wholesale_price = retail_price × (1 - wholesale_discount) when missing
+    "wholesale_discount": 0.15,
+    # Allowed difference between reported and computed margin, in percentage points
+    "margin_tolerance": 1.0,
+}
+
+NUMERIC_FIELDS = tuple(DEFAULT_MAPPING["columns"].keys())
+
+
+def load_mapping(path: Optional[str] = None) -> Dict:
+    """DEFAULT_MAPPING, optionally overridden by a JSON file"""
+    mapping = copy.deepcopy(DEFAULT_MAPPING)
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            override = json.load(f)
+        mapping["columns"].update(override.pop("columns", {}))
+        mapping.update(override)
+    return mapping
+
+
+def _fmt(series, decimals: int):
+    """Numbers → CSV strings ('' for missing) so importer helpers parse them as before"""
+    rounded = series.round(decimals)
+    text = rounded.astype("Int64").astype(str) if decimals == 0 else rounded.astype(str)
+    return text.where(rounded.notna(), "")
+
+
+def read_frame(csv_file: str):
+    """Read the CSV as strings with stripped headers and cells"""
+    import pandas as pd
+    df = pd.read_csv(csv_file, dtype=str, keep_default_na=False, skipinitialspace=True)
+    df.columns = [c.strip() for c in df.columns]
+    for col in df.columns:
+        df[col] = df[col].str.strip()
+    return df
+
+
+def derive(df, mapping: Dict = DEFAULT_MAPPING) -> Tuple[object, object]:
+    """
+    Vectorized derivation + anomaly detection over the whole frame.
+
+    Returns: (frame with cost_price/wholesale_price/stock_quantity filled in,
+              anomalies frame with row_num, sku, name, issue, detail)
+    """
+    import numpy as np
+    import pandas as pd
+
+    columns = mapping["columns"]
+    raw = {}
+    num = {}
+    for field in NUMERIC_FIELDS:
+        col = columns.get(field)
+        text = df[col] if col in df.columns else pd.Series("", index=df.index)
+        raw[field] = text
+        num[field] = pd.to_numeric(text, errors="coerce")
+
+    named = df["name"].ne("") if "name" in df.columns else pd.Series(True, index=df.index)
+    issues: List = []
+
+    def report(mask, issue: str, detail):
+        mask = mask & named
+        if mask.any():
+            issues.append(pd.DataFrame({
+                "row_num": df.index[mask] + 1,
+                "sku":     df.loc[mask, "sku"] if "sku" in df.columns else "",
+                "name":    df.loc[mask, "name"] if "name" in df.columns else "",
+                "issue":   issue,
+                "detail":  detail[mask] if isinstance(detail, pd.Series) else detail,
+            }))
+
+    # Non-numeric cells (e.g. "#DIV/0!") in any mapped numeric column
+    for field in NUMERIC_FIELDS:
+        bad = raw[field].ne("") & num[field].isna()
+        report(bad, "non_numeric", f"{columns[field]}=" + raw[field])
+
+    retail = num["retail_price"]
+
+    # cost_price: first positive source in priority order
+    cost = pd.Series(np.nan, index=df.index)
+    for field in mapping["cost_sources"]:
+        cost = cost.fillna(num[field].where(num[field] > 0))
+
+    wholesale = num["wholesale_price"].where(num["wholesale_price"] > 0)
+    wholesale = wholesale.fillna(retail * (1 - mapping["wholesale_discount"]))
+
+    base = num[mapping["margin_base"]].where(num[mapping["margin_base"]] > 0).fillna(cost)
+    computed_margin = (retail - base) / base * 100
+
+    # Column sanity: a stock column carrying the margin (swapped labels) is
+    # dropped before it can become stock_quantity
+    for field in ("opening_stock", "stock_quantity"):
+        values = num[field]
+        both = values.notna() & computed_margin.notna()
+        if both.sum() >= 10:
+            hits = ((values[both] - computed_margin[both]).abs() <= mapping["margin_tolerance"]).mean()
+            if hits > 0.5:
+                issues.append(pd.DataFrame([{
+                    "row_num": 0, "sku": "", "name": "",
+                    "issue": "column_looks_like_margin",
+                    "detail": f"'{columns[field]}' matches the computed margin on {hits:.0%} of rows; "
+                              f"ignored for stock_quantity - check the mapping (labels may be swapped)",
+                }]))
+                num[field] = pd.Series(np.nan, index=df.index)
+
+    stock = num["stock_quantity"].fillna(num["opening_stock"])
+
+    report(retail.isna() | (retail <= 0), "missing_retail_price", "retail_price=" + raw["retail_price"])
+    report(cost > retail, "cost_above_retail", "cost=" + cost.astype(str) + " retail=" + retail.astype(str))
+    report(wholesale < cost, "wholesale_below_cost",
+           "wholesale=" + wholesale.round(2).astype(str) + " cost=" + cost.astype(str))
+    report(stock < 0, "negative_stock", "stock=" + stock.astype(str))
+
+    reported = num["profit_margin"]
+    mismatch = reported.notna() & computed_margin.notna() & \
+        ((reported - computed_margin).abs() > mapping["margin_tolerance"])
+    report(mismatch, "margin_mismatch",
+           "reported=" + reported.round(2).astype(str) + " computed=" + computed_margin.round(2).astype(str))
+
+    out = df.copy()
+    out["cost_price"] = _fmt(cost, 2)
+    out["wholesale_price"] = _fmt(wholesale, 2)
+    out["stock_quantity"] = _fmt(stock.clip(lower=0).round(0), 0)
+
+    anomalies = pd.concat(issues, ignore_index=True) if issues else \
+        pd.DataFrame(columns=["row_num", "sku", "name", "issue", "detail"])
+    return out, anomalies
+
+
+def derive_rows(csv_file: str, mapping: Dict = DEFAULT_MAPPING) -> Tuple[List[Dict[str, str]], object]:
+    """Rows (as the importer expects them) plus the anomalies frame"""
+    out, anomalies = derive(read_frame(csv_file), mapping)
+    return out.to_dict("records"), anomalies
+
+
+def print_anomaly_summary(anomalies) -> None:
+    if anomalies.empty:
+        print("✓ No margin/price anomalies found")
+        return
+    print(f"⚠️  {len(anomalies)} anomalies:")
+    for issue, count in anomalies["issue"].value_counts().items():
+        print(f"   • {issue}: {count}")
+    for detail in anomalies.loc[anomalies["issue"] == "column_looks_like_margin", "detail"]:
+        print(f"   ⚠️  {detail}")
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Derive cost/wholesale/stock from ERP columns and report anomalies")
+    parser.add_argument("csv_file")
+    parser.add_argument("--mapping", help="JSON mapping override")
+    parser.add_argument("--report", help="Write anomalies to this CSV file")
+    parser.add_argument("--output", help="Write the derived CSV here")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    out, anomalies = derive(read_frame(args.csv_file), load_mapping(args.mapping))
+    print(f"✓ Derived {len(out)} rows in {(time.perf_counter() - started)*1000:.0f} ms")
+    print_anomaly_summary(anomalies)
+
+    if args.report:
+        anomalies.to_csv(args.report, index=False)
+        print(f"📝 Anomalies → {args.report}")
+    if args.output:
+        out.to_csv(args.output, index=False)
+        print(f"📝 Derived CSV → {args.output}")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
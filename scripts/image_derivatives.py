@@ -0,0 +1,351 @@
+"""
+Image Derivatives - web-optimized WebP/AVIF renditions for the storefront
+
+Turns full-size catalog ads (public/Products) and try-on outputs
+(public/tryon) into fixed-width WebP/AVIF derivatives, in parallel across
+cores, and writes a manifest the Next.js app can read.
+
+Incremental: a source is only re-encoded when its size/mtime changed AND its
+content hash differs from the one recorded in the manifest, or when one of
+its derivatives is missing.
+
+Usage:
+    pip install pillow            # AVIF needs Pillow >= 11.2 or pillow-avif-plugin
+
+    python image_derivatives.py                           # defaults below
+    python image_derivatives.py public/Products -o public/derived --widths 320 640
+    python image_derivatives.py --formats webp --force
+
+Manifest (public/derived/manifest.json):
+    {
+      "version": 1,
+      "widths": [320, 640, 1280],
+      "images": {
+        "/Products/Lemongrass Soap Ad.png": {
+          "width": 2048, "height": 2048, "sha256": "...", "size": 123, "mtime": 1.0,
+          "variants": {"640": {"webp": "/derived/Products/lemongrass-soap-ad-640.webp", ...}}
+        }
+      }
+    }
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_ROOT      = Path(__file__).resolve().parent.parent
+PUBLIC_DIR     = REPO_ROOT / "public"
+DEFAULT_INPUTS = [PUBLIC_DIR / "Products", PUBLIC_DIR / "tryon"]
+DEFAULT_OUTPUT = PUBLIC_DIR / "derived"
+DEFAULT_WIDTHS = (320, 640, 1280)
+FORMATS        = ("webp", "avif")
+QUALITY        = {"webp": 80, "avif": 55}
+SOURCE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp"}
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def web_path(path: Path) -> str:
+    """Path as served by Next.js (relative to public/, leading slash)"""
+    try:
+        return "/" + path.resolve().relative_to(PUBLIC_DIR).as_posix()
+    except ValueError:
+        return path.resolve().as_posix()
+
+
+def derivative_stem(source: Path) -> str:
+    """URL-safe file stem: 'Aloe Vera & Honey Soap Ad (2).png' → 'aloe-vera-honey-soap-ad-2'"""
+    stem = re.sub(r"[^a-z0-9]+", "-", source.stem.lower()).strip("-")
+    return stem or "image"
+
+
+def avif_supported() -> bool:
+    try:
+        from PIL import features
+        if features.check("avif"):
+            return True
+    except Exception:
+        pass
+    try:
+        import pillow_avif  # noqa: F401  (registers the AVIF plugin)
+        return True
+    except ImportError:
+        return False
+
+
+def render_derivatives(source: str, out_dir: str, widths: List[int], formats: List[str],
+                       stem: Optional[str] = None) -> dict:
+    """
+    Worker: decode `source` once and write every width × format rendition.
+    Runs in a child process; returns the manifest entry's variant data.
+    `stem` overrides derivative_stem(source) (see DerivativePipeline.assign_stems).
+    """
+    from PIL import Image, ImageOps
+    if "avif" in formats:
+        try:
+            import pillow_avif  # noqa: F401
+        except ImportError:
+            pass
+
+    src = Path(source)
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    stem = stem or derivative_stem(src)
+
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        has_alpha = im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+        im = im.convert("RGBA" if has_alpha else "RGB")
+        orig_w, orig_h = im.size
+
+        variants: Dict[str, Dict[str, str]] = {}
+        # Never upscale: widths above the original collapse to the original width
+        targets = sorted({min(w, orig_w) for w in widths})
+        for width in targets:
+            height = max(1, round(orig_h * width / orig_w))
+            resized = im if width == orig_w else im.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                dst = out / f"{stem}-{width}.{fmt}"
+                if fmt == "webp":
+                    resized.save(dst, "WEBP", quality=QUALITY[fmt], method=6)
+                else:
+                    resized.save(dst, "AVIF", quality=QUALITY[fmt])
+                variants.setdefault(str(width), {})[fmt] = str(dst)
+
+    return {"width": orig_w, "height": orig_h, "variants": variants}
+
+
+class DerivativePipeline:
+    def __init__(
+        self,
+        inputs:   List[Path],
+        output:   Path = DEFAULT_OUTPUT,
+        widths:   List[int] = list(DEFAULT_WIDTHS),
+        formats:  List[str] = list(FORMATS),
+        workers:  Optional[int] = None,
+        force:    bool = False,
+    ):
+        self.inputs   = [Path(p) for p in inputs]
+        self.output   = Path(output)
+        self.widths   = sorted(set(widths))
+        self.formats  = formats
+        self.workers  = workers or os.cpu_count() or 1
+        self.force    = force
+        self.manifest_path = self.output / "manifest.json"
+
+        # Statistics
+        self.generated = 0
+        self.skipped   = 0
+        self.errors    = 0
+        self.bytes_in  = 0
+        self.bytes_out = 0
+
+    def load_manifest(self) -> dict:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"version": MANIFEST_VERSION, "images": {}}
+        # A different width/format set invalidates every entry
+        if manifest.get("widths") != self.widths or manifest.get("formats") != self.formats:
+            manifest["images"] = {}
+        return manifest
+
+    def find_sources(self) -> List[Path]:
+        sources, seen = [], set()
+        for root in self.inputs:
+            paths = [root] if root.is_file() else sorted(root.rglob("*"))
+            for path in paths:
+                if path.suffix.lower() not in SOURCE_SUFFIXES or self.output in path.parents:
+                    continue
+                if path.resolve() not in seen:
+                    seen.add(path.resolve())
+                    sources.append(path)
+        return sources
+
+    def assign_stems(self, sources: List[Path]) -> Dict[Path, str]:
+        """
+        Output stem per source. derivative_stem() drops case and extension, so
+        'Soap.png' and 'soap.jpg' in one folder would write the same files;
+        every source in such a group gets a short hash of its path appended.
+        """
+        groups: Dict[tuple, List[Path]] = {}
+        for source in sources:
+            groups.setdefault((self.output_dir_for(source), derivative_stem(source)), []).append(source)
+
+        stems = {}
+        for (_, stem), members in groups.items():
+            if len(members) == 1:
+                stems[members[0]] = stem
+                continue
+            print(f"⚠️  {len(members)} sources share the derivative name '{stem}': "
+                  + ", ".join(web_path(m) for m in members))
+            for source in members:
+                digest = hashlib.sha256(web_path(source).encode("utf-8")).hexdigest()[:8]
+                stems[source] = f"{stem}-{digest}"
+        return stems
+
+    def output_dir_for(self, source: Path) -> Path:
+        try:
+            rel = source.resolve().parent.relative_to(PUBLIC_DIR)
+        except ValueError:
+            rel = Path(source.parent.name)
+        return self.output / rel
+
+    def is_current(self, source: Path, entry: Optional[dict], stem: str) -> bool:
+        """True when `entry` still describes `source` and all its outputs exist under `stem`."""
+        if self.force or not entry:
+            return False
+        for width, fmts in entry["variants"].items():
+            for fmt, p in fmts.items():
+                path = Path(self._abs(p))
+                if path.name != f"{stem}-{width}.{fmt}" or not path.exists():
+                    return False
+        stat = source.stat()
+        if entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime:
+            return True
+        # Touched but identical content (e.g. fresh checkout): refresh the stamp only
+        if entry.get("sha256") == file_sha256(source):
+            entry["size"], entry["mtime"] = stat.st_size, stat.st_mtime
+            return True
+        return False
+
+    @staticmethod
+    def _abs(web: str) -> Path:
+        return PUBLIC_DIR / web.lstrip("/") if web.startswith("/") else Path(web)
+
+    def run(self) -> dict:
+        print(f"\n{'='*60}")
+        print("IMAGE DERIVATIVES")
+        print(f"{'='*60}")
+        print(f"  Widths:  {self.widths}")
+        print(f"  Formats: {self.formats}")
+        print(f"  Workers: {self.workers}")
+        print(f"{'='*60}\n")
+
+        started  = time.perf_counter()
+        manifest = self.load_manifest()
+        images   = manifest["images"]
+        sources  = self.find_sources()
+        stems    = self.assign_stems(sources)
+
+        todo = []
+        for source in sources:
+            key = web_path(source)
+            if self.is_current(source, images.get(key), stems[source]):
+                self.skipped += 1
+            else:
+                todo.append(source)
+
+        print(f"🔍 {len(sources)} sources, {len(todo)} to (re)build, {self.skipped} unchanged")
+
+        if todo:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = {
+                    pool.submit(
+                        render_derivatives, str(src), str(self.output_dir_for(src)),
+                        self.widths, self.formats, stems[src],
+                    ): src
+                    for src in todo
+                }
+                for future in as_completed(futures):
+                    src = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"✗ {src.name}: {e}")
+                        self.errors += 1
+                        continue
+                    stat = src.stat()
+                    variants = {
+                        width: {fmt: web_path(Path(p)) for fmt, p in fmts.items()}
+                        for width, fmts in result["variants"].items()
+                    }
+                    images[web_path(src)] = {
+                        "width":    result["width"],
+                        "height":   result["height"],
+                        "sha256":   file_sha256(src),
+                        "size":     stat.st_size,
+                        "mtime":    stat.st_mtime,
+                        "variants": variants,
+                    }
+                    self.generated += 1
+                    self.bytes_in  += stat.st_size
+                    self.bytes_out += sum(Path(p).stat().st_size for fmts in result["variants"].values() for p in fmts.values())
+                    print(f"✓ {src.name} → {len(variants)} widths")
+
+        # Drop entries whose source disappeared
+        live = {web_path(s) for s in sources}
+        for key in [k for k in images if k not in live]:
+            del images[key]
+
+        manifest.update({
+            "version":      MANIFEST_VERSION,
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "widths":       self.widths,
+            "formats":      self.formats,
+            "images":       dict(sorted(images.items())),
+        })
+        self.output.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        tmp.replace(self.manifest_path)
+
+        elapsed = time.perf_counter() - started
+        print(f"\n{'='*60}")
+        print(f"✓ Generated: {self.generated}   ⊘ Unchanged: {self.skipped}   ✗ Errors: {self.errors}")
+        if self.bytes_in:
+            print(f"  Source bytes: {self.bytes_in/1e6:.1f} MB → derivatives: {self.bytes_out/1e6:.1f} MB")
+        print(f"  Manifest: {self.manifest_path}  ({elapsed:.1f}s)")
+        print(f"{'='*60}\n")
+        return manifest
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build WebP/AVIF derivatives + manifest for the storefront")
+    parser.add_argument("inputs", nargs="*", type=Path, default=DEFAULT_INPUTS, help="Source files/directories")
+    parser.add_argument("-o", "--output", type=Path, default=DEFAULT_OUTPUT, help="Derivatives directory")
+    parser.add_argument("--widths", type=int, nargs="+", default=list(DEFAULT_WIDTHS))
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Rebuild everything")
+    args = parser.parse_args()
+
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        parser.exit(1, "❌ Pillow is required: pip install pillow\n")
+
+    formats = args.formats
+    if "avif" in formats and not avif_supported():
+        print("⚠️  AVIF encoder not available (need Pillow >= 11.2 or pillow-avif-plugin); WebP only")
+        formats = [f for f in formats if f != "avif"]
+
+    pipeline = DerivativePipeline(
+        inputs=args.inputs,
+        output=args.output,
+        widths=args.widths,
+        formats=formats,
+        workers=args.workers,
+        force=args.force,
+    )
+    pipeline.run()
+    sys.exit(1 if pipeline.errors else 0)
+
+
+if __name__ == "__main__":
+    main()
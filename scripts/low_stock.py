@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Low-Stock Scanner - reorder report from stock_quantity / low_stock_threshold
+
+Reads only the products at or below their threshold (server-side filter on
+the is_low_stock generated column, see 007-low-stock.sql), joins purchase
+prices from the ERP export in memory (erp_columns.py: cost_price, else
+PURCHASE PRICE excl. tax, else incl. tax) and writes a reorder report:
+
+    suggested_qty = ceil(low_stock_threshold × cover − stock_quantity)
+
+i.e. enough to bring stock back to `cover` times the threshold (default 2).
+Rows are ordered by urgency (stock as a fraction of the threshold).
+
+Incremental (--incremental): only products whose stock or threshold changed
+since the last run (stock_updated_at, watermark in etl_watermarks) are read;
+the report lists the ones that are now low and the ones that recovered
+(low at the last run, not low now). The SKUs that are low are kept in the
+watermark's details for that; the first run reads every low product and
+takes the watermark from the newest stock change across all products.
+
+Usage:
+    python low_stock.py --erp products.csv                    # full report
+    python low_stock.py --erp products.csv -o reorder.csv --cover 3
+    python low_stock.py --erp products.csv --incremental
+"""
+
+import csv
+import math
+import sys
+import time
+from typing import Dict, Iterator, List, Optional
+
+JOB            = "low_stock"
+PAGE_SIZE      = 1000
+DEFAULT_COVER  = 2.0
+REPORT_FIELDS  = ["sku", "name", "brand", "category", "stock_quantity", "low_stock_threshold",
+                  "suggested_qty", "unit_cost", "estimated_cost"]
+
+PRODUCT_SELECT = (
+    "sku, name, stock_quantity, low_stock_threshold, is_low_stock, stock_updated_at, cost_price, "
+    "brands(name), categories(name)"
+)
+
+
+def load_purchase_prices(csv_file: str, mapping_file: Optional[str] = None) -> Dict[str, float]:
+    """SKU → purchase price from the ERP export (one vectorized pass)"""
+    from erp_columns import derive, load_mapping, read_frame
+    import pandas as pd
+
+    out, _ = derive(read_frame(csv_file), load_mapping(mapping_file))
+    prices = pd.to_numeric(out["cost_price"], errors="coerce")
+    keep = out["sku"].ne("") & prices.notna()
+    return dict(zip(out.loc[keep, "sku"], prices[keep].astype(float)))
+
+
+def suggested_quantity(stock: int, threshold: int, cover: float = DEFAULT_COVER) -> int:
+    return max(math.ceil(threshold * cover - stock), 1)
+
+
+class LowStockScanner:
+    def __init__(self, client, prices: Dict[str, float], cover: float = DEFAULT_COVER):
+        self.client = client
+        self.prices = prices
+        self.cover = cover
+
+    def _pages(self, query_fn) -> Iterator[List[Dict]]:
+        offset = 0
+        while True:
+            rows = query_fn().order("sku").range(offset, offset + PAGE_SIZE - 1).execute().data or []
+            if rows:
+                yield rows
+            if len(rows) < PAGE_SIZE:
+                return
+            offset += PAGE_SIZE
+
+    def fetch_low(self) -> List[Dict]:
+        query = lambda: self.client.table("products").select(PRODUCT_SELECT).eq("is_low_stock", True)
+        return [row for rows in self._pages(query) for row in rows]
+
+    def fetch_changed(self, since: str) -> List[Dict]:
+        query = lambda: self.client.table("products").select(PRODUCT_SELECT).gte("stock_updated_at", since)
+        return [row for rows in self._pages(query) for row in rows]
+
+    def newest_stock_change(self) -> Optional[str]:
+        """max(stock_updated_at) over all products"""
+        rows = (self.client.table("products").select("stock_updated_at").not_.is_("stock_updated_at", "null")
+                .order("stock_updated_at", desc=True).limit(1).execute().data)
+        return rows[0]["stock_updated_at"] if rows else None
+
+    def report_row(self, row: Dict) -> Dict:
+        stock = row.get("stock_quantity") or 0
+        threshold = row.get("low_stock_threshold") or 0
+        qty = suggested_quantity(stock, threshold, self.cover)
+        unit_cost = self.prices.get(row["sku"])
+        if unit_cost is None and row.get("cost_price") is not None:
+            unit_cost = float(row["cost_price"])
+        return {
+            "sku":                 row["sku"],
+            "name":                row["name"],
+            "brand":               (row.get("brands") or {}).get("name") or "",
+            "category":            (row.get("categories") or {}).get("name") or "",
+            "stock_quantity":      stock,
+            "low_stock_threshold": threshold,
+            "suggested_qty":       qty,
+            "unit_cost":           round(unit_cost, 2) if unit_cost is not None else "",
+            "estimated_cost":      round(unit_cost * qty, 2) if unit_cost is not None else "",
+        }
+
+    @staticmethod
+    def urgency(row: Dict) -> tuple:
+        threshold = row["low_stock_threshold"] or 1
+        return (row["stock_quantity"] / threshold, row["sku"])
+
+    def run(self, incremental: bool = False, output: Optional[str] = None) -> Dict:
+        from supabase_access import get_watermark_details, set_watermark
+
+        started = time.perf_counter()
+        since, details = get_watermark_details(self.client, JOB) if incremental else (None, {})
+        if "low_skus" not in details:
+            since = None        # no low set from a previous run: start over
+        was_low = set(details.get("low_skus", []))
+        # Read first: changes landing during the scan are read again next run
+        newest = self.newest_stock_change() if incremental else None
+
+        print(f"\n{'='*60}")
+        print(f"LOW STOCK ({'changes since ' + since if since else 'all low products'}, cover {self.cover:g}×)")
+        print(f"{'='*60}")
+
+        rows = self.fetch_changed(since) if since else self.fetch_low()
+        low = [r for r in rows if r.get("is_low_stock")]
+        recovered = [r for r in rows if r["sku"] in was_low and not r.get("is_low_stock")]
+        report = sorted((self.report_row(r) for r in low), key=self.urgency)
+
+        if incremental and newest:
+            now_low = (was_low - {r["sku"] for r in rows}) | {r["sku"] for r in low}
+            set_watermark(self.client, JOB, newest,
+                          {"low": len(now_low), "recovered": len(recovered), "low_skus": sorted(now_low)})
+
+        priced = [r for r in report if r["estimated_cost"] != ""]
+        print(f"🔍 {len(rows)} products read, {len(report)} at or below threshold"
+              f"{f', {len(recovered)} recovered' if recovered else ''}")
+        for r in report[:15]:
+            print(f"  {r['sku']:<16} {r['name'][:36]:<36} {r['stock_quantity']:>5}/{r['low_stock_threshold']:<5}"
+                  f" → order {r['suggested_qty']}")
+        if len(report) > 15:
+            print(f"  ... {len(report) - 15} more")
+        for r in recovered[:5]:
+            print(f"  ✓ recovered: {r['sku']} ({r.get('stock_quantity')}/{r.get('low_stock_threshold')})")
+        print(f"💰 Estimated reorder cost: {sum(r['estimated_cost'] for r in priced):,.2f} "
+              f"({len(report) - len(priced)} without a purchase price)")
+
+        if output:
+            with open(output, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+                writer.writeheader()
+                writer.writerows(report)
+            print(f"📝 Reorder report → {output}")
+
+        print(f"⏱  {time.perf_counter() - started:.2f}s")
+        print(f"{'='*60}\n")
+        return {"report": report, "recovered": [r["sku"] for r in recovered]}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Low-stock scanner and reorder report")
+    parser.add_argument("--erp", help="ERP export CSV with purchase prices (e.g. products.csv)")
+    parser.add_argument("--mapping", help="ERP column mapping override (see erp_columns.py)")
+    parser.add_argument("-o", "--output", help="Write the reorder report as CSV")
+    parser.add_argument("--cover", type=float, default=DEFAULT_COVER,
+                        help=f"Reorder up to this multiple of the threshold (default: {DEFAULT_COVER:g})")
+    parser.add_argument("--incremental", action="store_true", help="Only products whose stock changed since the last run")
+    args = parser.parse_args()
+
+    from supabase_access import create_supabase_client, is_configured, print_request_stats
+
+    if not is_configured():
+        parser.exit(1, "❌ Set SUPABASE_URL and SUPABASE_SERVICE_KEY\n")
+
+    prices: Dict[str, float] = {}
+    if args.erp:
+        try:
+            prices = load_purchase_prices(args.erp, args.mapping)
+        except ImportError:
+            parser.exit(1, "❌ pandas is required for --erp: pip install pandas numpy\n")
+        print(f"✓ {len(prices)} purchase prices from {args.erp}")
+
+    try:
+        LowStockScanner(create_supabase_client(), prices, args.cover).run(args.incremental, args.output)
+    except Exception as e:
+        print(f"\n✗ Low-stock scan failed: {str(e)}\n")
+        sys.exit(1)
+    finally:
+        print_request_stats()
+
+
+if __name__ == "__main__":
+    main()
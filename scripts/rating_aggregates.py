@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Rating Aggregates - keep products.rating_avg / rating_count in sync with reviews
+
+products.rating_avg and rating_count are denormalized (002-seed-data.sql
+hard-codes them). This job recomputes them from approved product_reviews
+(see 006-rating-aggregates.sql):
+
+1. read the job's watermark from etl_watermarks and the newest review change
+2. one grouped query (rating_aggregate_changes RPC) over the products whose
+   reviews were added, edited, approved or deleted since the watermark; it
+   returns only products whose stored values differ
+3. write those in batches (apply_rating_aggregates RPC, one UPDATE per batch);
+   the RPC result is capped at PostgREST's max-rows, so it is read a page at
+   a time: applied products stop differing and the next call returns the
+   rest, until a page comes back short
+4. only then advance the watermark and prune deletion tombstones behind it
+
+Usage:
+    python rating_aggregates.py                # incremental (full on first run)
+    python rating_aggregates.py --full         # check every product
+    python rating_aggregates.py --dry-run      # report changes, write nothing
+"""
+
+import sys
+import time
+from typing import Dict, List, Optional
+
+JOB        = "rating_aggregates"
+BATCH_SIZE = 500
+PAGE_SIZE  = 1000     # PostgREST max-rows (Supabase default)
+
+
+class RatingAggregateJob:
+    def __init__(self, client, batch_size: int = BATCH_SIZE):
+        self.client = client
+        self.batch_size = batch_size
+
+    def changes(self, since: Optional[str], offset: int = 0) -> List[Dict]:
+        """One page of products whose recomputed rating differs from the stored one"""
+        return (self.client.rpc("rating_aggregate_changes", {"p_since": since})
+                .range(offset, offset + PAGE_SIZE - 1).execute().data or [])
+
+    def all_changes(self, since: Optional[str]) -> List[Dict]:
+        """Every differing product, paged by offset (nothing is written meanwhile)"""
+        rows, offset = [], 0
+        while True:
+            page = self.changes(since, offset)
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            offset += PAGE_SIZE
+
+    def apply(self, rows: List[Dict]) -> int:
+        updated = 0
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            updated += self.client.rpc("apply_rating_aggregates", {"p_rows": batch}).execute().data or 0
+        return updated
+
+    def run(self, full: bool = False, dry_run: bool = False) -> Dict:
+        from supabase_access import get_watermark, set_watermark
+
+        started = time.perf_counter()
+        since = None if full else get_watermark(self.client, JOB)
+        # Read first: changes landing while we aggregate are picked up again next run
+        newest = self.client.rpc("review_changes_watermark", {}).execute().data
+
+        print(f"\n{'='*60}")
+        print(f"RATING AGGREGATES ({'since ' + since if since else 'all products'}){' (DRY RUN)' if dry_run else ''}")
+        print(f"{'='*60}")
+
+        if dry_run:
+            rows = self.all_changes(since)
+            print(f"🔍 {len(rows)} products with out-of-date ratings")
+            for row in rows[:10]:
+                print(f"  {row['product_id']}: {row['rating_avg']} ({row['rating_count']} reviews)")
+            if len(rows) > 10:
+                print(f"  ... {len(rows) - 10} more")
+            print(f"⏱  {time.perf_counter() - started:.2f}s")
+            print(f"{'='*60}\n")
+            return {"changed": len(rows), "updated": 0}
+
+        # Applied rows drop out of the result, so always read the first page
+        changed = updated = batches = 0
+        while True:
+            page = self.changes(since)
+            changed += len(page)
+            applied = self.apply(page)
+            updated += applied
+            batches += -(-len(page) // self.batch_size)
+            if len(page) < PAGE_SIZE:
+                break
+            if not applied:
+                raise RuntimeError(f"{len(page)} ratings still differ after being applied; watermark not advanced")
+        print(f"🔍 {changed} products with out-of-date ratings")
+
+        if newest:
+            set_watermark(self.client, JOB, newest, {"updated": updated})
+            pruned = self.client.rpc("prune_review_deletions", {"p_before": newest}).execute().data or 0
+            if pruned:
+                print(f"🧹 Pruned {pruned} deletion tombstones")
+        print(f"✓ Updated {updated} products in {batches} batches")
+
+        print(f"⏱  {time.perf_counter() - started:.2f}s")
+        print(f"{'='*60}\n")
+        return {"changed": changed, "updated": updated}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recompute product rating aggregates from reviews")
+    parser.add_argument("--full", action="store_true", help="Check every product, not only changed reviews")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help=f"Products per write (default: {BATCH_SIZE})")
+    args = parser.parse_args()
+
+    from supabase_access import create_supabase_client, is_configured, print_request_stats
+
+    if not is_configured():
+        parser.exit(1, "❌ Set SUPABASE_URL and SUPABASE_SERVICE_KEY\n")
+
+    try:
+        RatingAggregateJob(create_supabase_client(), args.batch_size).run(full=args.full, dry_run=args.dry_run)
+    except Exception as e:
+        print(f"\n✗ Rating aggregates failed: {str(e)}\n")
+        sys.exit(1)
+    finally:
+        print_request_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Sales Rollups - incremental daily sales summaries for the admin reports
+
+Keeps sales_daily_totals / _products / _brands / _categories (see
+005-sales-rollups.sql) in step with orders + order_items:
+
+1. read the job's watermark from etl_watermarks
+2. scan orders created or updated since then (narrow select, idx_orders_updated)
+   and collect the local days they belong to
+3. call refresh_sales_rollups(days) in batches: each call recomputes those
+   days completely in one transaction (status changes, cancellations and
+   edited items are picked up because the whole day is rebuilt)
+4. store the newest created_at/updated_at seen as the next watermark
+
+The scan uses >= so an order written in the same instant as the watermark is
+never skipped; recomputing a day is idempotent. Deleted orders leave no trace
+to scan for, so run --full (or --since) after bulk deletes.
+
+Usage:
+    python sales_rollups.py                    # incremental (full on first run)
+    python sales_rollups.py --full             # rebuild every day with orders
+    python sales_rollups.py --since 2026-10-01 # recompute from this day on
+
+Config (environment):
+    REPORT_TZ=Asia/Kolkata    day boundaries for the rollups
+"""
+
+import os
+import sys
+import time
+from datetime import date, datetime
+from typing import Iterator, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+JOB        = "sales_rollups"
+REPORT_TZ  = os.environ.get("REPORT_TZ", "Asia/Kolkata")
+PAGE_SIZE  = 1000
+DAY_BATCH  = 31       # days per refresh_sales_rollups() call
+
+
+def parse_ts(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class SalesRollupJob:
+    def __init__(self, client, tz: str = REPORT_TZ):
+        self.client = client
+        self.tz_name = tz
+        self.tz = ZoneInfo(tz)
+
+    def local_day(self, ts: str) -> date:
+        return parse_ts(ts).astimezone(self.tz).date()
+
+    def day_start(self, day: date) -> str:
+        return datetime(day.year, day.month, day.day, tzinfo=self.tz).isoformat()
+
+    def _pages(self, query_fn) -> Iterator[List[dict]]:
+        offset = 0
+        while True:
+            rows = query_fn().range(offset, offset + PAGE_SIZE - 1).execute().data or []
+            if rows:
+                yield rows
+            if len(rows) < PAGE_SIZE:
+                return
+            offset += PAGE_SIZE
+
+    def changed_days(self, since: Optional[str]) -> Tuple[Set[date], Optional[datetime]]:
+        """Local days of orders created/updated at or after `since` (all orders when None)"""
+        def query():
+            q = self.client.table("orders").select("created_at, updated_at")
+            if since:
+                q = q.or_(f"created_at.gte.{since},updated_at.gte.{since}")
+            return q.order("id")
+
+        days: Set[date] = set()
+        newest: Optional[datetime] = None
+        for rows in self._pages(query):
+            for row in rows:
+                if row.get("created_at"):
+                    days.add(self.local_day(row["created_at"]))
+                for ts in (row.get("created_at"), row.get("updated_at")):
+                    if ts:
+                        parsed = parse_ts(ts)
+                        newest = parsed if newest is None or parsed > newest else newest
+        return days, newest
+
+    def days_from(self, first: date) -> Set[date]:
+        """Every day from `first` to today that has orders (one narrow scan)"""
+        def query():
+            return self.client.table("orders").select("created_at").gte("created_at", self.day_start(first)).order("id")
+        return {self.local_day(row["created_at"]) for rows in self._pages(query) for row in rows if row.get("created_at")}
+
+    def rollup_days(self, first: Optional[date] = None) -> Set[date]:
+        """Days that already have rollups (so days whose orders were all deleted get cleared)"""
+        def query():
+            q = self.client.table("sales_daily_totals").select("day")
+            return (q.gte("day", first.isoformat()) if first else q).order("day")
+        return {date.fromisoformat(row["day"]) for rows in self._pages(query) for row in rows}
+
+    def refresh(self, days: List[date]) -> dict:
+        totals = {"days_refreshed": 0, "product_rows": 0, "brand_rows": 0, "category_rows": 0}
+        for start in range(0, len(days), DAY_BATCH):
+            batch = [d.isoformat() for d in days[start:start + DAY_BATCH]]
+            result = self.client.rpc("refresh_sales_rollups", {"p_days": batch, "p_tz": self.tz_name}).execute()
+            for key, value in ((result.data or [{}])[0]).items():
+                totals[key] = totals.get(key, 0) + (value or 0)
+            print(f"✓ Refreshed {batch[0]} … {batch[-1]} ({len(batch)} days)")
+        return totals
+
+    def run(self, full: bool = False, since_day: Optional[date] = None) -> dict:
+        from supabase_access import get_watermark, set_watermark
+
+        started = time.perf_counter()
+        watermark = None if (full or since_day) else get_watermark(self.client, JOB)
+
+        print(f"\n{'='*60}")
+        if since_day:
+            print(f"SALES ROLLUPS (from {since_day}, {self.tz_name})")
+        else:
+            print(f"SALES ROLLUPS ({'incremental since ' + watermark if watermark else 'full rebuild'}, {self.tz_name})")
+        print(f"{'='*60}")
+
+        if since_day:
+            days, newest = self.days_from(since_day) | self.rollup_days(since_day), None
+        else:
+            days, newest = self.changed_days(watermark)
+            if not watermark:
+                days |= self.rollup_days()
+        print(f"🔍 {len(days)} days to refresh")
+
+        totals = self.refresh(sorted(days))
+        if newest is not None:
+            set_watermark(self.client, JOB, newest.isoformat(), {"days": len(days), "tz": self.tz_name})
+
+        print(f"✓ Rows written: {totals['product_rows']} product, {totals['brand_rows']} brand, "
+              f"{totals['category_rows']} category")
+        print(f"⏱  {time.perf_counter() - started:.2f}s")
+        print(f"{'='*60}\n")
+        return totals
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incremental daily sales rollups for the admin reports")
+    parser.add_argument("--full", action="store_true", help="Recompute every day that has orders")
+    parser.add_argument("--since", type=date.fromisoformat, help="Recompute from this day (YYYY-MM-DD)")
+    parser.add_argument("--tz", default=REPORT_TZ, help=f"Report time zone (default: {REPORT_TZ})")
+    args = parser.parse_args()
+
+    from supabase_access import create_supabase_client, is_configured, print_request_stats
+
+    if not is_configured():
+        parser.exit(1, "❌ Set SUPABASE_URL and SUPABASE_SERVICE_KEY\n")
+
+    try:
+        SalesRollupJob(create_supabase_client(), args.tz).run(full=args.full, since_day=args.since)
+    except Exception as e:
+        print(f"\n✗ Sales rollups failed: {str(e)}\n")
+        sys.exit(1)
+    finally:
+        print_request_stats()
+
+
+if __name__ == "__main__":
+    main()
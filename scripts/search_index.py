@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Search Index Build - static, denormalized product search for the storefront
+
+Builds a compact search structure from products + categories + brands +
+product_images so catalog search and listing pages can be served from
+static files in public/ instead of querying Supabase with joins:
+
+    public/search/
+      categories/<category-slug>.json   one shard per category (published products)
+      index.json                        inverted index: token → product refs
+      manifest.json                     build state (watermark, SKU → shard/tokens)
+
+Shard:
+    {"category": {"slug": "face-wash", "name": "FACE WASH"}, "count": 2,
+     "products": [{"sku": "...", "slug": "...", "name": "...", "brand": "...",
+                   "price": 120.0, "image": "https://...", "tokens": ["aloe", "100ml"]}]}
+
+index.json:
+    {"shards": ["face-wash", ...],
+     "docs":   [["himalaya-neem-face-wash", 0], ...],     # [slug, shard index]
+     "tokens": {"neem": [0, 7], "100ml": [0, 3], ...}}    # token → doc indexes
+
+Incremental: after the first build only products updated since the last
+watermark (plus any SKUs passed in, e.g. from the importer) are fetched,
+and only the category shards they touch are rewritten. Unpublished or
+deleted products are dropped. index.json is regenerated from the manifest
+in memory (no DB reads).
+
+Tokens use the dedupe normalizer (lowercase, 100 ML → 100ml, f/wash → face wash).
+
+Usage:
+    python search_index.py                 # incremental (full on first run)
+    python search_index.py --full          # rebuild everything
+    python search_index.py --skus SKU1 SKU2
+
+    # After an import
+    build_search_index(importer.client, changed_skus=importer.changed_skus)
+"""
+
+import json
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from dedupe_catalog import normalize_name
+
+REPO_ROOT      = Path(__file__).resolve().parent.parent
+DEFAULT_OUTPUT = REPO_ROOT / "public" / "search"
+UNCATEGORIZED  = "uncategorized"
+PAGE_SIZE      = 1000
+SKU_BATCH      = 200
+MIN_TOKEN_LEN  = 2
+INDEX_VERSION  = 1
+
+PRODUCT_SELECT = (
+    "sku, slug, name, retail_price, status, updated_at, tags, "
+    "categories(slug, name), brands(name), product_images(image_url, is_primary, display_order)"
+)
+
+
+def product_tokens(name: str, brand: Optional[str], category: Optional[str], tags: Optional[List[str]]) -> List[str]:
+    key, _ = normalize_name(" ".join(filter(None, [name, brand, category, *(tags or [])])))
+    return sorted({t for t in key.split() if len(t) >= MIN_TOKEN_LEN})
+
+
+def primary_image(images: Optional[List[Dict]]) -> Optional[str]:
+    if not images:
+        return None
+    best = min(images, key=lambda img: (not img.get("is_primary"), img.get("display_order") or 0))
+    return best["image_url"]
+
+
+def to_record(row: Dict) -> Dict:
+    """PostgREST row (with embedded category/brand/images) → shard record"""
+    brand = (row.get("brands") or {}).get("name")
+    category = (row.get("categories") or {}).get("name")
+    return {
+        "sku":    row["sku"],
+        "slug":   row["slug"],
+        "name":   row["name"],
+        "brand":  brand,
+        "price":  float(row["retail_price"]) if row.get("retail_price") is not None else None,
+        "image":  primary_image(row.get("product_images")),
+        "tokens": product_tokens(row["name"], brand, category, row.get("tags")),
+    }
+
+
+def write_json(path: Path, data: Dict):
+    """Compact JSON, written atomically so the storefront never sees half a file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(path)
+
+
+class SearchIndexBuilder:
+    def __init__(self, client, output: Path = DEFAULT_OUTPUT):
+        self.client = client
+        self.output = Path(output)
+        self.manifest_path = self.output / "manifest.json"
+        self.shard_dir = self.output / "categories"
+
+    def load_manifest(self) -> Dict:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return manifest if manifest.get("version") == INDEX_VERSION else {}
+
+    def _pages(self, query_fn) -> Iterator[Dict]:
+        offset = 0
+        while True:
+            result = query_fn().order("sku").range(offset, offset + PAGE_SIZE - 1).execute()
+            rows = result.data or []
+            yield from rows
+            if len(rows) < PAGE_SIZE:
+                return
+            offset += PAGE_SIZE
+
+    def fetch_products(self, since: Optional[str] = None, skus: Iterable[str] = ()) -> Dict[str, Dict]:
+        """Products updated after `since` (all products when None) plus the given SKUs"""
+        table = lambda: self.client.table("products").select(PRODUCT_SELECT)
+        query = (lambda: table().gt("updated_at", since)) if since else table
+        rows = {row["sku"]: row for row in self._pages(query)}
+        skus = [s for s in dict.fromkeys(skus) if s not in rows]
+        for start in range(0, len(skus), SKU_BATCH):
+            for row in table().in_("sku", skus[start:start + SKU_BATCH]).execute().data or []:
+                rows[row["sku"]] = row
+        return rows
+
+    def fetch_live_skus(self) -> Set[str]:
+        """SKUs that are currently published (narrow select, used to detect deletions)"""
+        query = lambda: self.client.table("products").select("sku").eq("status", "published")
+        return {row["sku"] for row in self._pages(query)}
+
+    def load_shard(self, shard: str) -> Dict[str, Dict]:
+        try:
+            data = json.loads((self.shard_dir / f"{shard}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return {p["sku"]: p for p in data.get("products", [])}
+
+    def build(self, changed_skus: Iterable[str] = (), full: bool = False) -> Dict:
+        started = time.perf_counter()
+        manifest = {} if full else self.load_manifest()
+        incremental = bool(manifest)
+        entries: Dict[str, Dict] = manifest.get("products", {})
+        categories: Dict[str, str] = manifest.get("categories", {})
+
+        print(f"\n{'='*60}")
+        print(f"SEARCH INDEX ({'incremental since ' + str(manifest.get('watermark')) if incremental else 'full build'})")
+        print(f"{'='*60}")
+
+        if incremental:
+            rows = self.fetch_products(manifest.get("watermark"), changed_skus)
+        else:
+            rows = self.fetch_products()
+        watermark = max([manifest.get("watermark") or ""] + [r["updated_at"] or "" for r in rows.values()]) or None
+
+        # shard → {sku: record or None (= remove)}
+        changes: Dict[str, Dict[str, Optional[Dict]]] = defaultdict(dict)
+        for sku, row in rows.items():
+            old = entries.get(sku)
+            if old:
+                changes[old["shard"]][sku] = None
+                del entries[sku]
+            if row["status"] != "published":
+                continue
+            category = row.get("categories") or {}
+            shard = category.get("slug") or UNCATEGORIZED
+            categories[shard] = category.get("name") or shard
+            record = to_record(row)
+            changes[shard][sku] = record
+            entries[sku] = {"shard": shard, "slug": record["slug"], "tokens": record["tokens"]}
+
+        removed = 0
+        if incremental:
+            live = self.fetch_live_skus()
+            for sku in [s for s in entries if s not in live]:
+                changes[entries.pop(sku)["shard"]][sku] = None
+                removed += 1
+
+        for shard, updates in changes.items():
+            products = {} if not incremental else self.load_shard(shard)
+            for sku, record in updates.items():
+                if record is None:
+                    products.pop(sku, None)
+                else:
+                    products[sku] = record
+            path = self.shard_dir / f"{shard}.json"
+            if products:
+                write_json(path, {
+                    "category": {"slug": shard, "name": categories.get(shard, shard)},
+                    "count": len(products),
+                    "products": sorted(products.values(), key=lambda p: p["name"].lower()),
+                })
+            elif path.exists():
+                path.unlink()
+
+        if not incremental:
+            # Full build: drop shards of categories that no longer have products
+            live_shards = {e["shard"] for e in entries.values()}
+            for path in self.shard_dir.glob("*.json"):
+                if path.stem not in live_shards:
+                    path.unlink()
+
+        self.write_inverted_index(entries)
+        manifest = {
+            "version": INDEX_VERSION,
+            "watermark": watermark,
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "categories": categories,
+            "products": entries,
+        }
+        write_json(self.manifest_path, manifest)
+
+        print(f"✓ Fetched {len(rows)} changed products, removed {removed}")
+        print(f"✓ Rewrote {len(changes)} shards ({len(entries)} products indexed)")
+        print(f"⏱  {time.perf_counter() - started:.2f}s → {self.output}")
+        print(f"{'='*60}\n")
+        return manifest
+
+    def write_inverted_index(self, entries: Dict[str, Dict]):
+        shards = sorted({e["shard"] for e in entries.values()})
+        shard_idx = {s: i for i, s in enumerate(shards)}
+        docs = []
+        tokens: Dict[str, List[int]] = defaultdict(list)
+        for sku in sorted(entries):
+            entry = entries[sku]
+            doc = len(docs)
+            docs.append([entry["slug"], shard_idx[entry["shard"]]])
+            for token in entry["tokens"]:
+                tokens[token].append(doc)
+        write_json(self.output / "index.json", {
+            "version": INDEX_VERSION,
+            "shards": shards,
+            "docs": docs,
+            "tokens": dict(sorted(tokens.items())),
+        })
+
+
+def build_search_index(client, changed_skus: Iterable[str] = (), full: bool = False,
+                       output: Path = DEFAULT_OUTPUT) -> Dict:
+    """Entry point for the importer: incremental build for the SKUs it touched"""
+    return SearchIndexBuilder(client, output).build(changed_skus, full=full)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build static search shards + inverted index for the storefront")
+    parser.add_argument("-o", "--output", type=Path, default=DEFAULT_OUTPUT, help="Output directory")
+    parser.add_argument("--full", action="store_true", help="Rebuild everything")
+    parser.add_argument("--skus", nargs="+", default=[], help="Also refresh these SKUs")
+    args = parser.parse_args()
+
+    from supabase_access import create_supabase_client, print_request_stats
+
+    try:
+        build_search_index(create_supabase_client(), args.skus, full=args.full, output=args.output)
+    except Exception as e:
+        print(f"\n✗ Search index build failed: {str(e)}\n")
+        sys.exit(1)
+    finally:
+        print_request_stats()
+
+
+if __name__ == "__main__":
+    main()
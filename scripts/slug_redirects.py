@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Slug Redirects - export old → current product slugs as a static lookup file
+
+product_slug_redirects (010-slug-redirects.sql) is filled by a trigger on
+every slug change - slug-fixer.py, populate_supabase.py --update,
+bulk_import.py --update and the admin UI alike. This exports it as a compact
+JSON object the product route consults before querying, so historical URLs
+(e.g. /product/yc-milk-f/wash-100ml) answer with a permanent redirect
+without a database round trip:
+
+    {"source": sha256, "redirects": {"old-slug": "current-slug", ...}}
+
+Chains are already collapsed (every old slug maps to the product's current
+slug) and only published products are included. The file is rewritten only
+when the map changed.
+
+proxy.ts imports the file at build time: a new export takes effect with the
+next build and deploy, not in the running app.
+
+Slug fixes made before the table existed can be backfilled from slug-fixer
+JSON-lines logs (CATALOG_LOG_JSON, events "fix" of live runs).
+
+Usage:
+    python slug_redirects.py                          # → public/slug-redirects.json
+    python slug_redirects.py --from-log logs/slugs.jsonl
+    python slug_redirects.py --lookup yc-milk-f/wash-100ml
+"""
+
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "public", "slug-redirects.json")
+PAGE_SIZE      = 1000
+BATCH_SIZE     = 500
+
+
+def read_fix_log(paths: List[str]) -> List[Dict]:
+    """{old_slug, product_id} for every live slug fix in slug-fixer JSON-lines logs (last one wins)"""
+    rows: Dict[str, Dict] = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get("event") != "fix" or not event.get("product_id") or not event.get("old"):
+                    continue
+                if event.get("dry_run") or str(event.get("msg", "")).endswith("(dry run)"):
+                    continue
+                rows[event["old"]] = {"old_slug": event["old"], "product_id": event["product_id"]}
+    return list(rows.values())
+
+
+def load_artifact(path: str) -> Optional[Dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class SlugRedirectMap:
+    def __init__(self, client, output: str = DEFAULT_OUTPUT):
+        self.client = client
+        self.output = output
+
+    def fetch(self) -> Dict[str, str]:
+        redirects, offset = {}, 0
+        while True:
+            rows = (self.client.rpc("slug_redirect_map", {}).range(offset, offset + PAGE_SIZE - 1)
+                    .execute().data or [])
+            redirects.update((row["old_slug"], row["new_slug"]) for row in rows)
+            if len(rows) < PAGE_SIZE:
+                return redirects
+            offset += PAGE_SIZE
+
+    def backfill(self, rows: List[Dict]) -> int:
+        recorded = 0
+        for start in range(0, len(rows), BATCH_SIZE):
+            batch = rows[start:start + BATCH_SIZE]
+            recorded += self.client.rpc("record_slug_redirects", {"p_rows": batch}).execute().data or 0
+        return recorded
+
+    def export(self, force: bool = False) -> Dict:
+        redirects = dict(sorted(self.fetch().items()))
+        source = hashlib.sha256(json.dumps(redirects).encode()).hexdigest()[:16]
+        previous = load_artifact(self.output) or {}
+
+        if not force and previous.get("source") == source:
+            print(f"✓ Up to date ({len(redirects)} redirects)")
+            return previous
+
+        old = previous.get("redirects", {})
+        added = sum(1 for slug, target in redirects.items() if old.get(slug) != target)
+        removed = sum(1 for slug in old if slug not in redirects)
+        artifact = {"source": source, "redirects": redirects}
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.output)), exist_ok=True)
+        tmp = self.output + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.output)
+        print(f"✓ {len(redirects)} redirects ({added} new/changed, {removed} removed)")
+        print(f"📝 {os.path.getsize(self.output):,} bytes → {self.output}")
+        print("ℹ️  Redeploy the storefront to serve the new redirects (bundled at build time)")
+        return artifact
+
+    def run(self, logs: Optional[List[str]] = None, force: bool = False) -> Dict:
+        print(f"\n{'='*60}")
+        print(f"SLUG REDIRECTS → {os.path.relpath(self.output)}")
+        print(f"{'='*60}")
+        if logs:
+            rows = read_fix_log(logs)
+            print(f"🔍 {len(rows)} slug fixes in {len(logs)} log file(s)")
+            print(f"✓ Backfilled {self.backfill(rows)} redirects (live slugs and deleted products skipped)")
+        artifact = self.export(force=force)
+        print(f"{'='*60}\n")
+        return artifact
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export product slug redirects as a static lookup file")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="Artifact path (default: public/slug-redirects.json)")
+    parser.add_argument("--from-log", nargs="+", metavar="JSONL", help="Backfill from slug-fixer JSON-lines logs first")
+    parser.add_argument("--force", action="store_true", help="Rewrite even when nothing changed")
+    parser.add_argument("--lookup", metavar="SLUG", help="Resolve a slug from the existing artifact and exit")
+    args = parser.parse_args()
+
+    if args.lookup:
+        artifact = load_artifact(args.output)
+        if artifact is None:
+            parser.exit(1, f"❌ No artifact at {args.output}: run without --lookup first\n")
+        target = artifact["redirects"].get(args.lookup)
+        print(f"/product/{args.lookup} → /product/{target}" if target else f"No redirect for {args.lookup}")
+        return
+
+    from supabase_access import create_supabase_client, is_configured, print_request_stats
+
+    if not is_configured():
+        parser.exit(1, "❌ Set SUPABASE_URL and SUPABASE_SERVICE_KEY\n")
+
+    try:
+        SlugRedirectMap(create_supabase_client(), args.output).run(logs=args.from_log, force=args.force)
+    except Exception as e:
+        print(f"\n✗ Slug redirect export failed: {str(e)}\n")
+        sys.exit(1)
+    finally:
+        print_request_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Shared Supabase access for the catalog tools
+
+One place for configuration and the HTTP plumbing behind every supabase-py
+client the scripts create (populate_supabase.py, slug-fixer.py and the
+tools built on them):
+
+- Config from the environment: SUPABASE_URL, SUPABASE_SERVICE_KEY,
+  SUPABASE_TIMEOUT (seconds, default 30), SUPABASE_MAX_RETRIES (default 3),
+  SUPABASE_POOL_SIZE (keep-alive connections, default 10)
+- One pooled keep-alive httpx session shared by all clients in the process
+- Retries with exponential backoff (honouring Retry-After) on connection
+  errors, timeouts and 429/502/503/504 - only for idempotent calls: GET,
+  HEAD, PUT, DELETE and upserts (POST with resolution=merge-duplicates).
+  Plain inserts and RPCs are never replayed.
+- Per-table accounting of requests, retries, errors, bytes and latency,
+  printed with print_request_stats() at the end of each run
+- Watermarks for the incremental jobs (etl_watermarks, see 005-sales-rollups.sql)
+
+Usage:
+    export SUPABASE_URL='https://xxxxx.supabase.co'
+    export SUPABASE_SERVICE_KEY='eyJhbG...your-service-role-key'
+
+    from supabase_access import create_supabase_client, print_request_stats
+    client = create_supabase_client()
+    ...
+    print_request_stats()
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import httpx
+from supabase import Client, create_client
+from supabase.lib.client_options import SyncClientOptions
+
+SUPABASE_URL         = os.environ.get("SUPABASE_URL", "your-supabase-url")
+SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY", "your-service-role-key")
+TIMEOUT              = float(os.environ.get("SUPABASE_TIMEOUT", "30"))
+MAX_RETRIES          = int(os.environ.get("SUPABASE_MAX_RETRIES", "3"))
+POOL_SIZE            = int(os.environ.get("SUPABASE_POOL_SIZE", "10"))
+
+BACKOFF_BASE    = 0.5    # seconds; doubles per attempt
+BACKOFF_MAX     = 8.0
+RETRY_STATUSES  = {429, 502, 503, 504}
+IDEMPOTENT      = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+def is_configured() -> bool:
+    return SUPABASE_URL != "your-supabase-url" and SUPABASE_SERVICE_KEY != "your-service-role-key"
+
+
+def table_of(url: httpx.URL) -> str:
+    """/rest/v1/products → products, /rest/v1/rpc/fn → rpc/fn, /auth/v1/... → auth"""
+    parts = [p for p in url.path.split("/") if p]
+    if len(parts) >= 3 and parts[0] == "rest":
+        return "/".join(parts[2:4]) if parts[2] == "rpc" else parts[2]
+    return parts[0] if parts else "-"
+
+
+class RequestStats:
+    """Thread-safe per-table counters"""
+
+    FIELDS = ("requests", "retries", "errors", "bytes_sent", "bytes_received", "seconds")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tables: Dict[str, Dict[str, float]] = {}
+
+    def add(self, table: str, **values: float):
+        with self._lock:
+            row = self.tables.setdefault(table, dict.fromkeys(self.FIELDS, 0))
+            for key, value in values.items():
+                row[key] += value
+
+    def reset(self):
+        with self._lock:
+            self.tables.clear()
+
+    def print_summary(self):
+        if not self.tables:
+            return
+        print(f"\n{'='*60}")
+        print("SUPABASE REQUESTS")
+        print(f"{'='*60}")
+        print(f"  {'table':<28}{'reqs':>6}{'retry':>6}{'err':>5}{'KB out':>9}{'KB in':>9}{'avg ms':>8}")
+        totals = dict.fromkeys(self.FIELDS, 0)
+        for table, row in sorted(self.tables.items(), key=lambda kv: -kv[1]["seconds"]):
+            for key in self.FIELDS:
+                totals[key] += row[key]
+            self._print_row(table, row)
+        print(f"  {'-'*69}")
+        self._print_row("total", totals)
+        print(f"{'='*60}\n")
+
+    @staticmethod
+    def _print_row(name: str, row: Dict[str, float]):
+        avg_ms = row["seconds"] / row["requests"] * 1000 if row["requests"] else 0
+        print(f"  {name:<28}{row['requests']:>6.0f}{row['retries']:>6.0f}{row['errors']:>5.0f}"
+              f"{row['bytes_sent'] / 1024:>9.1f}{row['bytes_received'] / 1024:>9.1f}{avg_ms:>8.1f}")
+
+
+STATS = RequestStats()
+
+
+class RetryTransport(httpx.BaseTransport):
+    """Retries idempotent requests with backoff and records per-table stats"""
+
+    def __init__(self, inner: httpx.BaseTransport, stats: RequestStats = STATS, max_retries: int = MAX_RETRIES):
+        self.inner = inner
+        self.stats = stats
+        self.max_retries = max_retries
+
+    @staticmethod
+    def idempotent(request: httpx.Request) -> bool:
+        if request.method in IDEMPOTENT:
+            return True
+        return request.method == "POST" and "resolution=" in request.headers.get("prefer", "")
+
+    @staticmethod
+    def backoff(attempt: int, response: Optional[httpx.Response] = None) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX)
+        return min(BACKOFF_BASE * 2 ** attempt, BACKOFF_MAX) * random.uniform(0.5, 1.0)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        table = table_of(request.url)
+        retries = self.max_retries if self.idempotent(request) else 0
+        sent = len(request.content) if request.content else 0
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                response = self.inner.handle_request(request)
+            except httpx.TransportError:
+                if attempt >= retries:
+                    self.stats.add(table, requests=1, retries=attempt, errors=1, bytes_sent=sent,
+                                   seconds=time.perf_counter() - started)
+                    raise
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < retries:
+                response.close()
+                time.sleep(self.backoff(attempt, response))
+                attempt += 1
+                continue
+
+            body = response.read()
+            self.stats.add(table, requests=1, retries=attempt, errors=int(response.status_code >= 400),
+                           bytes_sent=sent, bytes_received=len(body), seconds=time.perf_counter() - started)
+            return response
+
+    def close(self):
+        self.inner.close()
+
+
+_session: Optional[httpx.Client] = None
+_session_lock = threading.Lock()
+
+
+def shared_session() -> httpx.Client:
+    """The process-wide keep-alive session (created on first use)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            limits = httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE,
+                                  keepalive_expiry=60)
+            _session = httpx.Client(
+                transport=RetryTransport(httpx.HTTPTransport(limits=limits)),
+                timeout=httpx.Timeout(TIMEOUT, connect=min(TIMEOUT, 10.0)),
+                follow_redirects=True,
+            )
+        return _session
+
+
+def create_supabase_client(url: Optional[str] = None, service_key: Optional[str] = None) -> Client:
+    """supabase-py client on the shared session (defaults to the environment config)"""
+    url = url or SUPABASE_URL
+    service_key = service_key or SUPABASE_SERVICE_KEY
+    return create_client(url, service_key, options=SyncClientOptions(httpx_client=shared_session()))
+
+
+def print_request_stats():
+    STATS.print_summary()
+
+
+def get_watermark(client: Client, job: str) -> Optional[str]:
+    """Last watermark stored for `job` (ISO timestamp) or None on the first run"""
+    rows = client.table("etl_watermarks").select("watermark").eq("job", job).execute().data
+    return rows[0]["watermark"] if rows else None
+
+
+def get_watermark_details(client: Client, job: str) -> Tuple[Optional[str], Dict]:
+    """(watermark, details) stored for `job`; (None, {}) on the first run"""
+    rows = client.table("etl_watermarks").select("watermark, details").eq("job", job).execute().data
+    return (rows[0]["watermark"], rows[0]["details"] or {}) if rows else (None, {})
+
+
+def set_watermark(client: Client, job: str, watermark: Optional[str], details: Optional[Dict] = None):
+    client.table("etl_watermarks").upsert({
+        "job": job,
+        "watermark": watermark,
+        "details": details,
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }, on_conflict="job").execute()
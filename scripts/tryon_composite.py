@@ -0,0 +1,262 @@
+"""
+Try-On Composite - combined garment / original / result preview images
+
+Same layout as the storefront's canvas preview (hooks/useVirtualTryOn.ts,
+uploaded by app/api/upload-combined-image): three panels scaled to a common
+height on white, labels above, "Powered by Alzia Virtual Try-On" and the date
+below. Built with NumPy array slicing (alpha flattening, panel placement) and
+Pillow for decode / resize / text.
+
+Batches run across a process pool. Jobs are grouped by garment and sorted by
+person, and every worker keeps an LRU of decoded + scaled inputs, so a
+garment × person batch costs about one decode per unique image instead of
+two per pair. Try-on results are unique per pair and are never cached.
+
+Usage:
+    pip install numpy pillow
+
+    from tryon_composite import composite_batch, save_combined
+    save_combined("garment.jpg", "person.jpg", "result.png", "combined.png")
+    composite_batch([{"garment": ..., "person": ..., "result": ..., "output": ...}, ...])
+
+CLI (pairs named like public/gradio.py's plan_batch: result_<g12>_<p12>.png):
+    python tryon_composite.py --garments g1.jpg g2.jpg --persons p1.jpg p2.jpg \\
+        --results-dir outputs -o outputs/combined
+"""
+
+import math
+import os
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from pathlib import Path
+
+REPO_ROOT    = Path(__file__).resolve().parent.parent
+FONT_DIR     = REPO_ROOT / "public" / "fonts" / "Montserrat" / "static"
+
+PADDING      = 40
+GAP          = 30
+IMAGE_HEIGHT = 600
+FOOTER       = 120
+LABELS       = ("Garment", "Original", "Virtual Try-On Result")
+CREDIT       = "Powered by Alzia Virtual Try-On"
+INK          = (31, 41, 55)      # #1f2937
+MUTED        = (107, 114, 128)   # #6b7280
+FAINT        = (156, 163, 175)   # #9ca3af
+CACHE_BYTES  = 512 << 20         # decoded panels kept per worker process
+PNG_LEVEL    = 3                 # zlib level: ~2x faster than the default 6, slightly larger files
+
+# Per-process state (each pool worker has its own)
+_panels: OrderedDict = OrderedDict()
+_panel_bytes = 0
+_fonts: dict = {}
+_stats = {"decodes": 0, "reused": 0}
+
+
+def _font(size: int, bold: bool = False):
+    from PIL import ImageFont
+    key = (size, bold)
+    if key not in _fonts:
+        path = FONT_DIR / f"Montserrat-{'Bold' if bold else 'Regular'}.ttf"
+        try:
+            _fonts[key] = ImageFont.truetype(str(path), size)
+        except OSError:
+            _fonts[key] = ImageFont.load_default(size)
+    return _fonts[key]
+
+
+def flatten_alpha(rgba):
+    """RGBA uint8 array → RGB on white, in integer arithmetic."""
+    import numpy as np
+    alpha = rgba[..., 3:4].astype(np.uint16)
+    rgb = rgba[..., :3].astype(np.uint16)
+    return ((rgb * alpha + 255 * (255 - alpha) + 127) // 255).astype(np.uint8)
+
+
+def decode_panel(path: str | Path, height: int = IMAGE_HEIGHT):
+    """Decode once, fix EXIF orientation, flatten alpha, scale to `height` → RGB uint8 array."""
+    import numpy as np
+    from PIL import Image, ImageOps
+
+    _stats["decodes"] += 1
+    with Image.open(path) as im:
+        im = ImageOps.exif_transpose(im)
+        width = max(1, round(im.width * height / im.height))
+        if im.mode in ("RGBA", "LA", "PA") or (im.mode == "P" and "transparency" in im.info):
+            # Premultiplied resize so transparent pixels don't bleed into edges
+            im = im.convert("RGBa").resize((width, height), Image.LANCZOS).convert("RGBA")
+            return flatten_alpha(np.asarray(im))
+        return np.asarray(im.convert("RGB").resize((width, height), Image.LANCZOS))
+
+
+def cached_panel(path: str | Path, height: int = IMAGE_HEIGHT):
+    """decode_panel() through the per-process LRU (inputs shared by many pairs)."""
+    global _panel_bytes
+    key = (os.path.realpath(path), height)
+    panel = _panels.get(key)
+    if panel is not None:
+        _panels.move_to_end(key)
+        _stats["reused"] += 1
+        return panel
+    panel = decode_panel(path, height)
+    _panels[key] = panel
+    _panel_bytes += panel.nbytes
+    while _panel_bytes > CACHE_BYTES and len(_panels) > 1:
+        _, evicted = _panels.popitem(last=False)
+        _panel_bytes -= evicted.nbytes
+    return panel
+
+
+def compose(panels, day: date | None = None):
+    """Lay out RGB panel arrays (all IMAGE_HEIGHT tall) → combined PIL image."""
+    import numpy as np
+    from PIL import Image, ImageDraw
+
+    height = panels[0].shape[0]
+    width = sum(p.shape[1] for p in panels) + GAP * (len(panels) - 1) + 2 * PADDING
+    total_height = height + 2 * PADDING + FOOTER
+
+    canvas = np.full((total_height, width, 3), 255, dtype=np.uint8)
+    x = PADDING
+    centers = []
+    for panel in panels:
+        w = panel.shape[1]
+        canvas[PADDING:PADDING + height, x:x + w] = panel
+        centers.append(x + w / 2)
+        x += w + GAP
+
+    image = Image.fromarray(canvas)
+    draw = ImageDraw.Draw(image)
+    for label, center in zip(LABELS, centers):
+        draw.text((center, PADDING - 15), label, fill=INK, font=_font(28, bold=True), anchor="ms")
+    day = day or date.today()
+    draw.text((width / 2, total_height - 40), CREDIT, fill=MUTED, font=_font(20), anchor="ms")
+    draw.text((width / 2, total_height - 20), f"{day:%B} {day.day}, {day.year}",
+              fill=FAINT, font=_font(14), anchor="ms")
+    return image
+
+
+def save_combined(garment: str | Path, person: str | Path, result: str | Path,
+                  output: str | Path, day: date | None = None) -> Path:
+    """Write one combined preview; garment/person go through the decode cache."""
+    panels = [cached_panel(garment), cached_panel(person), decode_panel(result)]
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    compose(panels, day).save(output, "PNG", compress_level=PNG_LEVEL)
+    return output
+
+
+def _composite_group(jobs: list[dict], day: date) -> dict:
+    """Worker: one garment's pairs; returns outputs, errors and decode counts."""
+    before = dict(_stats)
+    done, errors = [], []
+    for job in jobs:
+        try:
+            done.append(str(save_combined(job["garment"], job["person"], job["result"], job["output"], day)))
+        except Exception as e:
+            errors.append((job["output"], str(e)))
+    return {
+        "done": done,
+        "errors": errors,
+        **{k: _stats[k] - before[k] for k in _stats},
+    }
+
+
+def plan_groups(jobs: list[dict], workers: int) -> list[list[dict]]:
+    """Group pairs by garment (person-sorted) and split big groups so all workers stay busy."""
+    by_garment = defaultdict(list)
+    for job in jobs:
+        by_garment[os.path.realpath(job["garment"])].append(job)
+    size = max(4, math.ceil(len(jobs) / (workers * 4)))
+    groups = []
+    for pairs in by_garment.values():
+        pairs.sort(key=lambda j: os.path.realpath(j["person"]))
+        groups += [pairs[i:i + size] for i in range(0, len(pairs), size)]
+    return groups
+
+
+def composite_batch(jobs: list[dict], workers: int | None = None, day: date | None = None) -> dict:
+    """
+    Combined previews for many pairs across a process pool.
+
+    Args:
+        jobs:     dicts with `garment`, `person`, `result` and `output` paths.
+        workers:  Worker processes (default: CPU count).
+        day:      Date printed in the footer (default: today).
+
+    Returns:
+        {"done": [...], "errors": [(output, message)], "decodes": n, "reused": n, "unique_inputs": n}
+    """
+    workers = workers or os.cpu_count() or 1
+    day = day or date.today()
+    totals = {"done": [], "errors": [], "decodes": 0, "reused": 0}
+    unique = {os.path.realpath(j[k]) for j in jobs for k in ("garment", "person", "result")}
+    totals["unique_inputs"] = len(unique)
+    if not jobs:
+        return totals
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_composite_group, group, day) for group in plan_groups(jobs, workers)]
+        for future in as_completed(futures):
+            part = future.result()
+            totals["done"] += part["done"]
+            totals["errors"] += part["errors"]
+            totals["decodes"] += part["decodes"]
+            totals["reused"] += part["reused"]
+    return totals
+
+
+# ------------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+
+    from image_derivatives import file_sha256
+
+    parser = argparse.ArgumentParser(description="Batch combined before/after try-on previews")
+    parser.add_argument("--garments", nargs="+", required=True, help="Garment images")
+    parser.add_argument("--persons", nargs="+", required=True, help="Person images")
+    parser.add_argument("--results-dir", type=Path, default=Path("outputs"),
+                        help="Try-on results named result_<g12>_<p12>.png (default: outputs)")
+    parser.add_argument("-o", "--output", type=Path, help="Combined previews directory (default: <results-dir>/combined)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Rebuild previews that already exist")
+    args = parser.parse_args()
+
+    try:
+        import numpy  # noqa: F401
+        import PIL  # noqa: F401
+    except ImportError:
+        parser.exit(1, "❌ NumPy and Pillow are required: pip install numpy pillow\n")
+
+    output_dir = args.output or args.results_dir / "combined"
+    garments = {file_sha256(Path(p)): p for p in args.garments}
+    persons = {file_sha256(Path(p)): p for p in args.persons}
+
+    jobs, missing, skipped = [], 0, 0
+    for g_digest, garment in garments.items():
+        for p_digest, person in persons.items():
+            name = f"{g_digest[:12]}_{p_digest[:12]}.png"
+            result, output = args.results_dir / f"result_{name}", output_dir / f"combined_{name}"
+            if not result.exists():
+                missing += 1
+            elif output.exists() and not args.force:
+                skipped += 1
+            else:
+                jobs.append({"garment": garment, "person": person, "result": str(result), "output": str(output)})
+
+    print(f"\n{'='*60}")
+    print(f"COMBINED PREVIEWS: {len(jobs)} to build, {skipped} up to date, {missing} without a result")
+    print(f"{'='*60}")
+    started = time.perf_counter()
+    totals = composite_batch(jobs, workers=args.workers)
+    for output, error in totals["errors"]:
+        print(f"✗ {Path(output).name}: {error}")
+    print(f"✓ {len(totals['done'])} previews → {output_dir}")
+    print(f"  Decodes: {totals['decodes']} for {totals['unique_inputs']} unique images "
+          f"({totals['reused']} reused from memory)")
+    print(f"⏱  {time.perf_counter() - started:.2f}s")
+    print(f"{'='*60}\n")
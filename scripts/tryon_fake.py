@@ -0,0 +1,201 @@
+"""
+Fake in-process try-on backend + offline throughput benchmark
+
+Stands in for the `gradio_client.Client` connected to the WeShop Space, so
+batch scheduling can be benchmarked and regression-tested without the model.
+The fake simulates a Space with `workers` GPU slots: every job uploads, waits
+in the queue for a free slot, runs "inference" and returns an ImageData dict
+pointing at a local temp file, just like the real client.
+
+Usage:
+    from tryon_fake import FakeTryOnClient
+    from weshop import WeShopTryOn
+
+    tryon = WeShopTryOn(client=FakeTryOnClient(workers=2, inference_s=0.5))
+
+CLI (benchmark):
+    python tryon_fake.py --jobs 40 --concurrency 8 --workers 2 --inference 0.2
+"""
+
+import random
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from enum import Enum
+from pathlib import Path
+from types import SimpleNamespace
+
+
+class FakeStatus(Enum):
+    """Mirrors the `gradio_client.utils.Status` names WeShopTryOn looks at."""
+    STARTING   = "STARTING"
+    IN_QUEUE   = "IN_QUEUE"
+    PROCESSING = "PROCESSING"
+    FINISHED   = "FINISHED"
+
+
+class FakeJob:
+    """Minimal `gradio_client.Job` look-alike backed by a thread."""
+
+    def __init__(self, backend: "FakeTryOnClient", main_image, background_image):
+        self._backend = backend
+        self._status  = FakeStatus.STARTING
+        self._future: Future = Future()
+        self._thread  = threading.Thread(
+            target=self._run, args=(main_image, background_image), daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, main_image, background_image):
+        backend = self._backend
+        try:
+            time.sleep(backend._delay(backend.upload_s))
+            self._status = FakeStatus.IN_QUEUE
+            with backend._slots:
+                self._status = FakeStatus.PROCESSING
+                time.sleep(backend._delay(backend.inference_s))
+                if backend._rng_random() < backend.fail_rate:
+                    raise RuntimeError("Fake backend: simulated GPU task aborted")
+                result = backend._make_result(main_image)
+            self._status = FakeStatus.FINISHED
+            self._future.set_result(result)
+        except Exception as e:
+            self._status = FakeStatus.FINISHED
+            self._future.set_exception(e)
+
+    def status(self):
+        return SimpleNamespace(code=self._status)
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def result(self, timeout: float | None = None):
+        return self._future.result(timeout=timeout)
+
+
+class FakeTryOnClient:
+    """Drop-in replacement for `gradio_client.Client(WeShopTryOn.SPACE)`."""
+
+    def __init__(
+        self,
+        workers:     int   = 1,
+        upload_s:    float = 0.05,
+        inference_s: float = 0.5,
+        jitter:      float = 0.2,
+        fail_rate:   float = 0.0,
+        seed:        int | None = 0,
+    ):
+        self.workers     = workers
+        self.upload_s    = upload_s
+        self.inference_s = inference_s
+        self.jitter      = jitter
+        self.fail_rate   = fail_rate
+        self.submitted   = 0
+        self._slots      = threading.BoundedSemaphore(workers)
+        self._rng        = random.Random(seed)
+        self._rng_lock   = threading.Lock()
+        self._tmpdir     = Path(tempfile.mkdtemp(prefix="fake_tryon_"))
+        self._counter_lock = threading.Lock()
+
+    def _rng_random(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def _delay(self, base: float) -> float:
+        if base <= 0:
+            return 0.0
+        return max(0.0, base * (1 + self.jitter * (2 * self._rng_random() - 1)))
+
+    def _make_result(self, main_image) -> dict:
+        """Copy the person image to a temp file, like the real client does."""
+        src = Path(main_image["path"] if isinstance(main_image, dict) else main_image)
+        with self._counter_lock:
+            self.submitted += 1
+            n = self.submitted
+        dst = self._tmpdir / f"image_{n}{src.suffix or '.png'}"
+        shutil.copy(src, dst)
+        return {"path": str(dst), "url": None, "orig_name": dst.name}
+
+    def submit(self, main_image=None, background_image=None, api_name: str | None = None, **kwargs) -> FakeJob:
+        if main_image is None and "dict" in kwargs:
+            # IDM-VTON's /tryon: person in dict["background"], garment in garm_img
+            main_image, background_image = kwargs["dict"]["background"], kwargs.get("garm_img")
+        return FakeJob(self, main_image, background_image)
+
+    def predict(self, main_image=None, background_image=None, api_name: str | None = None, **kwargs):
+        return self.submit(main_image=main_image, background_image=background_image).result()
+
+    def view_api(self, return_format: str | None = None, **kwargs):
+        info = {
+            "named_endpoints": {
+                "/generate_image": {
+                    "parameters": [
+                        {"parameter_name": "main_image", "component": "Image"},
+                        {"parameter_name": "background_image", "component": "Image"},
+                    ],
+                    "returns": [{"label": "Result", "component": "Image"}],
+                }
+            },
+            "unnamed_endpoints": {},
+        }
+        if return_format == "dict":
+            return info
+        print(info)
+
+
+# ------------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+    from concurrent.futures import ThreadPoolExecutor
+
+    from tryon_metrics import TryOnMetrics
+    from weshop import WeShopTryOn
+
+    parser = argparse.ArgumentParser(description="Offline try-on throughput benchmark (fake backend)")
+    parser.add_argument("--jobs",        type=int,   default=20,  help="Number of try-on jobs")
+    parser.add_argument("--concurrency", type=int,   default=4,   help="Client-side parallel jobs")
+    parser.add_argument("--workers",     type=int,   default=1,   help="Simulated Space GPU workers")
+    parser.add_argument("--upload",      type=float, default=0.05, help="Simulated upload seconds")
+    parser.add_argument("--inference",   type=float, default=0.2, help="Simulated inference seconds")
+    parser.add_argument("--fail-rate",   type=float, default=0.0, help="Fraction of jobs that fail")
+    parser.add_argument("--jsonl",       help="Write per-phase samples to this JSON-lines file")
+    parser.add_argument("--prometheus",  action="store_true", help="Print Prometheus text at the end")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="fake_tryon_bench_"))
+    garment = workdir / "garment.png"
+    person  = workdir / "person.png"
+    garment.write_bytes(b"\x89PNG\r\n\x1a\n fake garment")
+    person.write_bytes(b"\x89PNG\r\n\x1a\n fake person")
+
+    metrics = TryOnMetrics()
+    backend = FakeTryOnClient(
+        workers=args.workers,
+        upload_s=args.upload,
+        inference_s=args.inference,
+        fail_rate=args.fail_rate,
+    )
+    tryon = WeShopTryOn(verbose=False, client=backend, metrics=metrics, poll_interval=0.01)
+
+    def run(i: int):
+        try:
+            return tryon.try_on(garment, person, workdir / f"result_{i}.png", max_retries=1)
+        except Exception:
+            return None
+
+    print(f"🚀 {args.jobs} jobs, concurrency={args.concurrency}, workers={args.workers}")
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(run, range(args.jobs)))
+
+    metrics.print_summary()
+    if args.jsonl:
+        print(f"📝 Samples → {metrics.write_jsonl(args.jsonl)}")
+    if args.prometheus:
+        print(metrics.to_prometheus())
+    shutil.rmtree(workdir, ignore_errors=True)
+    shutil.rmtree(backend._tmpdir, ignore_errors=True)
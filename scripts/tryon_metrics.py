@@ -0,0 +1,156 @@
+"""
+Try-On Metrics - per-phase timings for WeShopTryOn runs
+
+Phases recorded by WeShopTryOn:
+    connect, upload, queue, inference, download, save, composite, total
+
+Usage:
+    from tryon_metrics import TryOnMetrics
+
+    metrics = TryOnMetrics()
+    client  = WeShopTryOn(metrics=metrics)
+    client.try_on("garment.jpg", "person.jpg")
+
+    metrics.write_jsonl("tryon_metrics.jsonl")   # one JSON object per sample
+    print(metrics.to_prometheus())               # Prometheus text exposition
+    metrics.print_summary()                      # p50 / p95 / p99 per phase
+"""
+
+import json
+import math
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, TextIO
+
+PHASES = ("connect", "upload", "queue", "inference", "download", "save", "composite", "total")
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    pos = (len(sorted_values) - 1) * q
+    lo = math.floor(pos)
+    hi = math.ceil(pos)
+    if lo == hi:
+        return sorted_values[lo]
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+class TryOnMetrics:
+    """Thread-safe collector of phase timings and job outcomes."""
+
+    def __init__(self, jsonl_stream: TextIO | None = None):
+        self._lock    = threading.Lock()
+        self._samples: List[dict] = []
+        self._timings: Dict[str, List[float]] = {}
+        self._counts:  Dict[str, int] = {"ok": 0, "error": 0}
+        self._stream  = jsonl_stream
+        self._started = time.perf_counter()
+
+    def record(self, phase: str, seconds: float, **labels) -> None:
+        """Record one timing sample for `phase`."""
+        sample = {"ts": time.time(), "phase": phase, "seconds": round(seconds, 6), **labels}
+        with self._lock:
+            self._samples.append(sample)
+            self._timings.setdefault(phase, []).append(seconds)
+            if self._stream is not None:
+                self._stream.write(json.dumps(sample, default=str) + "\n")
+
+    def count(self, outcome: str) -> None:
+        """Count a finished job as `ok` or `error`."""
+        with self._lock:
+            self._counts[outcome] = self._counts.get(outcome, 0) + 1
+
+    @contextmanager
+    def span(self, phase: str, **labels) -> Iterator[None]:
+        """Time the enclosed block and record it under `phase`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start, **labels)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def summary(self) -> Dict[str, dict]:
+        """Per-phase count, mean and p50/p95/p99 in seconds."""
+        with self._lock:
+            timings = {phase: sorted(values) for phase, values in self._timings.items()}
+        out = {}
+        for phase in sorted(timings, key=lambda p: (PHASES.index(p) if p in PHASES else len(PHASES), p)):
+            values = timings[phase]
+            out[phase] = {
+                "count": len(values),
+                "mean":  sum(values) / len(values),
+                "p50":   percentile(values, 0.50),
+                "p95":   percentile(values, 0.95),
+                "p99":   percentile(values, 0.99),
+                "max":   values[-1],
+            }
+        return out
+
+    def throughput(self) -> float:
+        """Finished jobs per second since the collector was created."""
+        elapsed = time.perf_counter() - self._started
+        with self._lock:
+            done = sum(self._counts.values())
+        return done / elapsed if elapsed > 0 else 0.0
+
+    def write_jsonl(self, path: str | Path) -> Path:
+        """Dump every recorded sample as JSON lines."""
+        path = Path(path)
+        with self._lock:
+            samples = list(self._samples)
+        with path.open("w", encoding="utf-8") as f:
+            for sample in samples:
+                f.write(json.dumps(sample, default=str) + "\n")
+        return path
+
+    def to_prometheus(self, prefix: str = "weshop_tryon") -> str:
+        """Render the collected metrics in Prometheus text format."""
+        lines = [
+            f"# HELP {prefix}_phase_seconds Time spent per try-on phase.",
+            f"# TYPE {prefix}_phase_seconds summary",
+        ]
+        with self._lock:
+            timings = {phase: sorted(values) for phase, values in self._timings.items()}
+            counts  = dict(self._counts)
+        for phase, values in timings.items():
+            for q in QUANTILES:
+                lines.append(f'{prefix}_phase_seconds{{phase="{phase}",quantile="{q}"}} {percentile(values, q):.6f}')
+            lines.append(f'{prefix}_phase_seconds_sum{{phase="{phase}"}} {sum(values):.6f}')
+            lines.append(f'{prefix}_phase_seconds_count{{phase="{phase}"}} {len(values)}')
+        lines.append(f"# HELP {prefix}_jobs_total Finished try-on jobs by outcome.")
+        lines.append(f"# TYPE {prefix}_jobs_total counter")
+        for outcome, n in counts.items():
+            lines.append(f'{prefix}_jobs_total{{outcome="{outcome}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def print_summary(self, file: TextIO = sys.stdout) -> None:
+        """Print a latency table (milliseconds) plus job counts."""
+        summary = self.summary()
+        print(f"\n{'='*72}", file=file)
+        print("TRY-ON LATENCY SUMMARY (ms)", file=file)
+        print(f"{'='*72}", file=file)
+        print(f"  {'phase':<10} {'count':>6} {'mean':>10} {'p50':>10} {'p95':>10} {'p99':>10}", file=file)
+        for phase, s in summary.items():
+            print(
+                f"  {phase:<10} {s['count']:>6} {s['mean']*1000:>10.1f} {s['p50']*1000:>10.1f}"
+                f" {s['p95']*1000:>10.1f} {s['p99']*1000:>10.1f}",
+                file=file,
+            )
+        with self._lock:
+            counts = dict(self._counts)
+        print(f"{'-'*72}", file=file)
+        print(f"  ✓ ok: {counts.get('ok', 0)}   ✗ errors: {counts.get('error', 0)}"
+              f"   throughput: {self.throughput():.2f} jobs/s", file=file)
+        print(f"{'='*72}\n", file=file)
@@ -0,0 +1,361 @@
+"""
+Try-On Router - pick the fastest healthy try-on backend, hedge slow requests
+
+Providers are WeShopTryOn subclasses (one per Gradio Space), so they share
+the connection, metrics, schema cache and result saving:
+
+    weshop     WeShopAI/WeShopAI-Virtual-Try-On  /generate_image
+    idm-vton   yisol/IDM-VTON                    /tryon
+
+The router keeps a moving window of the last outcomes per backend (latency
+of successes, error rate). Each request goes to the healthy backend with the
+lowest median latency; backends without samples are tried first so every
+provider gets measured. A backend that fails TRIP_AFTER times in a row, or
+whose windowed error rate exceeds MAX_ERROR_RATE, cools down for COOLDOWN
+seconds and then starts over with a fresh window.
+
+Hedging (optional): if the chosen backend has not answered after its own
+p95 latency, the same request is also sent to the next backend and the
+first result wins. The slower job still finishes in the background and its
+timing is recorded, so the windows stay honest. A failure before the hedge
+point fails over to the next backend immediately.
+
+Usage:
+    from tryon_router import build_router
+
+    router = build_router(["weshop", "idm-vton"], hedge=True)
+    router.try_on("garment.jpg", "person.jpg", "result.png")
+    print(router.backend_status())
+
+CLI:
+    python tryon_router.py garment.jpg person.jpg -o result.png --hedge
+    python tryon_router.py --fake --jobs 40 --hedge     # offline, simulated Spaces
+"""
+
+import itertools
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from tryon_metrics import percentile
+from weshop import WeShopTryOn
+
+WINDOW          = 50      # outcomes kept per backend
+MIN_SAMPLES     = 5       # before p95 / error rate are trusted
+MAX_ERROR_RATE  = 0.5
+TRIP_AFTER      = 3       # consecutive failures before cooling down
+COOLDOWN        = 60.0    # seconds
+HEDGE_QUANTILE  = 0.95
+HEDGE_MIN_DELAY = 5.0     # never hedge sooner than this (seconds)
+POOL_SIZE       = 32
+
+
+class IDMVTONTryOn(WeShopTryOn):
+    """IDM-VTON Space (the app/api/virtual-tryon-IDM_VTON provider)."""
+
+    SPACE      = "yisol/IDM-VTON"
+    ENDPOINT   = "/tryon"
+    PARAMETERS = ("dict", "garm_img")
+
+    def __init__(self, *args, description: str = "A garment", denoise_steps: int = 30, seed: int = 42, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.description   = description
+        self.denoise_steps = denoise_steps
+        self.seed          = seed
+
+    def _submit(self, client, main_image_data: dict, background_image_data: dict):
+        # Same inputs as the Next.js route: person as the editor background, garment image
+        return client.submit(
+            dict={"background": main_image_data, "layers": [], "composite": None},
+            garm_img=background_image_data,
+            garment_des=self.description,
+            is_checked=True,
+            is_checked_crop=False,
+            denoise_steps=self.denoise_steps,
+            seed=self.seed,
+            api_name=self.ENDPOINT,
+        )
+
+
+PROVIDERS = {
+    "weshop":   WeShopTryOn,
+    "idm-vton": IDMVTONTryOn,
+}
+
+
+class BackendWindow:
+    """Moving latency / error window for one backend."""
+
+    def __init__(self, size: int = WINDOW):
+        self.samples: deque = deque(maxlen=size)   # (ok, seconds)
+        self.failures_in_row = 0
+        self.cooldown_until  = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, ok: bool, seconds: float):
+        with self._lock:
+            self.samples.append((ok, seconds))
+            self.failures_in_row = 0 if ok else self.failures_in_row + 1
+            errors = sum(1 for s_ok, _ in self.samples if not s_ok)
+            if self.failures_in_row >= TRIP_AFTER or (
+                len(self.samples) >= MIN_SAMPLES and errors / len(self.samples) > MAX_ERROR_RATE
+            ):
+                self.cooldown_until = time.monotonic() + COOLDOWN
+                self.failures_in_row = 0
+                self.samples.clear()
+
+    def latencies(self) -> list[float]:
+        with self._lock:
+            return sorted(seconds for ok, seconds in self.samples if ok)
+
+    def quantile(self, q: float) -> float | None:
+        values = self.latencies()
+        return percentile(values, q) if values else None
+
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self.samples:
+                return 0.0
+            return sum(1 for ok, _ in self.samples if not ok) / len(self.samples)
+
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+
+class TryOnRouter:
+    """
+    Routes try_on() calls across backends. Same call as WeShopTryOn.try_on
+    minus max_retries / retry_delay: the router fails over instead of retrying.
+    """
+
+    def __init__(
+        self,
+        backends:        dict[str, WeShopTryOn],
+        hedge:           bool  = False,
+        hedge_quantile:  float = HEDGE_QUANTILE,
+        hedge_min_delay: float = HEDGE_MIN_DELAY,
+        metrics                = None,
+        verbose:         bool  = True,
+    ):
+        if not backends:
+            raise ValueError("TryOnRouter needs at least one backend")
+        self.backends        = backends
+        self.windows         = {name: BackendWindow() for name in backends}
+        self.hedge           = hedge
+        self.hedge_quantile  = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.metrics         = metrics
+        self.verbose         = verbose
+        self.counters        = dict.fromkeys(("requests", "hedged", "hedge_wins", "failovers", "failed"), 0)
+        self._pool           = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="tryon-route")
+        self._lock           = threading.Lock()
+        self._seq            = itertools.count()
+
+    def _log(self, msg: str):
+        if self.verbose:
+            print(msg)
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def rank(self) -> list[str]:
+        """Healthy backends by median latency (unmeasured first), then cooling-down ones."""
+        def key(name):
+            window = self.windows[name]
+            p50 = window.quantile(0.5)
+            return (not window.healthy(), window.cooldown_until if not window.healthy() else 0.0,
+                    p50 is not None, p50 or 0.0)
+        return sorted(self.backends, key=key)
+
+    def hedge_delay(self, name: str) -> float | None:
+        window = self.windows[name]
+        if len(window.latencies()) < MIN_SAMPLES:
+            return None
+        return max(window.quantile(self.hedge_quantile), self.hedge_min_delay)
+
+    def _call(self, name: str, garment: Path, person: Path, output: Path) -> Path:
+        started = time.perf_counter()
+        try:
+            path = self.backends[name].try_on(garment, person, output, max_retries=1)
+        except Exception:
+            self.windows[name].record(False, time.perf_counter() - started)
+            output.unlink(missing_ok=True)
+            raise
+        self.windows[name].record(True, time.perf_counter() - started)
+        return path
+
+    def try_on(
+        self,
+        garment_path: str | Path,
+        person_path:  str | Path,
+        output_path:  str | Path | None = None,
+        combined_path: str | Path | None = None,
+    ) -> Path:
+        """
+        Run on the best backend (hedging / failing over as configured); returns
+        the saved path. `combined_path` gets the winner's garment / original /
+        result preview; a preview failure is logged and the result kept.
+        """
+        self._count("requests")
+        garment, person = Path(garment_path), Path(person_path)
+        output = Path(output_path) if output_path is not None else Path(f"result_{int(time.time())}.png")
+        seq = next(self._seq)
+
+        queue = self.rank()
+        pending = {}
+
+        def start(name: str):
+            part = output.with_name(f"{output.stem}.{seq}.{name}.part{output.suffix}")
+            pending[self._pool.submit(self._call, name, garment, person, part)] = name
+
+        primary = queue.pop(0)
+        start(primary)
+        hedge_at = None
+        if self.hedge and queue:
+            delay = self.hedge_delay(primary)
+            hedge_at = time.monotonic() + delay if delay is not None else None
+
+        errors = []
+        while pending:
+            timeout = max(0.0, hedge_at - time.monotonic()) if hedge_at is not None else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedge_at = None
+                if queue:
+                    self._count("hedged")
+                    name = queue.pop(0)
+                    self._log(f"🐢 {primary} slower than its p{self.hedge_quantile * 100:.0f}, hedging to {name}")
+                    start(name)
+                continue
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    part = future.result()
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+                    self._log(f"⚠️  {name} failed: {e}")
+                    if not pending and queue:
+                        self._count("failovers")
+                        start(queue.pop(0))
+                    continue
+
+                shutil.move(part, output)
+                if name != primary:
+                    self._count("hedge_wins")
+                for loser in pending:
+                    # Let the slower job finish (its timing still counts); drop its file
+                    loser.add_done_callback(
+                        lambda f: f.exception() is None and Path(f.result()).unlink(missing_ok=True)
+                    )
+                self._log(f"✅ {name} → {output}")
+                if combined_path is not None:
+                    try:
+                        self.backends[name]._save_combined(garment, person, output, Path(combined_path))
+                    except Exception as e:
+                        self._log(f"⚠️  Combined preview failed: {e}")
+                return output
+
+        self._count("failed")
+        raise RuntimeError("All try-on backends failed: " + "; ".join(errors))
+
+    def backend_status(self) -> dict:
+        status = {}
+        for name, window in self.windows.items():
+            status[name] = {
+                "healthy":    window.healthy(),
+                "samples":    len(window.samples),
+                "p50":        window.quantile(0.5),
+                "p95":        window.quantile(0.95),
+                "error_rate": round(window.error_rate(), 3),
+            }
+        return {"backends": status, **self.counters}
+
+    def print_status(self):
+        status = self.backend_status()
+        print(f"\n{'='*60}")
+        print("TRY-ON ROUTER")
+        print(f"{'='*60}")
+        print(f"  {'backend':<12}{'ok':>4}{'n':>6}{'p50 s':>9}{'p95 s':>9}{'err':>7}")
+        for name, row in status["backends"].items():
+            fmt = lambda v: f"{v:>9.2f}" if v is not None else f"{'-':>9}"
+            print(f"  {name:<12}{'✓' if row['healthy'] else '✗':>4}{row['samples']:>6}"
+                  f"{fmt(row['p50'])}{fmt(row['p95'])}{row['error_rate']:>7.0%}")
+        print("  " + "  ".join(f"{k} {v}" for k, v in status.items() if k != "backends"))
+        print(f"{'='*60}\n")
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def build_router(
+    names:    list[str] = ("weshop", "idm-vton"),
+    hf_token: str | None = None,
+    hedge:    bool = False,
+    metrics        = None,
+    clients:  dict | None = None,
+    verbose:  bool = False,
+) -> TryOnRouter:
+    """Router over the named PROVIDERS (pre-built `clients` by name, e.g. fakes)."""
+    clients = clients or {}
+    unknown = [n for n in names if n not in PROVIDERS]
+    if unknown:
+        raise ValueError(f"Unknown try-on backend(s): {', '.join(unknown)} (choose from {', '.join(PROVIDERS)})")
+    backends = {
+        name: PROVIDERS[name](hf_token=hf_token, verbose=False, client=clients.get(name), metrics=metrics)
+        for name in names
+    }
+    return TryOnRouter(backends, hedge=hedge, metrics=metrics, verbose=verbose)
+
+
+# ------------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Latency-aware multi-backend try-on router")
+    parser.add_argument("garment", nargs="?", help="Path to garment image")
+    parser.add_argument("person",  nargs="?", help="Path to person image")
+    parser.add_argument("-o", "--output", help="Output path (default: result_<ts>.png)")
+    parser.add_argument("--backends", nargs="+", default=list(PROVIDERS), choices=list(PROVIDERS))
+    parser.add_argument("--hedge", action="store_true", help="Hedge to a second backend after the p95 latency")
+    parser.add_argument("--token", help="Hugging Face token (if a Space is private)")
+    parser.add_argument("--fake", action="store_true", help="Simulated Spaces (tryon_fake), one fast and one slow")
+    parser.add_argument("--jobs", type=int, default=1, help="With --fake: number of sequential jobs")
+    args = parser.parse_args()
+
+    clients = {}
+    if args.fake:
+        from tryon_fake import FakeTryOnClient
+        for i, name in enumerate(args.backends):
+            clients[name] = FakeTryOnClient(workers=2, upload_s=0.0, inference_s=0.2 * (i + 1),
+                                            jitter=0.8, fail_rate=0.05, seed=i)
+        workdir = Path(tempfile.mkdtemp(prefix="tryon_router_"))
+        args.garment = args.garment or workdir / "garment.png"
+        args.person  = args.person or workdir / "person.png"
+        for path in (args.garment, args.person):
+            if not Path(path).exists():
+                Path(path).write_bytes(b"\x89PNG\r\n\x1a\n fake image")
+        args.output = args.output or workdir / "result.png"
+    elif not (args.garment and args.person):
+        parser.error("garment and person are required (or use --fake)")
+
+    router = build_router(args.backends, hf_token=args.token, hedge=args.hedge, clients=clients, verbose=True)
+    if args.fake:
+        router.hedge_min_delay = 0.0
+    try:
+        for _ in range(args.jobs if args.fake else 1):
+            try:
+                router.try_on(args.garment, args.person, args.output)
+            except Exception as e:
+                print(f"❌ {e}")
+    finally:
+        router.print_status()
+        router.close()
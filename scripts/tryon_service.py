@@ -0,0 +1,331 @@
+"""
+Try-On Service - local HTTP front for WeShopTryOn with request coalescing
+
+The storefront's app/api/virtual-tryon routes can proxy here instead of
+opening their own connection to the Space for every click. Requests are
+keyed by content (sha256 of the garment bytes + sha256 of the person bytes),
+so during a launch spike the upstream sees one job per unique pair:
+
+- finished pair      → served from disk, no upstream call
+- pair already running or queued → the request joins that job (coalesced)
+- new pair           → queued; at most --concurrency jobs run upstream at once,
+                       at most --max-queue wait (beyond that: 503 + Retry-After)
+
+A client that disconnects or times out never cancels a job others may be
+waiting on; the result still lands on disk for the next request.
+
+Usage:
+    pip install aiohttp gradio-client requests
+
+    python tryon_service.py --port 8765 --concurrency 2
+    python tryon_service.py --fake              # offline, tryon_fake backend
+    python tryon_service.py --backends weshop idm-vton --hedge   # via tryon_router
+
+Endpoints:
+    POST /tryon               multipart `garment` + `person`
+                              → {"success", "key", "url", "image"?, "cached", "coalesced"}
+                              (?inline=1 adds the result as a data URL in `image`,
+                               the shape the Next.js route returns)
+    GET  /results/<key>.png   finished result
+    GET  /status              queue depth, running jobs, counters (+ per-backend windows)
+    GET  /metrics             Prometheus text: per-phase timings + service gauges
+"""
+
+import asyncio
+import base64
+import hashlib
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from weshop import SCHEMA_CACHE_DIR, _require
+
+if TYPE_CHECKING:
+    from tryon_router import TryOnRouter
+    from weshop import WeShopTryOn
+
+DEFAULT_DATA_DIR    = Path(os.environ.get("TRYON_SERVICE_DIR", SCHEMA_CACHE_DIR / "service"))
+DEFAULT_CONCURRENCY = 2
+DEFAULT_MAX_QUEUE   = 64
+REQUEST_TIMEOUT     = 300.0      # seconds a client waits for its job
+MAX_UPLOAD_BYTES    = 20 << 20
+IMAGE_SUFFIXES      = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def pair_key(garment_digest: str, person_digest: str) -> str:
+    """Stable result key for a garment/person pair (order matters)."""
+    return hashlib.sha256(f"{garment_digest}:{person_digest}".encode()).hexdigest()[:32]
+
+
+class QueueFull(Exception):
+    pass
+
+
+class TryOnService:
+    """Coalescing, bounded-concurrency job runner around a WeShopTryOn or TryOnRouter."""
+
+    def __init__(
+        self,
+        tryon:       "WeShopTryOn | TryOnRouter",
+        data_dir:    str | Path = DEFAULT_DATA_DIR,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_queue:   int = DEFAULT_MAX_QUEUE,
+    ):
+        self.tryon       = tryon
+        self.data_dir    = Path(data_dir)
+        self.input_dir   = self.data_dir / "inputs"
+        self.result_dir  = self.data_dir / "results"
+        self.concurrency = concurrency
+        self.max_queue   = max_queue
+        self.input_dir.mkdir(parents=True, exist_ok=True)
+        self.result_dir.mkdir(parents=True, exist_ok=True)
+
+        self._slots    = asyncio.Semaphore(concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="tryon")
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.running   = 0
+        self.counters  = dict.fromkeys(("requests", "cache_hits", "coalesced", "jobs", "failed", "rejected"), 0)
+
+    @property
+    def queued(self) -> int:
+        return len(self._inflight) - self.running
+
+    def result_path(self, key: str) -> Path:
+        return self.result_dir / f"{key}.png"
+
+    def _store_input(self, data: bytes, digest: str, filename: str) -> Path:
+        """Content-addressed copy of an upload (shared by every pair that uses it)."""
+        suffix = Path(filename or "").suffix.lower()
+        path = self.input_dir / f"{digest}{suffix if suffix in IMAGE_SUFFIXES else '.png'}"
+        if not path.exists():
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            tmp.write_bytes(data)
+            tmp.replace(path)
+        return path
+
+    async def submit(self, garment: bytes, garment_name: str, person: bytes, person_name: str) -> dict:
+        """Result path for the pair, running at most one upstream job per key."""
+        self.counters["requests"] += 1
+        g_digest, p_digest = content_digest(garment), content_digest(person)
+        key = pair_key(g_digest, p_digest)
+        info = {"key": key, "cached": False, "coalesced": False}
+
+        result = self.result_path(key)
+        if result.exists():
+            self.counters["cache_hits"] += 1
+            return {**info, "path": result, "cached": True}
+
+        job = self._inflight.get(key)
+        if job is not None:
+            self.counters["coalesced"] += 1
+            info["coalesced"] = True
+        else:
+            if self.queued >= self.max_queue:
+                self.counters["rejected"] += 1
+                raise QueueFull(f"{self.queued} jobs queued")
+            garment_path = self._store_input(garment, g_digest, garment_name)
+            person_path  = self._store_input(person, p_digest, person_name)
+            job = asyncio.get_running_loop().create_future()
+            self._inflight[key] = job
+            asyncio.create_task(self._run(key, garment_path, person_path, job))
+
+        # shield: a client going away must not cancel the shared job
+        path = await asyncio.wait_for(asyncio.shield(job), REQUEST_TIMEOUT)
+        return {**info, "path": path}
+
+    async def _run(self, key: str, garment_path: Path, person_path: Path, job: asyncio.Future):
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._slots:
+                self.running += 1
+                self.counters["jobs"] += 1
+                try:
+                    output = self.result_path(key)
+                    tmp = output.with_name(f"{key}.part.png")
+                    await loop.run_in_executor(
+                        self._executor, self.tryon.try_on, garment_path, person_path, tmp
+                    )
+                    tmp.replace(output)
+                finally:
+                    self.running -= 1
+            job.set_result(output)
+        except Exception as e:
+            self.counters["failed"] += 1
+            job.set_exception(e)
+            job.exception()  # mark retrieved when nobody is waiting any more
+        finally:
+            self._inflight.pop(key, None)
+
+    def status(self) -> dict:
+        status = {
+            "concurrency": self.concurrency,
+            "running":     self.running,
+            "queued":      self.queued,
+            "max_queue":   self.max_queue,
+            "in_flight":   len(self._inflight),
+            **self.counters,
+        }
+        if hasattr(self.tryon, "backend_status"):
+            status["router"] = self.tryon.backend_status()
+        return status
+
+    def to_prometheus(self, prefix: str = "weshop_tryon_service") -> str:
+        lines = []
+        for name, value in self.status().items():
+            if name == "router":
+                continue
+            kind = "counter" if name in self.counters else "gauge"
+            metric = f"{prefix}_{name}{'_total' if kind == 'counter' else ''}"
+            lines += [f"# TYPE {metric} {kind}", f"{metric} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if hasattr(self.tryon, "close"):
+            self.tryon.close()
+
+
+def create_app(service: TryOnService):
+    web = _require("aiohttp.web", "aiohttp")
+
+    async def read_upload(field) -> tuple[bytes, str]:
+        data = bytearray()
+        while chunk := await field.read_chunk():
+            data += chunk
+            if len(data) > MAX_UPLOAD_BYTES:
+                raise web.HTTPRequestEntityTooLarge(max_size=MAX_UPLOAD_BYTES, actual_size=len(data))
+        return bytes(data), field.filename or ""
+
+    async def tryon(request):
+        uploads = {}
+        reader = await request.multipart()
+        while (field := await reader.next()) is not None:
+            if field.name in ("garment", "person"):
+                uploads[field.name] = await read_upload(field)
+        if len(uploads) != 2 or not all(data for data, _ in uploads.values()):
+            return web.json_response({"error": "Both garment and person images are required"}, status=400)
+
+        try:
+            job = await service.submit(*uploads["garment"], *uploads["person"])
+        except QueueFull:
+            return web.json_response(
+                {"error": "Try-on queue is full — please try again shortly."},
+                status=503, headers={"Retry-After": "10"},
+            )
+        except asyncio.TimeoutError:
+            return web.json_response({"error": "Try-on is taking longer than expected."}, status=504)
+        except Exception as e:
+            return web.json_response({"error": f"Try-on failed: {e}"}, status=502)
+
+        body = {
+            "success":   True,
+            "key":       job["key"],
+            "url":       f"/results/{job['key']}.png",
+            "model":     "WeShopAI",
+            "cached":    job["cached"],
+            "coalesced": job["coalesced"],
+        }
+        if request.query.get("inline"):
+            encoded = base64.b64encode(job["path"].read_bytes()).decode()
+            body["image"] = f"data:image/png;base64,{encoded}"
+        return web.json_response(body)
+
+    async def result(request):
+        key = request.match_info["key"]
+        path = service.result_path(key)
+        if not path.is_file():
+            raise web.HTTPNotFound()
+        # Keys are content hashes, so a result never changes
+        return web.FileResponse(path, headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
+    async def status(request):
+        return web.json_response(service.status())
+
+    async def metrics(request):
+        text = service.to_prometheus()
+        if service.tryon.metrics is not None:
+            text = service.tryon.metrics.to_prometheus() + text
+        return web.Response(text=text, content_type="text/plain")
+
+    async def on_cleanup(app):
+        service.close()
+
+    app = web.Application(client_max_size=2 * MAX_UPLOAD_BYTES + (1 << 20))
+    app.add_routes([
+        web.post("/tryon", tryon),
+        web.get(r"/results/{key:[0-9a-f]{32}}.png", result),
+        web.get("/status", status),
+        web.get("/metrics", metrics),
+    ])
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+# ------------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local WeShop try-on service with request coalescing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR,
+                        help=f"Uploads + finished results (default: {DEFAULT_DATA_DIR})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Upstream jobs running at once")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+                        help="Unique jobs allowed to wait before new ones get 503")
+    parser.add_argument("--token", help="Hugging Face token (if Space is private)")
+    parser.add_argument("--fake", action="store_true", help="Use the offline tryon_fake backend")
+    parser.add_argument("--backends", nargs="+", default=["weshop"],
+                        help="Try-on providers (tryon_router.PROVIDERS); more than one enables routing")
+    parser.add_argument("--hedge", action="store_true", help="With several backends: hedge slow requests")
+    args = parser.parse_args()
+
+    from tryon_metrics import TryOnMetrics
+    from tryon_router import build_router
+
+    clients = {}
+    if args.fake:
+        from tryon_fake import FakeTryOnClient
+        clients = {name: FakeTryOnClient(workers=args.concurrency) for name in args.backends}
+
+    try:
+        web = _require("aiohttp.web", "aiohttp")
+    except ImportError as e:
+        sys.exit(f"❌ {e}")
+
+    metrics = TryOnMetrics()
+    try:
+        router = build_router(args.backends, hf_token=args.token, hedge=args.hedge, metrics=metrics, clients=clients)
+    except ValueError as e:
+        parser.error(str(e))
+    tryon = router if len(router.backends) > 1 else next(iter(router.backends.values()))
+
+    async def serve():
+        service = TryOnService(tryon, args.data_dir, args.concurrency, args.max_queue)
+        # Connect once up front so concurrent first jobs don't each open a client
+        for backend in router.backends.values():
+            await asyncio.get_running_loop().run_in_executor(None, backend._get_client)
+        runner = web.AppRunner(create_app(service))
+        await runner.setup()
+        await web.TCPSite(runner, args.host, args.port).start()
+        print(f"🚀 Try-on service on http://{args.host}:{args.port} "
+              f"(concurrency {args.concurrency}, data {args.data_dir})")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\n👋 Stopped.")
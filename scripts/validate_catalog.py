@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Catalog Validator - offline data-quality check before import
+
+Checks a products CSV against the constraints of 001-initial-schema.sql and
+the importer's own rules in ONE streaming pass, without any network I/O,
+and writes a machine-readable JSON report:
+
+Errors (the row would fail or land wrong):
+- duplicate_slug       slug repeated in the file (products.slug UNIQUE)
+- non_numeric          price/quantity that is not a number (importer would store 0)
+- out_of_range         value does not fit DECIMAL(10,2) / DECIMAL(8,2) / INTEGER
+- invalid_status       status not in draft/published/archived (after available → published)
+
+Warnings:
+- duplicate_sku        SKU repeated in the file (the later row updates the same product)
+- invalid_slug         slug is_slug_valid would reject (slug-fixer.py rewrites it)
+- missing_name         row is skipped by the importer
+- missing_sku          importer generates a mock SKU
+- missing_price        retail/wholesale price empty (importer stores 0)
+- invalid_image_url    image URL that is not http(s)
+
+Usage:
+    python validate_catalog.py products.csv
+    python validate_catalog.py products.csv --report report.json --strict
+
+Exit code: 0 = clean, 1 = errors (or warnings with --strict), 2 = unreadable file
+"""
+
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from catalog_slugs import is_slug_valid, slugify
+
+VALID_STATUSES = {'draft', 'published', 'archived'}
+STATUS_ALIASES = {'available': 'published'}
+
+# column → (max absolute value, integer?) from the schema column types
+NUMERIC_LIMITS = {
+    'retail_price':        (10 ** 8, False),   # DECIMAL(10,2)
+    'wholesale_price':     (10 ** 8, False),   # DECIMAL(10,2)
+    'cost_price':          (10 ** 8, False),   # DECIMAL(10,2)
+    'weight':              (10 ** 6, False),   # DECIMAL(8,2)
+    'min_wholesale_qty':   (2 ** 31, True),    # INTEGER
+    'stock_quantity':      (2 ** 31, True),    # INTEGER
+    'low_stock_threshold': (2 ** 31, True),    # INTEGER
+}
+REQUIRED_PRICES = ('retail_price', 'wholesale_price')
+
+
+class CatalogValidator:
+    def __init__(self, strict: bool = False, max_issues: int = 10000):
+        self.strict = strict
+        self.max_issues = max_issues
+
+        self.issues: List[Dict] = []
+        self.counts: Counter = Counter()
+        self.rows = 0
+
+    def add(self, row_num: int, sku: str, column: str, code: str, severity: str, message: str):
+        self.counts[(severity, code)] += 1
+        if len(self.issues) < self.max_issues:
+            self.issues.append({
+                'row': row_num,
+                'sku': sku,
+                'column': column,
+                'code': code,
+                'severity': severity,
+                'message': message,
+            })
+
+    def check_number(self, row_num: int, sku: str, column: str, value: str):
+        limit, integer = NUMERIC_LIMITS[column]
+        if not value:
+            if column in REQUIRED_PRICES:
+                self.add(row_num, sku, column, 'missing_price', 'warning', f"{column} is empty (stored as 0)")
+            return
+        try:
+            number = float(value)
+        except ValueError:
+            self.add(row_num, sku, column, 'non_numeric', 'error', f"{column}={value!r} is not a number")
+            return
+        if number != number or abs(number) >= limit:  # NaN or overflow
+            self.add(row_num, sku, column, 'out_of_range', 'error', f"{column}={value} does not fit the column type")
+        elif integer and not number.is_integer():
+            self.add(row_num, sku, column, 'out_of_range', 'warning', f"{column}={value} will be truncated to an integer")
+
+    def validate(self, csv_file: str) -> Dict:
+        started = time.perf_counter()
+        skus: Dict[str, int] = {}
+        slugs: Dict[str, int] = {}
+
+        with open(csv_file, 'r', encoding='utf-8', newline='') as file:
+            reader = csv.reader(file)
+            header = [field.strip() for field in next(reader)]
+            col = {name: idx for idx, name in enumerate(header)}
+            numeric_cols = [(c, col[c]) for c in NUMERIC_LIMITS if c in col]
+
+            def get(row, name):
+                idx = col.get(name)
+                return row[idx].strip() if idx is not None and idx < len(row) else ''
+
+            for row_num, row in enumerate(reader, 1):
+                self.rows += 1
+                name = get(row, 'name')
+                sku = get(row, 'sku')
+
+                if not name:
+                    self.add(row_num, sku, 'name', 'missing_name', 'warning', "name is empty; row will be skipped")
+                    continue
+
+                if not sku:
+                    self.add(row_num, sku, 'sku', 'missing_sku', 'warning', "sku is empty; a mock SKU will be generated")
+                elif sku in skus:
+                    self.add(row_num, sku, 'sku', 'duplicate_sku', 'warning',
+                             f"SKU already used on row {skus[sku]}; this row updates that product")
+                else:
+                    skus[sku] = row_num
+
+                slug = get(row, 'slug') or slugify(name)
+                valid, problems = is_slug_valid(slug)
+                if not valid:
+                    self.add(row_num, sku, 'slug', 'invalid_slug', 'warning', f"{slug!r}: {'; '.join(problems)}")
+                if slug in slugs:
+                    self.add(row_num, sku, 'slug', 'duplicate_slug', 'error', f"slug {slug!r} already used on row {slugs[slug]}")
+                else:
+                    slugs[slug] = row_num
+
+                for column, idx in numeric_cols:
+                    self.check_number(row_num, sku, column, row[idx].strip() if idx < len(row) else '')
+
+                status = get(row, 'status') or 'draft'
+                status = STATUS_ALIASES.get(status.lower(), status)
+                if status not in VALID_STATUSES:
+                    self.add(row_num, sku, 'status', 'invalid_status', 'error',
+                             f"status {status!r} not in {sorted(VALID_STATUSES)}")
+
+                for column in ('image_url', 'image_urls'):
+                    for url in filter(None, (u.strip() for u in get(row, column).split('|'))):
+                        if not url.lower().startswith(('http://', 'https://')):
+                            self.add(row_num, sku, column, 'invalid_image_url', 'warning', f"{url!r} is not an http(s) URL")
+
+        errors = sum(n for (severity, _), n in self.counts.items() if severity == 'error')
+        warnings = sum(n for (severity, _), n in self.counts.items() if severity == 'warning')
+        return {
+            'file': os.path.abspath(csv_file),
+            'rows': self.rows,
+            'errors': errors,
+            'warnings': warnings,
+            'ok': errors == 0 and (not self.strict or warnings == 0),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+            'summary': {f"{severity}:{code}": n for (severity, code), n in sorted(self.counts.items())},
+            'issues': self.issues,
+            'truncated': len(self.issues) < errors + warnings,
+        }
+
+
+def print_report(report: Dict, limit: int = 20):
+    print(f"\n{'='*60}")
+    print(f"CATALOG VALIDATION: {report['file']}")
+    print(f"{'='*60}")
+    print(f"  Rows:     {report['rows']}  ({report['elapsed_ms']} ms)")
+    print(f"  Errors:   {report['errors']}")
+    print(f"  Warnings: {report['warnings']}")
+    for key, n in report['summary'].items():
+        print(f"    • {key}: {n}")
+    errors = [i for i in report['issues'] if i['severity'] == 'error']
+    for issue in errors[:limit]:
+        print(f"  ✗ row {issue['row']} [{issue['sku'] or '-'}] {issue['code']}: {issue['message']}")
+    if len(errors) > limit:
+        print(f"  ... {len(errors) - limit} more errors in the report")
+    print(f"{'='*60}")
+    print("✅ PASSED\n" if report['ok'] else "❌ FAILED\n")
+
+
+def validate_file(csv_file: str, report_path: Optional[str] = None, strict: bool = False) -> Dict:
+    """Validate, print the summary and optionally write the JSON report"""
+    report = CatalogValidator(strict=strict).validate(csv_file)
+    print_report(report)
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report → {report_path}\n")
+    return report
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate a products CSV against the schema before import")
+    parser.add_argument("csv_file")
+    parser.add_argument("--report", help="Write the JSON report to this file")
+    parser.add_argument("--strict", action="store_true", help="Fail on warnings too")
+    args = parser.parse_args()
+
+    try:
+        report = validate_file(args.csv_file, args.report, args.strict)
+    except (OSError, UnicodeDecodeError, csv.Error, StopIteration) as e:
+        print(f"✗ Cannot read {args.csv_file}: {e}")
+        sys.exit(2)
+    sys.exit(0 if report['ok'] else 1)
+
+
+if __name__ == "__main__":
+    main()
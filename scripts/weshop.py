@@ -16,22 +16,40 @@ Usage:
 CLI:
     python weshop_tryon.py garment.jpg person.jpg -o result.jpg
     python weshop_tryon.py --info
+    python weshop_tryon.py garment.jpg person.jpg --metrics metrics.jsonl
+    python weshop_tryon.py --info --refresh   # ignore the cached API schema
+
+Dependencies are never installed at runtime: a missing package fails fast with
+the pip command to run. The Space's API schema is cached on disk (see
+WESHOP_CACHE_DIR / --schema-ttl), so `--info` and argument validation do not
+connect; the connection is only opened when a job actually runs.
+
+Metrics:
+    Pass `metrics=TryOnMetrics()` (see tryon_metrics.py) to record per-phase
+    timings: connect, upload, queue, inference, download, save, composite, total.
+    Pass `client=FakeTryOnClient()` (see tryon_fake.py) to run offline.
 """
 
+import os
 import sys
 import json
 import time
 from pathlib import Path
 
+SCHEMA_CACHE_DIR = Path(os.environ.get("WESHOP_CACHE_DIR", Path.home() / ".cache" / "weshop"))
+SCHEMA_TTL       = 24 * 3600  # seconds
+
 
 def _require(package: str, install_name: str | None = None):
+    """Import `package` or fail fast with the install command (never pip-installs)."""
     import importlib
     try:
         return importlib.import_module(package)
-    except ImportError:
-        import subprocess
-        subprocess.check_call([sys.executable, "-m", "pip", "install", install_name or package, "-q"])
-        return importlib.import_module(package)
+    except ImportError as e:
+        raise ImportError(
+            f"Missing dependency '{package}'. Install it with:\n"
+            f"    {Path(sys.executable).name} -m pip install {install_name or package}"
+        ) from e
 
 
 def _guess_mime(path: Path) -> str:
@@ -44,6 +62,19 @@ def _guess_mime(path: Path) -> str:
     }.get(path.suffix.lower(), "image/png")
 
 
+# gradio_client Status names → the phase a job is in while reporting them
+_STATUS_PHASES = {
+    "STARTING":      "upload",
+    "JOINING_QUEUE": "upload",
+    "SENDING_DATA":  "upload",
+    "QUEUE":         "queue",
+    "IN_QUEUE":      "queue",
+    "PROCESSING":    "inference",
+    "ITERATING":     "inference",
+    "PROGRESS":      "inference",
+}
+
+
 def _make_image_data(path: Path) -> dict:
     """
     Build the ImageData dict the updated API expects.
@@ -64,37 +95,145 @@ def _make_image_data(path: Path) -> dict:
 
 
 class WeShopTryOn:
-    SPACE    = "WeShopAI/WeShopAI-Virtual-Try-On"
-    ENDPOINT = "/generate_image"
+    SPACE      = "WeShopAI/WeShopAI-Virtual-Try-On"
+    ENDPOINT   = "/generate_image"
+    PARAMETERS = ("main_image", "background_image")
 
-    def __init__(self, hf_token: str | None = None, verbose: bool = True):
-        self.verbose   = verbose
-        self.hf_token  = hf_token
-        self._client   = None
+    def __init__(
+        self,
+        hf_token:      str | None = None,
+        verbose:       bool  = True,
+        client               = None,
+        metrics              = None,
+        poll_interval: float = 0.1,
+    ):
+        """
+        Args:
+            hf_token:       Hugging Face token (if the Space is private).
+            verbose:        Print progress messages.
+            client:         Pre-built client (e.g. tryon_fake.FakeTryOnClient);
+                            skips connecting to the Space.
+            metrics:        Optional tryon_metrics.TryOnMetrics collector.
+            poll_interval:  Seconds between job status polls.
+        """
+        self.verbose       = verbose
+        self.hf_token      = hf_token
+        self.metrics       = metrics
+        self.poll_interval = poll_interval
+        self._client       = client
 
     def _log(self, msg: str):
         if self.verbose:
             print(msg)
 
+    def _record(self, phase: str, seconds: float, **labels):
+        if self.metrics is not None:
+            self.metrics.record(phase, seconds, **labels)
+
     def _get_client(self):
         if self._client is None:
             Client = _require("gradio_client", "gradio-client").Client
             self._log(f"⏳ Connecting to {self.SPACE} ...")
             kwargs = {"hf_token": self.hf_token} if self.hf_token else {}
+            start = time.perf_counter()
             self._client = Client(self.SPACE, **kwargs)
+            self._record("connect", time.perf_counter() - start, space=self.SPACE)
             self._log("✅ Connected.")
         return self._client
 
-    def print_api_info(self):
-        """Print the live API schema for the Space."""
-        client = self._get_client()
-        print("\n=== API Info ===")
+    def _run_job(self, client, main_image_data: dict, background_image_data: dict, **labels):
+        """
+        Submit one job and poll its status to split wall time into the
+        upload, queue and inference phases.
+        """
+        job   = self._submit(client, main_image_data, background_image_data)
+        spent = {"upload": 0.0, "queue": 0.0, "inference": 0.0}
+        phase = "upload"
+        mark  = time.perf_counter()
+        while not job.done():
+            code    = getattr(job.status(), "code", None)
+            current = _STATUS_PHASES.get(getattr(code, "name", str(code)), phase)
+            if current != phase:
+                now = time.perf_counter()
+                spent[phase] += now - mark
+                phase, mark = current, now
+            time.sleep(self.poll_interval)
+        spent[phase] += time.perf_counter() - mark
+
+        for name, seconds in spent.items():
+            self._record(name, seconds, **labels)
+        return job.result()
+
+    def _submit(self, client, main_image_data: dict, background_image_data: dict):
+        """Start the job. Providers for other Spaces override this to map the inputs."""
+        return client.submit(
+            main_image=main_image_data,
+            background_image=background_image_data,
+            api_name=self.ENDPOINT,
+        )
+
+    @property
+    def schema_cache_path(self) -> Path:
+        return SCHEMA_CACHE_DIR / (self.SPACE.replace("/", "__") + ".json")
+
+    def cached_api_schema(self, max_age: float = SCHEMA_TTL) -> dict | None:
+        """Return the cached API schema if it is younger than `max_age` seconds."""
+        path = self.schema_cache_path
+        try:
+            if time.time() - path.stat().st_mtime > max_age:
+                return None
+            cached = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if cached.get("space") != self.SPACE:
+            return None
+        return cached.get("api")
+
+    def get_api_schema(self, max_age: float = SCHEMA_TTL, refresh: bool = False) -> dict:
+        """API schema from the on-disk cache, fetching (and caching) it when stale."""
+        if not refresh:
+            cached = self.cached_api_schema(max_age)
+            if cached is not None:
+                return cached
+
+        info = self._get_client().view_api(return_format="dict")
+        path = self.schema_cache_path
         try:
-            info = client.view_api(return_format="dict")
-            print(json.dumps(info, indent=2, default=str))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(
+                json.dumps({"space": self.SPACE, "fetched_at": time.time(), "api": info}, default=str),
+                encoding="utf-8",
+            )
+            tmp.replace(path)
+        except OSError as e:
+            self._log(f"⚠️  Could not write schema cache {path}: {e}")
+        return info
+
+    def validate_endpoint(self, schema: dict) -> list[str]:
+        """Check ENDPOINT and its PARAMETERS exist in `schema`."""
+        endpoint = (schema.get("named_endpoints") or {}).get(self.ENDPOINT)
+        if endpoint is None:
+            return [f"Endpoint {self.ENDPOINT} not found in the {self.SPACE} API"]
+        names = {p.get("parameter_name") for p in endpoint.get("parameters", [])}
+        return [
+            f"Endpoint {self.ENDPOINT} has no '{name}' parameter"
+            for name in self.PARAMETERS
+            if name not in names
+        ]
+
+    def print_api_info(self, max_age: float = SCHEMA_TTL, refresh: bool = False):
+        """Print the API schema for the Space (cached unless stale or `refresh`)."""
+        try:
+            info = self.get_api_schema(max_age=max_age, refresh=refresh)
+        except ImportError:
+            raise
         except Exception as e:
             print(f"Could not fetch structured API info: {e}")
-            client.view_api()
+            self._get_client().view_api()
+            return
+        print("\n=== API Info ===")
+        print(json.dumps(info, indent=2, default=str))
 
     def try_on(
         self,
@@ -103,6 +242,7 @@ class WeShopTryOn:
         output_path:  str | Path | None = None,
         max_retries:  int   = 3,
         retry_delay:  float = 10.0,
+        combined_path: str | Path | None = None,
     ) -> Path:
         """
         Run virtual try-on.
@@ -113,6 +253,7 @@ class WeShopTryOn:
             output_path:   Where to save the result (default: result_<timestamp>.png).
             max_retries:   How many times to retry if the model is busy.
             retry_delay:   Seconds between retries.
+            combined_path: Also write a garment / original / result preview here.
 
         Returns:
             Path to the saved result image.
@@ -129,6 +270,12 @@ class WeShopTryOn:
             output_path = Path(f"result_{int(time.time())}.png")
         output_path = Path(output_path)
 
+        # Validate against the cached schema only; never connect just to check.
+        cached = self.cached_api_schema()
+        if cached is not None:
+            for problem in self.validate_endpoint(cached):
+                self._log(f"⚠️  {problem} (cached schema; run --info --refresh)")
+
         client = self._get_client()
 
         # Build ImageData dicts matching the updated API schema:
@@ -140,17 +287,19 @@ class WeShopTryOn:
         self._log(f"\n📤 main_image (person)          → {person.name}")
         self._log(f"📤 background_image (garment)   → {garment.name}")
 
+        started = time.perf_counter()
         for attempt in range(1, max_retries + 1):
             self._log(f"\n🚀 Attempt {attempt}/{max_retries} ...")
+            labels = {"garment": garment.name, "person": person.name, "attempt": attempt}
             try:
-                result = client.predict(
-                    main_image=main_image_data,
-                    background_image=background_image_data,
-                    api_name=self.ENDPOINT,
-                )
+                result = self._run_job(client, main_image_data, background_image_data, **labels)
                 self._log(f"\n📦 Raw result type : {type(result)}")
                 self._log(f"📦 Raw result value: {result}")
-                return self._save_result(result, output_path)
+                saved = self._save_result(result, output_path, **labels)
+                self._record("total", time.perf_counter() - started, **labels)
+                if self.metrics is not None:
+                    self.metrics.count("ok")
+                break
 
             except Exception as e:
                 self._log(f"⚠️  Error on attempt {attempt}: {e}")
@@ -158,11 +307,21 @@ class WeShopTryOn:
                     self._log(f"⏳ Waiting {retry_delay}s before retry ...")
                     time.sleep(retry_delay)
                 else:
+                    if self.metrics is not None:
+                        self.metrics.count("error")
                     raise
 
-    def _save_result(self, result, output_path: Path) -> Path:
+        # The preview is optional: a failure here (Pillow/NumPy missing, bad
+        # font, disk full) must not resubmit the paid job that already succeeded.
+        if combined_path is not None:
+            try:
+                self._save_combined(garment, person, saved, Path(combined_path), **labels)
+            except Exception as e:
+                self._log(f"⚠️  Combined preview failed (result kept at {saved}): {e}")
+        return saved
+
+    def _save_result(self, result, output_path: Path, **labels) -> Path:
         """Extract the image URL/path from the result dict and save it."""
-        requests = _require("requests")
 
         # The API returns an ImageData dict; for outputs `path` is always provided
         # (a local temp file written by the gradio client).
@@ -189,20 +348,39 @@ class WeShopTryOn:
         self._log(f"📥 Image source: {image_source}")
 
         if image_source.startswith("http"):
+            requests = _require("requests")
             self._log("⬇️  Downloading from URL ...")
+            start = time.perf_counter()
             resp = requests.get(image_source, timeout=60)
             resp.raise_for_status()
+            self._record("download", time.perf_counter() - start, **labels)
+            start = time.perf_counter()
             output_path.write_bytes(resp.content)
+            self._record("save", time.perf_counter() - start, **labels)
         else:
             import shutil
             src = Path(image_source)
             if not src.exists():
                 raise FileNotFoundError(f"Local result file not found: {src}")
+            start = time.perf_counter()
             shutil.copy(src, output_path)
+            self._record("save", time.perf_counter() - start, **labels)
 
         self._log(f"🎉 Saved → {output_path.resolve()}")
         return output_path
 
+    def _save_combined(self, garment: Path, person: Path, result: Path, combined_path: Path, /, **labels) -> Path:
+        """
+        Side-by-side preview (see tryon_composite.py; batches use composite_batch).
+        Positional-only, so the `garment` / `person` metric labels can't collide.
+        """
+        from tryon_composite import save_combined
+        start = time.perf_counter()
+        save_combined(garment, person, result, combined_path)
+        self._record("composite", time.perf_counter() - start, **labels)
+        self._log(f"🖼  Combined → {combined_path.resolve()}")
+        return combined_path
+
 
 # ------------------------------------------------------------------
 # CLI
@@ -216,21 +394,40 @@ if __name__ == "__main__":
     parser.add_argument("person",  nargs="?", help="Path to person image (background_image)")
     parser.add_argument("-o", "--output", help="Output path (default: result_<ts>.png)")
     parser.add_argument("--token", help="Hugging Face token (if Space is private)")
-    parser.add_argument("--info",  action="store_true", help="Print live API info and exit")
+    parser.add_argument("--info",  action="store_true", help="Print API info (cached) and exit")
+    parser.add_argument("--refresh", action="store_true", help="With --info: re-fetch the schema from the Space")
+    parser.add_argument("--schema-ttl", type=float, default=SCHEMA_TTL,
+                        help=f"Max age of the cached API schema in seconds (default: {SCHEMA_TTL})")
+    parser.add_argument("--metrics", help="Write per-phase timings to this JSON-lines file")
     args = parser.parse_args()
 
-    tryon = WeShopTryOn(hf_token=args.token)
+    metrics = None
+    if args.metrics:
+        from tryon_metrics import TryOnMetrics
+        metrics = TryOnMetrics()
 
-    if args.info or (not args.garment and not args.person):
-        tryon.print_api_info()
-        sys.exit(0)
+    tryon = WeShopTryOn(hf_token=args.token, metrics=metrics)
 
-    if not args.garment or not args.person:
-        parser.error("Both garment and person image paths are required.")
-
-    result = tryon.try_on(
-        garment_path=args.garment,
-        person_path=args.person,
-        output_path=args.output,
-    )
-    print(f"\n✅ Done! Result saved to: {result}")
\ No newline at end of file
+    try:
+        if args.info or (not args.garment and not args.person):
+            tryon.print_api_info(max_age=args.schema_ttl, refresh=args.refresh)
+            sys.exit(0)
+
+        if not args.garment or not args.person:
+            parser.error("Both garment and person image paths are required.")
+        for label, value in (("Garment", args.garment), ("Person", args.person)):
+            if not Path(value).is_file():
+                parser.error(f"{label} image not found: {value}")
+
+        result = tryon.try_on(
+            garment_path=args.garment,
+            person_path=args.person,
+            output_path=args.output,
+        )
+    except ImportError as e:
+        parser.exit(1, f"❌ {e}\n")
+    print(f"\n✅ Done! Result saved to: {result}")
+
+    if metrics is not None:
+        metrics.write_jsonl(args.metrics)
+        metrics.print_summary()
\ No newline at end of file